@@ -23,17 +23,85 @@ DEFAULT_CONFIG = {
 
     # 模型配置
     "FORMULA_MODEL": os.getenv("FORMULA_MODEL", "PP-FormulaNet-L"),  # 公式识别模型
+    "FORMULA_BATCH_SIZE": int(os.getenv("FORMULA_BATCH_SIZE", "4")),  # 公式识别的批大小
+    "FORMULA_ROUTING": os.getenv("FORMULA_ROUTING", "true").lower() in ("1", "true", "yes"),  # 是否按复杂度将简单公式交给小模型
+    "FORMULA_SMALL_MODEL": os.getenv("FORMULA_SMALL_MODEL", "PP-FormulaNet-S"),  # 简单公式使用的小模型
+    "FORMULA_SIMPLE_MAX_HEIGHT": int(os.getenv("FORMULA_SIMPLE_MAX_HEIGHT", "100")),  # 简单公式的最大高度(像素)
+    "FORMULA_SIMPLE_MAX_COMPONENTS": int(os.getenv("FORMULA_SIMPLE_MAX_COMPONENTS", "30")),  # 简单公式的最大连通域数
+    "FORMULA_SIMPLE_MAX_INK": float(os.getenv("FORMULA_SIMPLE_MAX_INK", "0.25")),  # 简单公式的最大墨迹密度
+    "FORMULA_MIN_CHARS_PER_COMPONENT": float(os.getenv("FORMULA_MIN_CHARS_PER_COMPONENT", "0.5")),  # 小模型输出长度低于连通域数的该倍数时视为截断，改用大模型
     "OCR_DET_MODEL": os.getenv("OCR_DET_MODEL", "PP-OCRv4_mobile_det"),  # OCR检测模型
     "OCR_REC_MODEL": os.getenv("OCR_REC_MODEL", "PP-OCRv4_mobile_rec"),  # OCR识别模型
     "LAYOUT_MODEL": os.getenv("LAYOUT_MODEL", "PP-DocLayout-L"),  # 版面分析模型 (更新为PP-DocLayout-L)
+    "OCR_DET_BATCH_SIZE": int(os.getenv("OCR_DET_BATCH_SIZE", "8")),  # OCR文本检测的批大小
+    "OCR_WINDOW_PAGES": int(os.getenv("OCR_WINDOW_PAGES", "0")),  # 文档级OCR、公式识别和VLM请求每次汇总的页数，0表示整篇文档一次处理
+    "OCR_REC_BATCH_SIZE": int(os.getenv("OCR_REC_BATCH_SIZE", "8")),  # OCR文本识别的批大小
+    "OCR_SINGLE_LINE_FAST_PATH": os.getenv("OCR_SINGLE_LINE_FAST_PATH", "true").lower() in ("1", "true", "yes"),  # 明显是单行文字的区域跳过文本检测，直接识别
+    "OCR_SINGLE_LINE_MIN_ASPECT": float(os.getenv("OCR_SINGLE_LINE_MIN_ASPECT", "1.5")),  # 单行区域的最小宽高比
+    "OCR_SINGLE_LINE_MAX_HEIGHT": int(os.getenv("OCR_SINGLE_LINE_MAX_HEIGHT", "160")),  # 单行区域的最大高度(像素)
+    "OCR_SINGLE_LINE_PROFILE": os.getenv("OCR_SINGLE_LINE_PROFILE", "true").lower() in ("1", "true", "yes"),  # 是否用水平投影进一步确认只有一行文字
+    "MODEL_DEVICE": os.getenv("MODEL_DEVICE", ""),  # 本地模型运行设备(如cpu、gpu:0)，为空则由PaddleX自动选择
+    "MODEL_WARMUP": os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes"),  # 模型加载后是否用空白图片预热
 
     # 多模态模型
     "VLM_MODEL": os.getenv("VLM_MODEL", "Qwen/Qwen2.5-VL-72B-Instruct"),  # 多模态模型
+    "TITLE_MODEL": os.getenv("TITLE_MODEL", "deepseek-ai/DeepSeek-V3"),  # 根据图片描述生成标题的文本模型
+    "TITLE_BASE_URL": os.getenv("TITLE_BASE_URL", "https://api.siliconflow.com/v1"),  # 标题模型的API基础URL
+    "IMAGE_TITLE_MODE": os.getenv("IMAGE_TITLE_MODE", "merged"),  # 图片标题生成方式: merged(VLM同时返回描述和标题) / batch(按文档批量生成) / separate(逐张生成)
+    "TITLE_BATCH_SIZE": int(os.getenv("TITLE_BATCH_SIZE", "20")),  # 批量生成标题时每个请求包含的图片描述数
+    "VLM_MAX_CONCURRENCY": int(os.getenv("VLM_MAX_CONCURRENCY", "8")),  # 同时进行的多模态请求数上限
+    "VLM_TIMEOUT": float(os.getenv("VLM_TIMEOUT", "120")),  # 单个多模态请求的超时时间(秒)
+    "VLM_PACK_SIZE": int(os.getenv("VLM_PACK_SIZE", "1")),  # 同一页的小文字区域合并为一个多图请求的最大图片数，1表示不合并
+    "VLM_PACK_MAX_PIXELS": int(os.getenv("VLM_PACK_MAX_PIXELS", "500000")),  # 参与合并的文字区域的最大像素数(宽×高)
+    "VLM_IMAGE_ENCODING": os.getenv("VLM_IMAGE_ENCODING", "true").lower() in ("1", "true", "yes"),  # 上传前按细节级别缩放并按内容选择编码格式
+    "VLM_LOW_DETAIL_MAX_SIDE": int(os.getenv("VLM_LOW_DETAIL_MAX_SIDE", "512")),  # detail=low时图片最长边(像素)
+    "VLM_HIGH_DETAIL_MAX_SIDE": int(os.getenv("VLM_HIGH_DETAIL_MAX_SIDE", "2048")),  # detail=high时图片最长边(像素)
+    "VLM_HIGH_DETAIL_SHORT_SIDE": int(os.getenv("VLM_HIGH_DETAIL_SHORT_SIDE", "768")),  # detail=high时图片最短边(像素)
+    "VLM_PHOTO_FORMAT": os.getenv("VLM_PHOTO_FORMAT", "jpeg"),  # 照片类图片的编码格式: jpeg / webp
+    "VLM_PHOTO_QUALITY": int(os.getenv("VLM_PHOTO_QUALITY", "85")),  # 照片类图片的编码质量(1-100)
+    "VLM_CACHE_PATH": os.getenv("VLM_CACHE_PATH", ""),  # VLM响应缓存(SQLite)文件路径，为空则不使用缓存
+    "VLM_CACHE_MAX_MB": int(os.getenv("VLM_CACHE_MAX_MB", "512")),  # VLM响应缓存大小上限(MB)
+    "VLM_CACHE_MODE": os.getenv("VLM_CACHE_MODE", "use"),  # VLM缓存模式: use(读写) / refresh(重新请求并覆盖) / bypass(不使用)
+
+    # 区域路由配置
+    "ROUTING_POLICIES": os.getenv("ROUTING_POLICIES", ""),  # 按标签覆盖默认路由策略，如"text:vlm,table:ocr_first"(策略: vlm / ocr / ocr_first)
+    "OCR_MIN_CONFIDENCE": float(os.getenv("OCR_MIN_CONFIDENCE", "0.9")),  # ocr_first策略下本地OCR平均置信度低于该值时改用VLM
+    "OFFLINE_MODE": os.getenv("OFFLINE_MODE", "false").lower() in ("1", "true", "yes"),  # 离线模式：不请求VLM/LLM，文字类区域全部使用本地OCR
+
+    # 流水线配置(渲染、版面分析、本地识别、VLM请求和Markdown拼接按页重叠执行)
+    "PIPELINED": os.getenv("PIPELINED", "false").lower() in ("1", "true", "yes"),  # 是否按阶段流水线处理文档
+    "PIPELINE_QUEUE_SIZE": int(os.getenv("PIPELINE_QUEUE_SIZE", "2")),  # 相邻阶段之间最多积压的页数
+    "PIPELINE_BATCH_PAGES": int(os.getenv("PIPELINE_BATCH_PAGES", "4")),  # 本地识别和VLM阶段每次最多合并处理的已就绪页数
+    "PIPELINE_LAYOUT_WORKERS": int(os.getenv("PIPELINE_LAYOUT_WORKERS", "1")),  # 版面分析/排序/裁剪阶段的线程数
+    "PIPELINE_LOCAL_WORKERS": int(os.getenv("PIPELINE_LOCAL_WORKERS", "1")),  # 本地OCR/公式识别阶段的线程数
+    "PIPELINE_VLM_WORKERS": int(os.getenv("PIPELINE_VLM_WORKERS", "2")),  # VLM请求阶段的线程数
+    "PIPELINE_ASSEMBLY_WORKERS": int(os.getenv("PIPELINE_ASSEMBLY_WORKERS", "1")),  # Markdown拼接阶段的线程数
 
     # 处理配置
     "DEFAULT_DPI": int(os.getenv("DEFAULT_DPI", "300")),  # 默认DPI
-    "THRESHOLD_LEFT_RIGHT": float(os.getenv("THRESHOLD_LEFT_RIGHT", "0.9")),  # 左右栏阈值
-    "THRESHOLD_CROSS": float(os.getenv("THRESHOLD_CROSS", "0.3")),  # 跨栏阈值
+    "THRESHOLD_LEFT_RIGHT": float(os.getenv("THRESHOLD_LEFT_RIGHT", "0.9")),  # 左右栏阈值(仅columns排序方法使用)
+    "THRESHOLD_CROSS": float(os.getenv("THRESHOLD_CROSS", "0.3")),  # 跨栏阈值(仅columns排序方法使用)
+    "LAYOUT_SORTER": os.getenv("LAYOUT_SORTER", "xycut"),  # 阅读顺序排序方法: xycut(递归XY-cut) / columns(左右两栏)
+    "SAVE_REGION_CROPS": os.getenv("SAVE_REGION_CROPS", "false").lower() in ("1", "true", "yes"),  # 是否将区域裁剪图片写入磁盘(写入后不再在内存中保留区域像素，适合超长文档)
+    "DEBUG_ARTIFACTS": os.getenv("DEBUG_ARTIFACTS", "false").lower() in ("1", "true", "yes"),  # 是否保存模型中间结果(JSON、可视化图片)
+    "RENDER_WORKERS": int(os.getenv("RENDER_WORKERS", "1")),  # PDF渲染进程数
+    "LAYOUT_DPI": int(os.getenv("LAYOUT_DPI", "0")),  # 版面分析使用的低分辨率，0表示与DEFAULT_DPI相同
+    "LAYOUT_BATCH_SIZE": int(os.getenv("LAYOUT_BATCH_SIZE", "4")),  # 版面分析每批处理的页数
+    "RASTER_CACHE_DIR": os.getenv("RASTER_CACHE_DIR", ""),  # 页面栅格缓存目录，为空则不使用缓存
+    "RASTER_CACHE_MAX_MB": int(os.getenv("RASTER_CACHE_MAX_MB", "2048")),  # 页面栅格缓存大小上限(MB)，PNG压缩后300DPI每页约1~3MB
+    "HIRES_LABELS": os.getenv(
+        "HIRES_LABELS",
+        "formula,table,doc_title,paragraph_title,figure_title,table_title,chart_title",
+    ).split(","),  # 低分辨率版面分析时需要按DEFAULT_DPI重新渲染的区域标签
+
+    # 文本层配置(原生数字PDF直接读取文字，跳过VLM/OCR)
+    "USE_TEXT_LAYER": os.getenv("USE_TEXT_LAYER", "false").lower() in ("1", "true", "yes"),  # 是否启用文本层
+    "TEXT_LAYER_MIN_COVERAGE": float(os.getenv("TEXT_LAYER_MIN_COVERAGE", "0.05")),  # 字符面积占区域面积的最小比例
+    "TEXT_LAYER_MAX_GARBLED": float(os.getenv("TEXT_LAYER_MAX_GARBLED", "0.1")),  # 乱码字符的最大占比
+
+    # 内嵌图片配置
+    "USE_EMBEDDED_IMAGES": os.getenv("USE_EMBEDDED_IMAGES", "true").lower() in ("1", "true", "yes"),  # 图片区域优先提取PDF内嵌图片
+    "EMBEDDED_IMAGE_MIN_IOU": float(os.getenv("EMBEDDED_IMAGE_MIN_IOU", "0.8")),  # 区域与内嵌图片的最小交并比
 }
 
 # 运行时配置(可覆盖默认配置)
@@ -89,6 +157,7 @@ def get_model_config(model_type: str) -> str:
     """
     model_map = {
         'formula': 'FORMULA_MODEL',
+        'formula_small': 'FORMULA_SMALL_MODEL',
         'ocr_det': 'OCR_DET_MODEL',
         'ocr_rec': 'OCR_REC_MODEL',
         'layout': 'LAYOUT_MODEL',
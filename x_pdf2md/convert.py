@@ -6,24 +6,132 @@
 
 import argparse
 import os
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List, Union
+from typing import Iterator, Optional, List, Tuple, Union
 # 从process_pdf.py导入必要的依赖
 
 from tqdm import tqdm
 
-from x_pdf2md.config import DEFAULT_CONFIG, update_config
+from x_pdf2md.config import DEFAULT_CONFIG, get_config, update_config
+from x_pdf2md.image2md.vlm_cache import get_vlm_cache
+from x_pdf2md.image_utils.detect_and_sort import detect_and_sort_layout_batch
+from x_pdf2md.image_utils.models import model_registry
 from x_pdf2md.image_utils.process_page import process_page_layout
 from x_pdf2md.image_utils.region_image import RegionImage
-from x_pdf2md.markdown_formatter import format_pdf_regions
-from x_pdf2md.pdf_utils.pdf_to_image import pdf_to_images
-from x_pdf2md.remote_image import default_uploader
+from x_pdf2md.markdown_formatter import (
+    format_page_regions,
+    format_pdf_regions,
+    prefill_formula_regions,
+    prefill_image_titles,
+    prefill_ocr_regions,
+    prefill_vlm_regions,
+)
+from x_pdf2md.pdf_utils.page_image import PageImage
+from x_pdf2md.pdf_utils.pdf_to_image import PdfRegionRenderer, iter_pdf_pages
+from x_pdf2md.pdf_utils.raster_cache import RasterCache
+from x_pdf2md.pdf_utils.embedded_images import PdfImageExtractor
+from x_pdf2md.pdf_utils.text_layer import PdfTextLayer
+from x_pdf2md.pipeline import Stage, StagePipeline
+from x_pdf2md.remote_image import ImageUploader, default_uploader
 
 
 # 保留原有的导入
 
 
 
+def _open_page_source(
+    pdf_path: str,
+    output_dir: str,
+    start_page: int,
+    end_page: Optional[int],
+    dpi: int,
+    render_workers: int,
+    save_page_images: bool,
+    layout_dpi: Optional[int],
+    raster_cache_dir: Optional[str],
+) -> Tuple[Iterator[PageImage], Optional[PdfRegionRenderer]]:
+    """
+    准备逐页渲染的页面生成器，以及双分辨率模式下的区域渲染器
+
+    返回:
+        (页面图像生成器, 区域渲染器)，未启用双分辨率时区域渲染器为None，由调用方负责关闭
+    """
+    pdf_name = Path(pdf_path).stem
+    # 页面PNG仅作为调试输出
+    temp_images_dir = os.path.join(output_dir, f"{pdf_name}_images") if save_page_images else None
+
+    # 双分辨率：低分辨率做版面分析，选定区域再按高分辨率渲染
+    region_renderer = None
+    page_dpi = dpi
+    if layout_dpi and layout_dpi < dpi:
+        region_renderer = PdfRegionRenderer(pdf_path, dpi)
+        page_dpi = layout_dpi
+
+    # 重复转换同一文档时复用已渲染的页面
+    raster_cache = None
+    if raster_cache_dir:
+        raster_cache = RasterCache(
+            raster_cache_dir, max_bytes=get_config()["RASTER_CACHE_MAX_MB"] * 1024 * 1024
+        )
+
+    pages = iter_pdf_pages(
+        pdf_path=pdf_path,
+        start_page=start_page,
+        end_page=end_page,
+        dpi=page_dpi,
+        workers=render_workers,
+        debug_output_dir=temp_images_dir,
+        cache=raster_cache,
+    )
+    return pages, region_renderer
+
+
+def _analyze_pages(
+    batch: List[PageImage],
+    pdf_name: str,
+    output_dir: str,
+    threshold_left_right: float,
+    threshold_cross: float,
+    region_renderer: Optional[PdfRegionRenderer],
+    layout_batch_size: int,
+    save_crops: bool,
+) -> List[List[RegionImage]]:
+    """
+    对一批页面做版面检测、阅读顺序排序和区域裁剪
+
+    返回:
+        List[List[RegionImage]]: 与batch一一对应的每页区域列表
+    """
+    batch_elements = detect_and_sort_layout_batch(
+        [page.image for page in batch],
+        batch_size=layout_batch_size,
+        threshold_left_right=threshold_left_right,
+        threshold_cross=threshold_cross,
+    )
+
+    batch_regions = []
+    for page, sorted_elements in zip(batch, batch_elements):
+        page_num = page.page_index + 1
+        page_dir = os.path.join(output_dir, f"{pdf_name}_page_{page_num}")
+
+        # 处理页面布局并获取区域信息
+        regions = process_page_layout(
+            image_path=page.image_path,
+            output_dir=page_dir,
+            page_number=page_num,
+            threshold_left_right=threshold_left_right,
+            threshold_cross=threshold_cross,
+            image=page.image,
+            scale=page.scale,
+            region_renderer=region_renderer,
+            sorted_elements=sorted_elements,
+            save_crops=save_crops,
+        )
+        batch_regions.append(regions)
+    return batch_regions
+
+
 def process_pdf_document(
     pdf_path: str,
     output_dir: str,
@@ -32,6 +140,12 @@ def process_pdf_document(
     dpi: int = 300,
     threshold_left_right: float = 0.9,
     threshold_cross: float = 0.3,
+    render_workers: int = 1,
+    save_page_images: bool = False,
+    layout_dpi: Optional[int] = None,
+    raster_cache_dir: Optional[str] = None,
+    layout_batch_size: int = 1,
+    save_crops: bool = False,
 ) -> List[List[RegionImage]]: 
     """
     处理PDF文档：将PDF转换为图像，并对每页进行版面分析和区域裁剪
@@ -44,6 +158,13 @@ def process_pdf_document(
         dpi: PDF转图像的分辨率
         threshold_left_right: 判定左右栏的阈值
         threshold_cross: 判定跨栏的阈值
+        render_workers: PDF渲染进程数
+        save_page_images: 是否将每页渲染结果另存为PNG（调试用）
+        layout_dpi: 版面分析使用的低分辨率，低于dpi时页面按该分辨率渲染，
+            公式、表格、标题等区域再按dpi单独重新渲染
+        raster_cache_dir: 页面栅格缓存目录，指定后渲染前先查询缓存
+        layout_batch_size: 版面分析每批处理的页数，多页一起送入版面模型推理
+        save_crops: 是否将区域裁剪图片写入各页输出目录（否则区域像素只保存在内存中）
 
     返回:
         List[List[RegionImage]]: 每页的RegionImage对象列表
@@ -51,39 +172,125 @@ def process_pdf_document(
     # 创建输出目录
     pdf_name = Path(pdf_path).stem
     output_dir = os.path.abspath(output_dir)
-    temp_images_dir = os.path.join(output_dir, f"{pdf_name}_images")
-    os.makedirs(temp_images_dir, exist_ok=True)
 
-    # 将PDF转换为图像
-    print("正在将PDF转换为图像...")
-    image_paths = pdf_to_images(
-        pdf_path=pdf_path,
-        output_dir=temp_images_dir,
-        start_page=start_page,
-        end_page=end_page,
-        dpi=dpi,
-    )
+    # 启动时加载并预热本地模型，后续页面直接复用
+    model_registry.preload(["layout", "ocr_det", "ocr_rec"])
 
-    # 处理每个页面的布局
+    # 逐页在内存中渲染PDF，边渲染边分析
     print("正在分析和裁剪页面...")
+    pages, region_renderer = _open_page_source(
+        pdf_path, output_dir, start_page, end_page, dpi,
+        render_workers, save_page_images, layout_dpi, raster_cache_dir,
+    )
+    pages = iter(tqdm(pages, desc="处理页面"))
+    layout_batch_size = max(1, layout_batch_size)
     all_page_regions = []
-    for i, image_path in enumerate(tqdm(image_paths, desc="处理页面")):
-        page_num = i + 1
-        page_dir = os.path.join(output_dir, f"{pdf_name}_page_{page_num}")
-        os.makedirs(page_dir, exist_ok=True)
+    try:
+        while True:
+            # 每次取出一批页面，一起做版面检测
+            batch = list(islice(pages, layout_batch_size))
+            if not batch:
+                break
+            all_page_regions.extend(_analyze_pages(
+                batch, pdf_name, output_dir, threshold_left_right, threshold_cross,
+                region_renderer, layout_batch_size, save_crops,
+            ))
+    finally:
+        if region_renderer:
+            region_renderer.close()
 
-        # 处理页面布局并获取区域信息
-        regions = process_page_layout(
-            image_path=image_path,
-            output_dir=page_dir,
-            page_number=page_num,
-            threshold_left_right=threshold_left_right,
-            threshold_cross=threshold_cross,
+    return all_page_regions
+
+
+def process_pdf_pipelined(
+    pdf_path: str,
+    output_dir: str,
+    start_page: int = 0,
+    end_page: Optional[int] = None,
+    dpi: int = 300,
+    threshold_left_right: float = 0.9,
+    threshold_cross: float = 0.3,
+    render_workers: int = 1,
+    save_page_images: bool = False,
+    layout_dpi: Optional[int] = None,
+    raster_cache_dir: Optional[str] = None,
+    layout_batch_size: int = 1,
+    save_crops: bool = False,
+    image_uploader: Optional[ImageUploader] = None,
+    text_layer: Optional[PdfTextLayer] = None,
+    image_extractor: Optional[PdfImageExtractor] = None,
+) -> Tuple[List[List[RegionImage]], List[str]]:
+    """
+    按阶段流水线处理PDF文档：渲染 -> 版面分析/排序/裁剪 -> 本地OCR/公式识别 -> VLM请求 -> Markdown拼接
+
+    各阶段之间用有界队列连接（容量PIPELINE_QUEUE_SIZE页），每个阶段有自己的线程数（PIPELINE_*_WORKERS），
+    因此第N+1页的版面分析与第N页的VLM请求同时进行。本地识别和VLM阶段每次合并处理已就绪的页面
+    （最多PIPELINE_BATCH_PAGES页），代替顺序模式下按OCR_WINDOW_PAGES汇总整个窗口。
+
+    参数:
+        与process_pdf_document相同，另外：
+        image_uploader: 可选的图片上传器对象
+        text_layer: 可选的PDF文本层读取器
+        image_extractor: 可选的内嵌图片提取器
+
+    返回:
+        (每页的RegionImage对象列表, 每页的Markdown文本列表)
+    """
+    config = get_config()
+    pdf_name = Path(pdf_path).stem
+    output_dir = os.path.abspath(output_dir)
+    layout_batch_size = max(1, layout_batch_size)
+    batch_pages = max(1, config["PIPELINE_BATCH_PAGES"])
+
+    # 本地模型按线程持有，由各阶段的工作线程在处理第一页时加载
+    pages, region_renderer = _open_page_source(
+        pdf_path, output_dir, start_page, end_page, dpi,
+        render_workers, save_page_images, layout_dpi, raster_cache_dir,
+    )
+
+    def analyze(batch: List[PageImage]) -> List[List[RegionImage]]:
+        return _analyze_pages(
+            batch, pdf_name, output_dir, threshold_left_right, threshold_cross,
+            region_renderer, layout_batch_size, save_crops,
         )
 
-        all_page_regions.append(regions)
+    def recognize_locally(batch: List[List[RegionImage]]) -> List[List[RegionImage]]:
+        prefill_ocr_regions(batch, text_layer)
+        prefill_formula_regions(batch)
+        return batch
 
-    return all_page_regions
+    def recognize_remotely(batch: List[List[RegionImage]]) -> List[List[RegionImage]]:
+        prefill_vlm_regions(batch, text_layer, image_extractor, output_dir)
+        prefill_image_titles(batch)
+        return batch
+
+    def assemble(batch: List[List[RegionImage]]) -> List[Tuple[List[RegionImage], str]]:
+        return [
+            (regions, format_page_regions(regions, image_uploader, output_dir, text_layer, image_extractor))
+            for regions in batch
+        ]
+
+    pipeline = StagePipeline(
+        [
+            Stage("layout", analyze, config["PIPELINE_LAYOUT_WORKERS"], layout_batch_size),
+            Stage("local", recognize_locally, config["PIPELINE_LOCAL_WORKERS"], batch_pages),
+            Stage("vlm", recognize_remotely, config["PIPELINE_VLM_WORKERS"], batch_pages),
+            Stage("assembly", assemble, config["PIPELINE_ASSEMBLY_WORKERS"]),
+        ],
+        queue_size=config["PIPELINE_QUEUE_SIZE"],
+    )
+
+    print("正在按流水线处理页面...")
+    try:
+        results = pipeline.run(tqdm(pages, desc="渲染页面"))
+    finally:
+        if region_renderer:
+            region_renderer.close()
+
+    print("流水线各阶段累计耗时: " + "，".join(
+        f"{name} {seconds:.1f}s" for name, seconds in pipeline.busy_time.items()
+    ))
+    return [regions for regions, _ in results], [markdown for _, markdown in results]
 
 
 def convert_pdf_to_markdown(
@@ -98,6 +305,19 @@ def convert_pdf_to_markdown(
     output_md_path: Optional[str] = None,
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,  # 从config中获取，不设默认值
+    render_workers: int = DEFAULT_CONFIG["RENDER_WORKERS"],  # 使用配置中的默认值
+    save_page_images: bool = False,
+    use_text_layer: bool = DEFAULT_CONFIG["USE_TEXT_LAYER"],  # 使用配置中的默认值
+    layout_dpi: int = DEFAULT_CONFIG["LAYOUT_DPI"],  # 使用配置中的默认值
+    raster_cache_dir: Optional[str] = DEFAULT_CONFIG["RASTER_CACHE_DIR"] or None,  # 使用配置中的默认值
+    use_embedded_images: bool = DEFAULT_CONFIG["USE_EMBEDDED_IMAGES"],  # 使用配置中的默认值
+    layout_batch_size: int = DEFAULT_CONFIG["LAYOUT_BATCH_SIZE"],  # 使用配置中的默认值
+    save_crops: bool = DEFAULT_CONFIG["SAVE_REGION_CROPS"],  # 使用配置中的默认值
+    vlm_cache_path: Optional[str] = DEFAULT_CONFIG["VLM_CACHE_PATH"] or None,  # 使用配置中的默认值
+    vlm_cache_mode: str = DEFAULT_CONFIG["VLM_CACHE_MODE"],  # 使用配置中的默认值
+    offline: bool = DEFAULT_CONFIG["OFFLINE_MODE"],  # 使用配置中的默认值
+    pipelined: bool = DEFAULT_CONFIG["PIPELINED"],  # 使用配置中的默认值
+    layout_sorter: str = DEFAULT_CONFIG["LAYOUT_SORTER"],  # 使用配置中的默认值
 ) -> Union[str, List[str]]:
     """
     将PDF文档转换为Markdown
@@ -108,12 +328,33 @@ def convert_pdf_to_markdown(
         start_page: 起始页码（从0开始），默认为0
         end_page: 结束页码（包含），如果为None则处理所有页面
         dpi: PDF转图像的分辨率，默认为300
-        threshold_left_right: 判定左右栏的阈值，默认为0.9
-        threshold_cross: 判定跨栏的阈值，默认为0.3
+        threshold_left_right: 判定左右栏的阈值，默认为0.9（仅layout_sorter为"columns"时使用）
+        threshold_cross: 判定跨栏的阈值，默认为0.3（仅layout_sorter为"columns"时使用）
         upload_images: 是否上传图片，默认为False
         output_md_path: Markdown输出文件路径，如果为None则不保存文件
         api_key: API密钥，可选，默认从config获取
         base_url: API基础URL，可选，默认从config获取
+        render_workers: PDF渲染进程数，默认为1
+        save_page_images: 是否额外保存每页的PNG图像（调试用），默认为False
+        use_text_layer: 是否优先从PDF文本层读取文字，文本层不可用时才调用VLM/OCR
+        layout_dpi: 版面分析分辨率（如100~150），低于dpi时只对公式、表格、标题等区域按dpi重新渲染，
+            默认为0表示整页按dpi渲染
+        raster_cache_dir: 页面栅格缓存目录，多次转换同一文档（如调整阈值、模型）时复用已渲染页面，
+            默认为None表示不使用缓存
+        use_embedded_images: 图片区域是否优先使用PDF中内嵌的原始图片（保持原始分辨率和编码），
+            没有匹配的内嵌图片时使用裁剪图片，默认为True
+        layout_batch_size: 版面分析每批处理的页数，默认为4
+        save_crops: 是否将区域裁剪图片写入磁盘（调试用，也可降低超长文档的内存占用），默认为False
+        vlm_cache_path: VLM响应缓存(SQLite)文件路径，重复转换同一文档时复用VLM/标题结果，
+            默认为None表示不使用缓存
+        vlm_cache_mode: VLM缓存模式，"use"读写缓存，"refresh"忽略已有结果重新请求并覆盖，
+            "bypass"本次不使用缓存，默认为"use"
+        offline: 离线模式，不请求VLM/LLM也不上传图片：文字和表格区域使用本地OCR，
+            图片不生成描述和标题，默认为False
+        pipelined: 按阶段流水线处理（渲染、版面分析、本地识别、VLM请求、Markdown拼接在不同页面上重叠执行，
+            各阶段线程数和队列容量见PIPELINE_*配置），默认为False表示逐阶段处理整篇文档
+        layout_sorter: 阅读顺序排序方法，"xycut"（递归XY-cut，支持多栏和侧边栏）或
+            "columns"（按左右栏阈值分成两栏），默认为"xycut"
         
     Returns:
         如果提供了output_md_path，返回保存的文件路径；否则返回Markdown内容的列表
@@ -130,12 +371,36 @@ def convert_pdf_to_markdown(
         config_updates["THRESHOLD_LEFT_RIGHT"] = threshold_left_right
     if threshold_cross is not None and threshold_cross != DEFAULT_CONFIG["THRESHOLD_CROSS"]:
         config_updates["THRESHOLD_CROSS"] = threshold_cross
+    if render_workers and render_workers != DEFAULT_CONFIG["RENDER_WORKERS"]:
+        config_updates["RENDER_WORKERS"] = render_workers
+    config_updates["VLM_CACHE_PATH"] = vlm_cache_path or ""
+    config_updates["VLM_CACHE_MODE"] = vlm_cache_mode
+    config_updates["OFFLINE_MODE"] = offline
+    config_updates["LAYOUT_SORTER"] = layout_sorter
+    # XY-cut按投影空白切分，不使用左右栏阈值
+    if layout_sorter == "xycut" and (
+        threshold_left_right != DEFAULT_CONFIG["THRESHOLD_LEFT_RIGHT"]
+        or threshold_cross != DEFAULT_CONFIG["THRESHOLD_CROSS"]
+    ):
+        print("警告：左右栏阈值和跨栏阈值只对columns排序方法生效，当前使用xycut，阈值将被忽略"
+              "（可通过--layout-sorter columns切换）")
     
     if config_updates:
         update_config(config_updates)
     
-    # 处理PDF
-    regions = process_pdf_document(
+    # 初始化图片上传器（如果需要）
+    image_uploader = None
+    if upload_images and offline:
+        print("离线模式下不上传图片")
+    elif upload_images:
+        image_uploader = default_uploader
+
+    # 原生数字PDF可直接读取文本层
+    text_layer = PdfTextLayer(pdf_path) if use_text_layer else None
+    # 图片区域优先提取PDF内嵌的原始图片
+    image_extractor = PdfImageExtractor(pdf_path) if use_embedded_images else None
+
+    document_options = dict(
         pdf_path=pdf_path,
         output_dir=output_dir,
         start_page=start_page,
@@ -143,15 +408,39 @@ def convert_pdf_to_markdown(
         dpi=dpi,
         threshold_left_right=threshold_left_right,
         threshold_cross=threshold_cross,
+        render_workers=render_workers,
+        save_page_images=save_page_images,
+        layout_dpi=layout_dpi,
+        raster_cache_dir=raster_cache_dir,
+        layout_batch_size=layout_batch_size,
+        save_crops=save_crops,
     )
+    try:
+        if pipelined:
+            regions, formatted_pages = process_pdf_pipelined(
+                **document_options, image_uploader=image_uploader, text_layer=text_layer,
+                image_extractor=image_extractor,
+            )
+        else:
+            # 处理PDF
+            regions = process_pdf_document(**document_options)
 
-    # 初始化图片上传器（如果需要）
-    image_uploader = None
-    if upload_images:
-        image_uploader = default_uploader
+            # 格式化结果，传递输出目录
+            formatted_pages = format_pdf_regions(
+                regions, image_uploader, output_dir=output_dir, text_layer=text_layer,
+                image_extractor=image_extractor,
+            )
+    finally:
+        if text_layer:
+            text_layer.close()
+        if image_extractor:
+            image_extractor.close()
 
-    # 格式化结果，传递输出目录
-    formatted_pages = format_pdf_regions(regions, image_uploader, output_dir=output_dir)
+    vlm_cache = get_vlm_cache()
+    if vlm_cache:
+        cache_stats = vlm_cache.stats()
+        print(f"VLM缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，"
+              f"共 {cache_stats['entries']} 条 ({cache_stats['size'] / 1024 / 1024:.1f}MB)")
     
     # 创建输出目录（如果需要）
     if output_md_path:
@@ -187,13 +476,40 @@ def main():
     parser.add_argument("-d", "--dpi", type=int, default=DEFAULT_CONFIG["DEFAULT_DPI"], 
                         help=f"图像分辨率，默认为{DEFAULT_CONFIG['DEFAULT_DPI']}")
     parser.add_argument("--threshold_lr", type=float, default=DEFAULT_CONFIG["THRESHOLD_LEFT_RIGHT"], 
-                        help=f"左右栏阈值，默认为{DEFAULT_CONFIG['THRESHOLD_LEFT_RIGHT']}")
+                        help=f"左右栏阈值（仅--layout-sorter columns时使用），默认为{DEFAULT_CONFIG['THRESHOLD_LEFT_RIGHT']}")
     parser.add_argument("--threshold_cross", type=float, default=DEFAULT_CONFIG["THRESHOLD_CROSS"], 
-                        help=f"跨栏阈值，默认为{DEFAULT_CONFIG['THRESHOLD_CROSS']}")
+                        help=f"跨栏阈值（仅--layout-sorter columns时使用），默认为{DEFAULT_CONFIG['THRESHOLD_CROSS']}")
+    parser.add_argument("--layout-sorter", choices=["xycut", "columns"], default=DEFAULT_CONFIG["LAYOUT_SORTER"],
+                        help="阅读顺序排序方法：xycut递归XY-cut（支持多栏、侧边栏），columns按左右栏阈值分两栏，"
+                             f"默认为{DEFAULT_CONFIG['LAYOUT_SORTER']}")
+    parser.add_argument("--render-workers", type=int, default=DEFAULT_CONFIG["RENDER_WORKERS"],
+                        help=f"PDF渲染进程数，默认为{DEFAULT_CONFIG['RENDER_WORKERS']}")
+    parser.add_argument("--layout-dpi", type=int, default=DEFAULT_CONFIG["LAYOUT_DPI"],
+                        help="版面分析分辨率，低于--dpi时仅对公式、表格、标题等区域按--dpi重新渲染")
+    parser.add_argument("--layout-batch-size", type=int, default=DEFAULT_CONFIG["LAYOUT_BATCH_SIZE"],
+                        help=f"版面分析每批处理的页数，默认为{DEFAULT_CONFIG['LAYOUT_BATCH_SIZE']}")
+    parser.add_argument("--raster-cache-dir", type=str, default=DEFAULT_CONFIG["RASTER_CACHE_DIR"] or None,
+                        help="页面栅格缓存目录，重复转换同一文档时复用已渲染的页面")
+    parser.add_argument("--vlm-cache", type=str, dest="vlm_cache_path", default=DEFAULT_CONFIG["VLM_CACHE_PATH"] or None,
+                        help="VLM响应缓存(SQLite)文件路径，重复转换同一文档时复用VLM结果")
+    parser.add_argument("--vlm-cache-mode", choices=["use", "refresh", "bypass"], default=DEFAULT_CONFIG["VLM_CACHE_MODE"],
+                        help="VLM缓存模式：use读写缓存，refresh重新请求并覆盖，bypass本次不使用缓存")
+    parser.add_argument("--save-page-images", action="store_true", help="额外保存每页PNG图像（调试用）")
+    parser.add_argument("--save-crops", action="store_true", default=DEFAULT_CONFIG["SAVE_REGION_CROPS"],
+                        help="将区域裁剪图片写入磁盘（调试用，也可降低超长文档的内存占用）")
+    parser.add_argument("--text-layer", action="store_true", default=DEFAULT_CONFIG["USE_TEXT_LAYER"],
+                        help="优先从PDF文本层读取文字（适用于原生数字PDF）")
+    parser.add_argument("--no-embedded-images", action="store_false", dest="embedded_images",
+                        default=DEFAULT_CONFIG["USE_EMBEDDED_IMAGES"],
+                        help="不提取PDF内嵌图片，图片区域始终使用页面裁剪图")
     parser.add_argument(
         "--no-filter", action="store_false", dest="filter_regions", help="不过滤区域"
     )
     parser.add_argument("--upload", action="store_true", help="启用图片上传")
+    parser.add_argument("--offline", action="store_true", default=DEFAULT_CONFIG["OFFLINE_MODE"],
+                        help="离线模式：不请求VLM/LLM，文字和表格区域全部使用本地OCR")
+    parser.add_argument("--pipelined", action="store_true", default=DEFAULT_CONFIG["PIPELINED"],
+                        help="按阶段流水线处理：第N+1页的版面分析与第N页的VLM请求同时进行")
     parser.add_argument("--output-md", type=str, default="output.md", help="Markdown输出文件路径")
     
     # 添加API和模型配置参数
@@ -238,7 +554,20 @@ def main():
         upload_images=args.upload,
         output_md_path=args.output_md,
         api_key=args.api_key,
-        base_url=args.base_url
+        base_url=args.base_url,
+        render_workers=args.render_workers,
+        save_page_images=args.save_page_images,
+        use_text_layer=args.text_layer,
+        layout_dpi=args.layout_dpi,
+        raster_cache_dir=args.raster_cache_dir,
+        use_embedded_images=args.embedded_images,
+        layout_batch_size=args.layout_batch_size,
+        save_crops=args.save_crops,
+        vlm_cache_path=args.vlm_cache_path,
+        vlm_cache_mode=args.vlm_cache_mode,
+        offline=args.offline,
+        pipelined=args.pipelined,
+        layout_sorter=args.layout_sorter,
     )
 
 
@@ -0,0 +1,160 @@
+"""
+异步多模态请求层 - 一个文档的所有VLM请求共用一个AsyncOpenAI客户端(连接池保持长连接)，
+用信号量限制同时进行的请求数，并按提交顺序返回结果。
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from x_pdf2md.config import get_config, get_model_config
+from x_pdf2md.image2md.image2text import image_source_to_url
+from x_pdf2md.image2md.vlm_cache import VLMCache, get_vlm_cache
+
+T = TypeVar("T")
+
+
+class AsyncVLMClient:
+    """
+    共享的异步多模态客户端，限制同时进行的请求数。
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        max_concurrency: int = None,
+        timeout: float = None,
+    ):
+        """
+        初始化 AsyncVLMClient 实例。
+
+        :param api_key: API 密钥，如果未提供则从环境变量中读取
+        :param base_url: API 基础 URL，None则使用配置BASE_URL
+        :param max_concurrency: 同时进行的请求数上限，None则使用配置VLM_MAX_CONCURRENCY
+        :param timeout: 单个请求的超时时间(秒)，None则使用配置VLM_TIMEOUT
+        """
+        load_dotenv()
+        config = get_config()
+        api_key = api_key or os.getenv("API_KEY")
+        if not api_key:
+            raise ValueError("API key is required")
+
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or config["BASE_URL"],
+            timeout=timeout or config["VLM_TIMEOUT"],
+        )
+        self.max_concurrency = max(1, max_concurrency or config["VLM_MAX_CONCURRENCY"])
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def extract_image_text(
+        self,
+        image_source,
+        prompt: str,
+        model: str = None,
+        detail: str = "low",
+        temperature: float = 0.1,
+    ) -> str:
+        """
+        发送一个图片+提示词的请求并返回完整的模型输出。
+
+        :param image_source: BGR像素数组、本地图像路径或图像URL
+        :param prompt: 提示文本
+        :param model: 使用的模型名称，None则使用配置VLM_MODEL
+        :param detail: 细节级别，允许值为 'low', 'high', 'auto'
+        :param temperature: 生成文本的温度参数
+        :return: 模型输出文本
+        """
+        return await self.extract_images_text([image_source], prompt, model, detail, temperature)
+
+    async def extract_images_text(
+        self,
+        image_sources: List,
+        prompt: str,
+        model: str = None,
+        detail: str = "low",
+        temperature: float = 0.1,
+    ) -> str:
+        """
+        在一个请求中发送多张图片（按顺序作为多个image_url部分）和提示词，返回完整的模型输出。
+
+        :param image_sources: BGR像素数组、本地图像路径或图像URL的列表
+        :param prompt: 提示文本
+        :param model: 使用的模型名称，None则使用配置VLM_MODEL
+        :param detail: 细节级别，允许值为 'low', 'high', 'auto'
+        :param temperature: 生成文本的温度参数
+        :return: 模型输出文本
+        """
+        if detail not in ["low", "high", "auto"]:
+            raise ValueError(
+                "Invalid detail value. Allowed values are 'low', 'high', 'auto'"
+            )
+        if detail == "auto":
+            detail = "low"
+
+        model = model or get_model_config('vlm')
+        image_urls = [image_source_to_url(image_source, detail) for image_source in image_sources]
+
+        # 相同图片、提示词和参数的请求直接使用缓存结果
+        cache = get_vlm_cache()
+        cache_key = None
+        if cache is not None:
+            cache_key = VLMCache.make_key(model, prompt, "\n".join(image_urls), detail, temperature)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = [
+            {"type": "image_url", "image_url": {"url": image_url, "detail": detail}}
+            for image_url in image_urls
+        ]
+        content.append({"type": "text", "text": prompt})
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": content}],
+                temperature=temperature,
+            )
+        result = response.choices[0].message.content or ""
+        if cache is not None:
+            cache.put(cache_key, result)
+        return result
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+def run_concurrently(
+    jobs: List[Callable[[AsyncVLMClient], Awaitable[T]]],
+    api_key: str = None,
+    max_concurrency: Optional[int] = None,
+) -> List[T]:
+    """
+    用一个共享客户端并发执行一组VLM任务，结果顺序与jobs一致。
+
+    参数:
+        jobs: 任务列表，每个任务接收共享客户端并返回协程
+        api_key: API 密钥，None则从环境变量读取
+        max_concurrency: 同时进行的请求数上限，None则使用配置
+
+    返回:
+        与jobs一一对应的结果列表
+    """
+    if not jobs:
+        return []
+
+    async def _run() -> List[T]:
+        async with AsyncVLMClient(api_key=api_key, max_concurrency=max_concurrency) as client:
+            return await asyncio.gather(*(job(client) for job in jobs))
+
+    return asyncio.run(_run())
@@ -1,6 +1,12 @@
 from openai import OpenAI
 from dotenv import load_dotenv
+import json
 import os
+import re
+from typing import List, Optional
+
+from x_pdf2md.config import get_config
+from x_pdf2md.image2md.vlm_cache import VLMCache, get_vlm_cache
 
 load_dotenv()
 
@@ -34,26 +40,51 @@ USER_PROMPT_TEMPLATE = """基于以下图像描述，提供一个简洁、专业
 直接输出标题（5-15字）："""
 
 
-def get_image_title(image_description, api_key=None):
+BATCH_USER_PROMPT_TEMPLATE = """以下是同一文档中{count}张图像的描述，请按上述要求分别为每张图像提供一个简洁、专业的标题（5-15字）：
+----
+{descriptions}
+----
+只输出一个JSON字符串数组，按描述的顺序包含全部{count}个标题，例如["标题1", "标题2"]："""
+
+
+# 按(API密钥, 基础URL)复用的客户端，避免每次生成标题都新建连接池
+_clients = {}
+
+
+def _get_client(api_key: Optional[str] = None) -> OpenAI:
+    """获取标题模型的客户端"""
+    api_key = api_key or os.getenv("API_KEY")
+    base_url = get_config()["TITLE_BASE_URL"]
+    key = (api_key, base_url)
+    if key not in _clients:
+        _clients[key] = OpenAI(api_key=api_key, base_url=base_url)
+    return _clients[key]
+
+
+def _complete(user_prompt: str, api_key: Optional[str] = None) -> str:
     """
-    使用硅基流动的deepseek v3 为多模态提取的图片描述生成图片的标题。
+    请求标题模型（相同提示词的结果直接使用缓存）
 
     参数:
-        image_description (str): 图像的描述文本
-        api_key (str): 您的OpenAI API密钥
+        user_prompt: 用户提示词
+        api_key: API密钥
 
     返回:
-        str: 为图像生成的标题
+        str: 模型输出
     """
+    model = get_config()["TITLE_MODEL"]
 
-    if not api_key:
-        api_key = os.getenv("API_KEY")
-    # 使用Silicon Flow基础URL初始化客户端
-    client = OpenAI(api_key=api_key, base_url="https://api.siliconflow.com/v1")
+    cache = get_vlm_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = VLMCache.make_key(model, SYSTEM_PROMPT + user_prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     # 发送API请求
-    response = client.chat.completions.create(
-        model="deepseek-ai/DeepSeek-V3",
+    response = _get_client(api_key).chat.completions.create(
+        model=model,
         messages=[
             {
                 "role": "system",
@@ -61,14 +92,85 @@ def get_image_title(image_description, api_key=None):
             },
             {
                 "role": "user",
-                "content": USER_PROMPT_TEMPLATE.format(description=image_description),
+                "content": user_prompt,
             },
         ],
     )
 
-    # 提取并返回标题
-    title = response.choices[0].message.content.strip()
-    return title
+    result = response.choices[0].message.content.strip()
+    if cache is not None:
+        cache.put(cache_key, result)
+    return result
+
+
+def get_image_title(image_description, api_key=None):
+    """
+    使用配置的文本模型（默认硅基流动的deepseek v3）为多模态提取的图片描述生成图片的标题。
+
+    参数:
+        image_description (str): 图像的描述文本
+        api_key (str): 您的OpenAI API密钥
+
+    返回:
+        str: 为图像生成的标题
+    """
+    return _complete(USER_PROMPT_TEMPLATE.format(description=image_description), api_key)
+
+
+def parse_title_list(text: str, count: int) -> Optional[List[str]]:
+    """
+    解析批量标题请求的输出
+
+    参数:
+        text: 模型输出
+        count: 期望的标题数
+
+    返回:
+        标题列表；不是长度为count的JSON字符串数组时返回None
+    """
+    match = re.search(r"\[.*\]", text or "", re.S)
+    if not match:
+        return None
+    try:
+        titles = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(titles, list) or len(titles) != count:
+        return None
+    return [str(title).strip() for title in titles]
+
+
+def get_image_titles(image_descriptions: List[str], api_key=None) -> List[str]:
+    """
+    在一个请求中为多张图片的描述生成标题（按TITLE_BATCH_SIZE分批），
+    输出无法解析时退回逐张生成。
+
+    参数:
+        image_descriptions (List[str]): 图像的描述文本列表
+        api_key (str): 您的OpenAI API密钥
+
+    返回:
+        List[str]: 与image_descriptions一一对应的标题
+    """
+    batch_size = max(1, get_config()["TITLE_BATCH_SIZE"])
+    titles = []
+    for start in range(0, len(image_descriptions), batch_size):
+        batch = image_descriptions[start:start + batch_size]
+        if len(batch) == 1:
+            titles.append(get_image_title(batch[0], api_key))
+            continue
+        descriptions = "\n".join(
+            f"{index}. {' '.join(description.split())}" for index, description in enumerate(batch, 1)
+        )
+        result = _complete(
+            BATCH_USER_PROMPT_TEMPLATE.format(count=len(batch), descriptions=descriptions), api_key
+        )
+        batch_titles = parse_title_list(result, len(batch))
+        if batch_titles is None:
+            print(f"批量标题输出无法解析，改为逐张生成 {len(batch)} 个标题")
+            batch_titles = [get_image_title(description, api_key) for description in batch]
+        titles.extend(batch_titles)
+    return titles
 
 
 if __name__ == "__main__":
@@ -53,7 +53,9 @@
 - 提取的 Markdown 格式文本会保留图像中的结构和公式，适用于文档集成。
 
 """
-from x_pdf2md.config import get_model_config
+from x_pdf2md.config import get_config, get_model_config
+from x_pdf2md.image2md.image_encoding import encode_image_data_url
+from x_pdf2md.image2md.vlm_cache import VLMCache, get_vlm_cache
 
 _prompt = """
 你是一个可以识别图片的AI，你可以基于图片与用户进行友好的对话。
@@ -64,6 +66,9 @@ from dotenv import load_dotenv
 import os
 import base64
 
+import cv2
+import numpy as np
+
 
 def extract_markdown_content(text: str) -> str:
     """
@@ -118,6 +123,55 @@ def image_to_base64(image_path: str) -> str:
     return encoded_string
 
 
+def array_to_data_url(image: np.ndarray) -> str:
+    """
+    将BGR像素数组编码为PNG格式的Base64数据URL（在内存中完成，不写临时文件）。
+
+    参数:
+    image (np.ndarray): BGR像素数组。
+
+    返回:
+    str: data:image/png;base64,... 格式的字符串。
+    """
+    ok, buffer = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("Failed to encode image array")
+    return f"data:image/png;base64,{base64.b64encode(buffer).decode('utf-8')}"
+
+
+def image_source_to_url(image_source, detail: str = "low") -> str:
+    """
+    将识别输入转换为可放入image_url的地址。
+
+    启用VLM_IMAGE_ENCODING时，像素数组和本地图像会先按细节级别缩放到模型实际使用的分辨率，
+    再按内容选择PNG或JPEG/WebP编码；否则原样上传。
+
+    参数:
+    image_source: BGR像素数组、本地图像路径、HTTP(S) URL或data URL。
+    detail: 细节级别，'low'或'high'。
+
+    返回:
+    str: HTTP(S) URL或Base64数据URL。
+    """
+    encode = get_config()["VLM_IMAGE_ENCODING"]
+    if isinstance(image_source, np.ndarray):
+        return encode_image_data_url(image_source, detail) if encode else array_to_data_url(image_source)
+    if image_source.startswith(("http://", "https://", "data:image")):
+        return image_source
+    if not os.path.exists(image_source):
+        raise FileNotFoundError(f"The file {image_source} does not exist.")
+    if encode:
+        image = cv2.imread(image_source)
+        # OpenCV无法解码的格式（如GIF）按原始文件上传
+        if image is not None:
+            return encode_image_data_url(image, detail)
+    from PIL import Image
+
+    with Image.open(image_source) as img:
+        image_extension = img.format.lower()
+    return f"data:image/{image_extension};base64,{image_to_base64(image_source)}"
+
+
 class ImageTextExtractor:
     """
     图像文本提取器类，用于将图像内容转换为 Markdown 格式的文本。
@@ -172,12 +226,14 @@ class ImageTextExtractor:
         detail: str = "low",
         prompt: str = None,
         temperature: float = 0.1,
+        image: np.ndarray = None,
     ) -> str:
         """
         提取图像中的文本并转换为 Markdown 格式。
 
         :param image_url: 图像的 URL
         :param local_image_path: 本地图像文件路径
+        :param image: 内存中的BGR像素数组
         :param model: 使用的模型名称
         :param detail: 细节级别，允许值为 'low', 'high', 'auto'
         :param prompt: 提示文本
@@ -187,8 +243,19 @@ class ImageTextExtractor:
         """
         if model is None:
             model = get_model_config('vlm')
+
+        if detail not in ["low", "high", "auto"]:
+            raise ValueError(
+                "Invalid detail value. Allowed values are 'low', 'high', 'auto'"
+            )
+
+        if detail == "auto":
+            detail = "low"
+
+        if image is not None:
+            image_url = image_source_to_url(image, detail)
         if not image_url and not local_image_path:
-            raise ValueError("Either image_url or local_image_path is required")
+            raise ValueError("Either image_url, local_image_path or image is required")
 
         if image_url and not (
             image_url.startswith("http://")
@@ -200,23 +267,19 @@ class ImageTextExtractor:
             )
 
         if local_image_path:
-            if not os.path.exists(local_image_path):
-                raise FileNotFoundError(f"The file {local_image_path} does not exist.")
-            image_extension: str = self._get_image_extension(local_image_path)
-            with open(local_image_path, "rb") as image_file:
-                base64_image: str = base64.b64encode(image_file.read()).decode("utf-8")
-                image_url = f"data:image/{image_extension};base64,{base64_image}"
-
-        if detail not in ["low", "high", "auto"]:
-            raise ValueError(
-                "Invalid detail value. Allowed values are 'low', 'high', 'auto'"
-            )
-
-        if detail == "auto":
-            detail = "low"
+            image_url = image_source_to_url(local_image_path, detail)
 
         prompt = prompt or self._prompt
 
+        # 相同图片、提示词和参数的请求直接使用缓存结果
+        cache = get_vlm_cache()
+        cache_key = None
+        if cache is not None:
+            cache_key = VLMCache.make_key(model, prompt, image_url, detail, temperature)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             response = self.client.chat.completions.create(
                 model=model,
@@ -240,6 +303,8 @@ class ImageTextExtractor:
             for chunk in response:
                 chunk_message: str = chunk.choices[0].delta.content
                 result += chunk_message
+            if cache is not None:
+                cache.put(cache_key, result)
             return result
         except Exception as e:
             raise RuntimeError(f"Failed to extract text from image: {e}")
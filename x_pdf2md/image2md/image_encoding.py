@@ -0,0 +1,134 @@
+"""
+VLM图片编码模块 - 上传前按细节级别把图片缩放到模型实际使用的分辨率，
+并按内容选择编码格式：线条图/文字(背景干净、颜色少)用PNG，照片类用JPEG或WebP。
+全部在内存中完成，不写临时文件。
+"""
+import base64
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from x_pdf2md.config import get_config
+
+# 编码格式对应的MIME类型
+_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".webp": "image/webp"}
+
+
+def target_size(width: int, height: int, detail: str) -> Tuple[int, int]:
+    """
+    计算指定细节级别下模型实际使用的图片尺寸（只缩小，不放大）
+
+    low: 最长边不超过VLM_LOW_DETAIL_MAX_SIDE；
+    high: 先缩放到VLM_HIGH_DETAIL_MAX_SIDE以内，再使最短边不超过VLM_HIGH_DETAIL_SHORT_SIDE。
+
+    参数:
+        width: 原始宽度
+        height: 原始高度
+        detail: 细节级别，'low'或'high'
+
+    返回:
+        (宽度, 高度)
+    """
+    config = get_config()
+    if detail == "high":
+        scale = min(1.0, config["VLM_HIGH_DETAIL_MAX_SIDE"] / max(width, height))
+        scale = min(scale, config["VLM_HIGH_DETAIL_SHORT_SIDE"] / max(1, min(width, height)))
+    else:
+        scale = min(1.0, config["VLM_LOW_DETAIL_MAX_SIDE"] / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def is_line_art(image: np.ndarray) -> bool:
+    """
+    判断图片是否为线条图/文字类内容（适合无损PNG），否则视为照片类内容
+
+    参数:
+        image: BGR或灰度像素数组
+
+    返回:
+        bool: True表示线条图/文字
+    """
+    # 在缩小的图上统计，避免大图耗时
+    step = max(1, max(image.shape[:2]) // 256)
+    sample = image[::step, ::step]
+    gray = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY) if sample.ndim == 3 else sample
+
+    # 文字和线条图以接近纯色的背景和笔画为主，中间调像素只出现在边缘
+    midtones = np.count_nonzero((gray > 32) & (gray < 224)) / gray.size
+    if midtones < 0.3:
+        return True
+
+    # 色块填充的图表：少数几种颜色覆盖了绝大部分像素
+    pixels = sample.reshape(-1, sample.shape[2] if sample.ndim == 3 else 1) >> 4
+    _, counts = np.unique(pixels, axis=0, return_counts=True)
+    top_colors = np.sort(counts)[::-1][:8].sum()
+    return top_colors / len(pixels) >= 0.8
+
+
+def is_grayscale(image: np.ndarray) -> bool:
+    """判断BGR图片是否实际上没有颜色（各通道几乎相等）"""
+    if image.ndim == 2:
+        return True
+    step = max(1, max(image.shape[:2]) // 256)
+    sample = image[::step, ::step].astype(np.int16)
+    spread = sample.max(axis=2) - sample.min(axis=2)
+    return np.count_nonzero(spread > 12) / spread.size < 0.01
+
+
+def encode_image(image: np.ndarray, detail: str = "low") -> Tuple[bytes, str]:
+    """
+    按细节级别缩放并选择格式编码图片
+
+    参数:
+        image: BGR像素数组
+        detail: 细节级别，'low'或'high'
+
+    返回:
+        (编码后的字节, MIME类型)
+    """
+    height, width = image.shape[:2]
+    size = target_size(width, height, detail)
+    if size != (width, height):
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    if is_grayscale(image) and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    config = get_config()
+    if is_line_art(image):
+        extension, params = ".png", [cv2.IMWRITE_PNG_COMPRESSION, 9]
+    elif config["VLM_PHOTO_FORMAT"] == "webp":
+        extension, params = ".webp", [cv2.IMWRITE_WEBP_QUALITY, config["VLM_PHOTO_QUALITY"]]
+    else:
+        extension, params = ".jpg", [cv2.IMWRITE_JPEG_QUALITY, config["VLM_PHOTO_QUALITY"]]
+
+    ok, buffer = cv2.imencode(extension, image, params)
+    if not ok:
+        raise ValueError("Failed to encode image array")
+    return buffer.tobytes(), _MIME_TYPES[extension]
+
+
+def encode_image_data_url(image: np.ndarray, detail: str = "low") -> str:
+    """
+    将BGR像素数组编码为上传用的Base64数据URL
+
+    参数:
+        image: BGR像素数组
+        detail: 细节级别，'low'或'high'
+
+    返回:
+        data:<MIME类型>;base64,... 格式的字符串
+    """
+    data, mime_type = encode_image(image, detail)
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+if __name__ == "__main__":
+    # 使用示例：对比原始PNG与编码后的大小
+    import sys
+
+    source = cv2.imread(sys.argv[1] if len(sys.argv) > 1 else "car.png")
+    ok, raw = cv2.imencode(".png", source)
+    for level in ("low", "high"):
+        data, mime = encode_image(source, level)
+        print(f"{level}: {len(raw.tobytes()) / 1024:.1f}KB PNG -> {len(data) / 1024:.1f}KB {mime}")
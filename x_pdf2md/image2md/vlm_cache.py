@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+VLM响应缓存模块 - 按图片内容哈希、提示词、模型、细节级别和温度缓存模型输出
+
+缓存保存在SQLite数据库中（WAL模式），多个进程可以同时读写同一个缓存文件；
+读取时更新最后访问时间，总大小超过上限时按最近最少使用(LRU)顺序淘汰。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from x_pdf2md.config import get_config
+
+# 缓存模式：use(读写缓存) / refresh(不读取旧结果，重新请求后写入) / bypass(完全不使用缓存)
+CACHE_MODES = ("use", "refresh", "bypass")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class VLMCache:
+    """基于SQLite的VLM响应缓存"""
+
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024, refresh: bool = False):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_bytes: 缓存响应总大小上限（字节）
+            refresh: 为True时不读取已有结果（仍写入新结果），用于强制刷新
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # sqlite3连接不能跨线程使用，每个线程持有自己的连接
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """当前线程的数据库连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 其他进程写入时最多等待30秒；自动提交模式，写事务显式开启
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, image: str = "", detail: str = "",
+                 temperature: Optional[float] = None) -> str:
+        """
+        计算缓存键
+
+        Args:
+            model: 模型名称
+            prompt: 完整的提示文本
+            image: 请求中的图片（Base64数据URL或图片URL），纯文本请求为空
+            detail: 图片细节级别
+            temperature: 温度参数
+
+        Returns:
+            十六进制SHA-256哈希字符串
+        """
+        image_hash = hashlib.sha256(image.encode("utf-8")).hexdigest() if image else ""
+        payload = json.dumps(
+            [model, prompt, image_hash, detail, temperature], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的模型输出
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            模型输出；未命中或处于刷新模式时返回None
+        """
+        value = None
+        if not self.refresh:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = row[0]
+                # 更新访问时间，用于LRU淘汰
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        写入模型输出，总大小超过上限时淘汰最久未使用的缓存项
+
+        Args:
+            key: 缓存键
+            value: 模型输出（空结果不缓存）
+        """
+        if not value:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            print(f"写入VLM缓存失败: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return
+        with self._stats_lock:
+            self.writes += 1
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """按LRU顺序删除缓存项，直到总大小不超过上限（在写事务内调用）"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存统计
+
+        Returns:
+            dict: hits(命中)、misses(未命中)、writes(写入)、entries(缓存项数)、size(缓存总大小)
+        """
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "entries": entries,
+            "size": size,
+        }
+
+    def close(self) -> None:
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 进程内共享的缓存实例，按(路径, 模式)复用
+_caches: Dict[tuple, VLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_vlm_cache() -> Optional[VLMCache]:
+    """
+    按配置获取VLM缓存
+
+    Returns:
+        缓存实例；未配置VLM_CACHE_PATH或模式为bypass时返回None
+    """
+    config = get_config()
+    path = config["VLM_CACHE_PATH"]
+    mode = config["VLM_CACHE_MODE"]
+    if mode not in CACHE_MODES:
+        raise ValueError(f"未知的VLM缓存模式: {mode}")
+    if not path or mode == "bypass":
+        return None
+    key = (os.path.abspath(path), mode)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = VLMCache(
+                path, max_bytes=config["VLM_CACHE_MAX_MB"] * 1024 * 1024, refresh=mode == "refresh"
+            )
+        return _caches[key]
+
+
+if __name__ == "__main__":
+    # 使用示例
+    cache = VLMCache("./vlm_cache/responses.sqlite", max_bytes=10 * 1024 * 1024)
+    key = VLMCache.make_key("Qwen/Qwen2.5-VL-72B-Instruct", "描述图片", "data:image/png;base64,AAAA", "low", 0.1)
+    print(cache.get(key))
+    cache.put(key, "一张示例图片")
+    print(cache.get(key), cache.stats())
@@ -1,5 +1,13 @@
 from .image2text import ImageTextExtractor, extract_markdown_content
+from x_pdf2md.config import get_config
+from .async_vlm import AsyncVLMClient, run_concurrently
+import asyncio
+import json
 import os
+import re
+from typing import Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 # 定义提示词
 ocr_prompt = """
@@ -39,14 +47,46 @@ description_prompt = """
 "这是一张[图像类型]，展示了[主要内容]。包含[关键信息]。[其他相关细节]。"
 """
 
+description_title_prompt = description_prompt + """
+## 标题
+
+同时为图像生成一个简短、准确且具有描述性的标题（5-15字），突出图像的核心主题，
+不要包含"这是"、"这张图片"等冗余词语，学术或技术图像保留专业术语。
+
+## 输出格式
+
+只输出一个JSON对象，不要输出其他内容：
+{"title": "图像标题", "description": "图像描述"}
+"""
+
+packed_ocr_prompt = """
+上面按顺序给出了{count}张图片，它们是同一页PDF中的不同区域。
+使用OCR的模式分别提取每张图片中的文本内容，并转换为Markdown格式。
+每张图片的结果前单独一行写分隔标记 ===IMAGE n===（n为图片序号，从1开始），按图片顺序输出全部{count}个结果。
+注意：不要输出图片以外的内容，不要合并或省略任何一张图片。
+其中表格输出为Markdown格式，或者html格式，公式输出为带有$或者$$风格的LaTeX格式。
+"""
+
+# 合并请求输出中每张图片结果前的分隔标记
+_PACK_MARKER = re.compile(r"^[ \t]*=+[ \t]*IMAGE[ \t]+(\d+)[ \t]*=+[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
 extract_table_prompt = """
 提取图片当中的表格，并输出为支持markdown格式的html语法。
 注意：不要输出图片以外的内容。
 """
 
 
+def _finish_result(result: str, post_process_func=None) -> str:
+    """对模型输出做与同步接口一致的后处理"""
+    if not result.strip():
+        return "No content extracted from the image"
+    if post_process_func:
+        return post_process_func(result)
+    return extract_markdown_content(result)
+
+
 def _process_image_with_model(
-    image_path: str,
+    image_path: Union[str, np.ndarray],
     model: str,
     prompt_path: str = None,
     prompt_text: str = None,
@@ -54,7 +94,7 @@ def _process_image_with_model(
     detail: str = "low",
     post_process_func = None
 ) -> str:
-    """处理图像并返回模型输出的基础函数"""
+    """处理图像（图片路径或BGR像素数组）并返回模型输出的基础函数"""
     if api_key is None:
         api_key = os.getenv("API_KEY")
     
@@ -65,22 +105,36 @@ def _process_image_with_model(
     )
 
     try:
-        result = extractor.extract_image_text(
-            local_image_path=image_path, model=model, detail=detail
-        )
-        
-        if not result.strip():
-            return "No content extracted from the image"
+        if isinstance(image_path, np.ndarray):
+            result = extractor.extract_image_text(image=image_path, model=model, detail=detail)
+        else:
+            result = extractor.extract_image_text(
+                local_image_path=image_path, model=model, detail=detail
+            )
         
-        if post_process_func:
-            return post_process_func(result)
-        return extract_markdown_content(result)
+        return _finish_result(result, post_process_func)
+    except Exception as e:
+        return f"Error processing image: {str(e)}"
+
+
+async def _aprocess_image_with_model(
+    client: AsyncVLMClient,
+    image_path: Union[str, np.ndarray],
+    model: str,
+    prompt_text: str,
+    detail: str = "low",
+    post_process_func = None
+) -> str:
+    """_process_image_with_model的异步版本，使用共享的异步客户端"""
+    try:
+        result = await client.extract_image_text(image_path, prompt_text, model=model, detail=detail)
+        return _finish_result(result, post_process_func)
     except Exception as e:
         return f"Error processing image: {str(e)}"
 
 
 def extract_text_from_image(
-    image_path: str,
+    image_path: Union[str, np.ndarray],
     model: str = None,
     ocr_prompt_path: str = None,
     api_key: str = None,
@@ -97,7 +151,7 @@ def extract_text_from_image(
 
 
 def describe_image(
-    image_path: str,
+    image_path: Union[str, np.ndarray],
     model: str = None,
     description_prompt_path: str = None,
     api_key: str = None,
@@ -113,6 +167,57 @@ def describe_image(
     )
 
 
+def parse_description_title(result: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    解析描述+标题合并请求的JSON输出
+
+    参数:
+        result: 模型输出
+
+    返回:
+        (描述, 标题)；标题缺失时为None，输出不是包含描述的JSON对象时返回None
+    """
+    match = re.search(r"\{.*\}", result or "", re.S)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    description = str(data.get("description") or "").strip()
+    title = str(data.get("title") or "").strip()
+    if not description:
+        return None
+    return description, title or None
+
+
+def split_description_title(result: str) -> Tuple[str, Optional[str]]:
+    """将合并请求的输出拆分为(描述, 标题)，无法解析时整段作为描述、标题为None"""
+    parsed = parse_description_title(result)
+    if parsed is None:
+        return extract_markdown_content(result), None
+    return parsed
+
+
+def describe_image_with_title(
+    image_path: Union[str, np.ndarray],
+    model: str = None,
+    api_key: str = None,
+) -> Tuple[str, Optional[str]]:
+    """一次请求同时生成图像描述和标题，返回(描述, 标题)，标题无法解析时为None"""
+    result = _process_image_with_model(
+        image_path=image_path,
+        model=model,
+        prompt_text=description_title_prompt,
+        api_key=api_key,
+        detail="low",
+        post_process_func=str.strip
+    )
+    return split_description_title(result)
+
+
 def process_table_content(result):
     """处理表格内容"""
     table_content = extract_markdown_content(result)
@@ -126,7 +231,7 @@ def process_table_content(result):
 
 
 def extract_table_from_image(
-    image_path: str,
+    image_path: Union[str, np.ndarray],
     model: str = None,
     extract_table_prompt_path: str = None,
     api_key: str = None,
@@ -143,6 +248,150 @@ def extract_table_from_image(
     )
 
 
+# 并发任务类型: (提示词, 细节级别, 后处理函数)
+VLM_TASKS = {
+    "text": (ocr_prompt, "low", None),
+    "description": (description_prompt, "low", None),
+    # 输出为JSON原文，由split_description_title拆分
+    "description_title": (description_title_prompt, "low", str.strip),
+    "table": (extract_table_prompt, "high", process_table_content),
+}
+
+
+def process_images_concurrently(
+    tasks: List[Tuple[str, Union[str, np.ndarray]]],
+    model: str = None,
+    api_key: str = None,
+    max_concurrency: int = None,
+    pack_keys: Optional[List[Optional[Hashable]]] = None,
+    pack_size: int = None,
+) -> List[str]:
+    """
+    并发处理一组图像，共用一个异步客户端，结果顺序与tasks一致
+
+    参数:
+        tasks: (任务类型, 图片路径或BGR像素数组)列表，任务类型为VLM_TASKS的键
+        model: 使用的模型名称，None则使用配置VLM_MODEL
+        api_key: API 密钥，None则从环境变量读取
+        max_concurrency: 同时进行的请求数上限，None则使用配置VLM_MAX_CONCURRENCY
+        pack_keys: 与tasks对应的合并分组键（如页码），键相同的文字任务合并为一个多图请求，
+            None表示该任务不参与合并
+        pack_size: 每个合并请求最多包含的图片数，None则使用配置VLM_PACK_SIZE，1表示不合并
+
+    返回:
+        与tasks一一对应的处理结果，与同步接口的返回值一致
+    """
+    if pack_size is None:
+        pack_size = get_config()["VLM_PACK_SIZE"]
+
+    def make_job(group):
+        if len(group) > 1:
+            return lambda client: _aprocess_packed_text(
+                client, [tasks[index][1] for index in group], model
+            )
+        kind, image_path = tasks[group[0]]
+        prompt_text, detail, post_process_func = VLM_TASKS[kind]
+
+        async def job(client):
+            return [await _aprocess_image_with_model(
+                client, image_path, model, prompt_text, detail, post_process_func
+            )]
+        return job
+
+    groups = _pack_tasks(tasks, pack_keys, pack_size)
+    group_results = run_concurrently(
+        [make_job(group) for group in groups],
+        api_key=api_key,
+        max_concurrency=max_concurrency,
+    )
+
+    results: List[str] = [None] * len(tasks)
+    for group, group_result in zip(groups, group_results):
+        for index, result in zip(group, group_result):
+            results[index] = result
+    return results
+
+
+def split_packed_output(text: str, count: int) -> Optional[List[str]]:
+    """
+    按分隔标记拆分合并请求的输出
+
+    参数:
+        text: 模型输出
+        count: 请求中的图片数
+
+    返回:
+        按图片顺序排列的各图片结果；标记缺失、重复或顺序不对时返回None
+    """
+    markers = list(_PACK_MARKER.finditer(text or ""))
+    if [int(marker.group(1)) for marker in markers] != list(range(1, count + 1)):
+        return None
+    ends = [marker.start() for marker in markers[1:]] + [len(text)]
+    return [text[marker.end():end].strip() for marker, end in zip(markers, ends)]
+
+
+async def _aprocess_packed_text(
+    client: AsyncVLMClient,
+    image_paths: List[Union[str, np.ndarray]],
+    model: str,
+) -> List[str]:
+    """
+    在一个请求中识别多个文字区域，拆分失败时退回逐个区域请求
+
+    参数:
+        client: 共享的异步客户端
+        image_paths: 同一页的区域图片列表
+        model: 使用的模型名称
+
+    返回:
+        与image_paths一一对应的识别结果
+    """
+    try:
+        result = await client.extract_images_text(
+            image_paths, packed_ocr_prompt.format(count=len(image_paths)), model=model, detail="low"
+        )
+        parts = split_packed_output(result, len(image_paths))
+    except Exception as e:
+        print(f"合并请求失败，改为逐个区域请求: {e}")
+        parts = None
+    if parts is not None and all(part.strip() for part in parts):
+        return [_finish_result(part) for part in parts]
+
+    print(f"合并请求的输出无法拆分为 {len(image_paths)} 个结果，改为逐个区域请求")
+    prompt_text, detail, post_process_func = VLM_TASKS["text"]
+    return list(await asyncio.gather(*(
+        _aprocess_image_with_model(client, image_path, model, prompt_text, detail, post_process_func)
+        for image_path in image_paths
+    )))
+
+
+def _pack_tasks(
+    tasks: Sequence[Tuple[str, Union[str, np.ndarray]]],
+    pack_keys: Optional[Sequence[Optional[Hashable]]],
+    pack_size: int,
+) -> List[List[int]]:
+    """
+    将可合并的文字任务按pack_keys分组，每组最多pack_size个，其余任务单独成组
+
+    返回:
+        任务下标分组列表（按每组第一个任务的下标排序）
+    """
+    groups: List[List[int]] = []
+    open_packs = {}
+    for index, (kind, _) in enumerate(tasks):
+        key = pack_keys[index] if pack_keys is not None else None
+        if pack_size <= 1 or kind != "text" or key is None:
+            groups.append([index])
+            continue
+        pack = open_packs.get(key)
+        if pack is None or len(pack) >= pack_size:
+            pack = []
+            open_packs[key] = pack
+            groups.append(pack)
+        pack.append(index)
+    return groups
+
+
 # 测试代码
 if __name__ == "__main__":
     import sys
@@ -28,7 +28,7 @@ import os
 import json
 import cv2
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from abc import ABC, abstractmethod
 
 class TextCropper(ABC):
@@ -116,11 +116,11 @@ class TextAreaCropper:
         """
         self.cropper = cropper if cropper is not None else RectCropper()
     
-    def crop_text_areas(self, image_path: str, json_path: str, output_dir: str, output_format: str = 'png', bg_color: tuple = (255, 255, 255)) -> None:
+    def crop_text_areas(self, image_path: Union[str, np.ndarray], json_path: str, output_dir: str, output_format: str = 'png', bg_color: tuple = (255, 255, 255)) -> None:
         """裁剪图像中检测到的文本区域
 
         Args:
-            image_path: 原始图像路径
+            image_path: 原始图像路径，或已解码的BGR像素数组
             json_path: 检测结果JSON文件路径
             output_dir: 裁剪结果保存目录
             output_format: 输出图像格式，支持'png'(带透明度)和'jpg'(无透明度)等，默认为'png'
@@ -132,8 +132,8 @@ class TextAreaCropper:
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
-        # 读取原始图像
-        image = cv2.imread(image_path)
+        # 读取原始图像（已解码的像素数组直接使用）
+        image = cv2.imread(image_path) if isinstance(image_path, str) else image_path
         if image is None:
             print(f"无法读取图像: {image_path}")
             return
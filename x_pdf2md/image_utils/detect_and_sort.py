@@ -1,47 +1,72 @@
-from typing import Dict, List
+from typing import Dict, List, Union
 import cv2
+import numpy as np
 
-from image_utils.layout_detect import detect_layout
-from image_utils.layout_sorter import LayoutSorter
+from x_pdf2md.image_utils.layout_detect import detect_layout, detect_layout_batch
+from x_pdf2md.image_utils.layout_sorter import create_layout_sorter
 
 
-def detect_and_sort_layout(image_path: str,
+def detect_and_sort_layout(image: Union[str, np.ndarray],
                           output_path: str = "./layout_output/layout_detection.json",
                           threshold_left_right: float = 0.9,
                           threshold_cross: float = 0.3) -> List[Dict]:
     """
     检测图片版面并对检测结果进行排序
-    
+
     Args:
-        image_path: 输入图片路径
+        image: 输入图片路径或BGR像素数组
         output_path: 布局检测结果保存路径
         threshold_left_right: 判定元素属于左/右栏的阈值
         threshold_cross: 判定元素跨栏的阈值
-        
+
     Returns:
         排序后的版面元素列表
     """
-    # 读取图片获取宽度
-    image = cv2.imread(image_path)
+    # 读取图片获取宽度（已解码的像素数组直接使用）
+    if isinstance(image, str):
+        image = cv2.imread(image)
     page_width = image.shape[1]
-    
+
     # 检测版面
-    layout_result = detect_layout(image_path, output_path)
-    
+    layout_result = detect_layout(image, output_path)
+
     # 创建排序器并排序
-    sorter = LayoutSorter(threshold_left_right, threshold_cross)
+    sorter = create_layout_sorter(threshold_left_right, threshold_cross)
     sorted_elements = sorter.sort_layout(layout_result, page_width)
-    
+
     return sorted_elements
 
+
+def detect_and_sort_layout_batch(images: List[np.ndarray],
+                                batch_size: int = 4,
+                                threshold_left_right: float = 0.9,
+                                threshold_cross: float = 0.3) -> List[List[Dict]]:
+    """
+    批量检测多页版面并分别排序
+
+    Args:
+        images: BGR页面像素数组列表
+        batch_size: 版面模型推理的批大小
+        threshold_left_right: 判定元素属于左/右栏的阈值
+        threshold_cross: 判定元素跨栏的阈值
+
+    Returns:
+        与images一一对应的排序后版面元素列表
+    """
+    layout_results = detect_layout_batch(images, batch_size=batch_size)
+
+    # 整批页面一次排序
+    sorter = create_layout_sorter(threshold_left_right, threshold_cross)
+    return sorter.sort_pages(layout_results, [image.shape[1] for image in images])
+
 if __name__ == "__main__":
     # 使用示例
     image_path = "formula_inline.png"
     sorted_result = detect_and_sort_layout(image_path)
     print(f"检测到 {len(sorted_result)} 个已排序的版面元素")
-    
+
     # 添加可视化
-    from image_utils.layout_visualizer import LayoutVisualizer
+    from x_pdf2md.image_utils.layout_visualizer import LayoutVisualizer
     visualizer = LayoutVisualizer()
     visualizer.save_visualization(
         image_path=image_path,
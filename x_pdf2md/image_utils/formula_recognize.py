@@ -4,33 +4,37 @@
 公式识别模块 - 从图像中识别数学公式并转换为LaTeX格式
 """
 
-import json
-import os
-from typing import Optional, Dict, Any
+import math
+from typing import Optional, Dict, Any, List, Union
 
-from x_pdf2md.image_utils.models import get_or_create_model
+import numpy as np
 
+from x_pdf2md.config import get_config, get_model_config
+from x_pdf2md.image_utils.models import get_model, get_or_create_model
+from x_pdf2md.image_utils.result_adapter import result_to_dict, save_debug_json
 
 
-def recognize_formula(input_path: str, output_path: Optional[str] = None) -> str:
+
+def recognize_formula(input_path: Union[str, np.ndarray], output_path: Optional[str] = None,
+                      model_type: str = 'formula') -> str:
     """
     识别图像中的数学公式
     
     Args:
-        input_path: 输入图像路径
-        output_path: 输出结果保存路径(可选)
+        input_path: 输入图像路径或BGR像素数组
+        output_path: 调试模式下识别结果的保存路径(可选)
+        model_type: 模型类型，'formula'(大模型)或'formula_small'(小模型)
     
     Returns:
         str: LaTeX格式的公式文本
     """
-    print(f"处理公式图片: {input_path}")
-    
-    # 确保输出目录存在
-    output_dir = "./UniMERNet_output/" if output_path is None else os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
+    if isinstance(input_path, np.ndarray):
+        print(f"处理公式图片: 内存图像 {input_path.shape[1]}x{input_path.shape[0]}")
+    else:
+        print(f"处理公式图片: {input_path}")
     
     # 获取或创建模型
-    model = get_or_create_model('formula')
+    model = get_or_create_model(model_type)
     
 
     if model is None:
@@ -38,13 +42,11 @@ def recognize_formula(input_path: str, output_path: Optional[str] = None) -> str
 
     output = model.predict(input=input_path, batch_size=1)
 
+    # 直接在内存中转换结果
+    results = {}
     for res in output:
-        res_path = output_path or f"{output_dir}/res.json"
-        res.save_to_json(save_path=res_path)
-
-        # 读取json文件
-        with open(res_path, 'r') as f:
-            results = json.load(f)
+        results = result_to_dict(res)
+        save_debug_json(results, output_path or "./UniMERNet_output/res.json")
 
     rec_formula = results.get("rec_formula", "")
 
@@ -55,6 +57,63 @@ def recognize_formula(input_path: str, output_path: Optional[str] = None) -> str
     return rec_formula
 
 
+def bucket_formula_images(images: List[np.ndarray], batch_size: int) -> List[List[int]]:
+    """
+    按宽高比和尺寸将公式图片分批，同一批内的图片形状相近，减少填充
+
+    宽高比按2的幂分桶（行内短公式、普通公式、长公式分开），桶内按面积排序后
+    每batch_size张切成一批。
+
+    Args:
+        images: BGR像素数组列表
+        batch_size: 每批最多的图片数
+
+    Returns:
+        批次列表，每个批次是images中的下标列表
+    """
+    buckets: Dict[int, List[int]] = {}
+    for index, image in enumerate(images):
+        height, width = image.shape[:2]
+        aspect_ratio = max(width, 1) / max(height, 1)
+        buckets.setdefault(round(math.log2(aspect_ratio)), []).append(index)
+
+    batch_size = max(1, batch_size)
+    batches = []
+    for key in sorted(buckets):
+        indices = sorted(buckets[key], key=lambda i: images[i].shape[0] * images[i].shape[1])
+        for start in range(0, len(indices), batch_size):
+            batches.append(indices[start:start + batch_size])
+    return batches
+
+
+def recognize_formula_batch(
+    images: List[np.ndarray],
+    batch_size: Optional[int] = None,
+    model_name: Optional[str] = None
+) -> List[str]:
+    """
+    批量识别多个公式图片（文档级公式阶段使用），结果全部在内存中返回
+
+    Args:
+        images: 公式区域的BGR像素数组列表
+        batch_size: 每批识别的图片数，None则使用配置FORMULA_BATCH_SIZE
+        model_name: 公式识别模型名称，None则使用配置FORMULA_MODEL
+
+    Returns:
+        List[str]: 与images一一对应的LaTeX公式文本
+    """
+    if not images:
+        return []
+
+    batch_size = batch_size or get_config()["FORMULA_BATCH_SIZE"]
+    model = get_model(model_name or get_model_config('formula'))
+
+    formulas: List[str] = [""] * len(images)
+    for batch in bucket_formula_images(images, batch_size):
+        output = model.predict(input=[images[i] for i in batch], batch_size=len(batch))
+        for index, res in zip(batch, output):
+            formulas[index] = result_to_dict(res).get("rec_formula", "") or ""
+    return formulas
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+公式模型路由 - 按公式复杂度选择识别模型
+
+简单公式（单行、符号少、墨迹稀疏）交给小模型，多行或密集的公式交给大模型；
+小模型的输出看起来被截断时再用大模型重新识别。
+"""
+
+import re
+from typing import Dict, List, Union
+
+import cv2
+import numpy as np
+
+from x_pdf2md.config import get_config, get_model_config
+from x_pdf2md.image_utils.formula_recognize import recognize_formula, recognize_formula_batch
+from x_pdf2md.ocr_utils.ocr_image import count_text_lines
+
+# \left / \right 定界符（排除\leftarrow、\rightarrow等命令）
+_LEFT_PATTERN = re.compile(r"\\left(?![a-zA-Z])")
+_RIGHT_PATTERN = re.compile(r"\\right(?![a-zA-Z])")
+
+
+def estimate_formula_complexity(image: np.ndarray) -> Dict[str, float]:
+    """
+    估计公式图片的复杂度特征
+
+    Args:
+        image: BGR像素数组
+
+    Returns:
+        dict: height(高度)、ink_density(墨迹密度)、components(连通域数)、lines(文字行数)
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if binary.mean() > 0.5:
+        binary = 1 - binary
+
+    # 连通域近似符号数，忽略噪点
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    components = int(np.count_nonzero(stats[1:count, cv2.CC_STAT_AREA] >= 3))
+
+    return {
+        "height": image.shape[0],
+        "ink_density": float(binary.mean()),
+        "components": components,
+        "lines": count_text_lines(image),
+    }
+
+
+def is_simple_formula(features: Dict[str, float]) -> bool:
+    """
+    根据复杂度特征判断是否可以交给小模型
+
+    Args:
+        features: estimate_formula_complexity的返回值
+
+    Returns:
+        bool: True表示简单公式
+    """
+    config = get_config()
+    return (
+        features["lines"] <= 1
+        and features["height"] <= config["FORMULA_SIMPLE_MAX_HEIGHT"]
+        and features["components"] <= config["FORMULA_SIMPLE_MAX_COMPONENTS"]
+        and features["ink_density"] <= config["FORMULA_SIMPLE_MAX_INK"]
+    )
+
+
+def looks_truncated(latex: str, features: Dict[str, float]) -> bool:
+    """
+    判断小模型的输出是否像被截断（为空、括号不配对、以运算符结尾，或相对符号数过短）
+
+    Args:
+        latex: 小模型识别的LaTeX文本
+        features: 公式图片的复杂度特征
+
+    Returns:
+        bool: True表示需要用大模型重新识别
+    """
+    text = latex.strip()
+    if not text:
+        return True
+    if text.count("{") != text.count("}") or len(_LEFT_PATTERN.findall(text)) != len(_RIGHT_PATTERN.findall(text)):
+        return True
+    if text.endswith(("\\", "^", "_", "{", "(", "[", "=", "+", "-")):
+        return True
+    # 去掉空白后的字符数远少于图中符号数时，认为漏识别了一部分
+    min_chars = features["components"] * get_config()["FORMULA_MIN_CHARS_PER_COMPONENT"]
+    return len("".join(text.split())) < min_chars
+
+
+def route_formula(image: Union[str, np.ndarray]) -> str:
+    """
+    按复杂度选择模型识别单个公式
+
+    Args:
+        image: 公式图片路径或BGR像素数组
+
+    Returns:
+        str: LaTeX格式的公式文本
+    """
+    if not get_config()["FORMULA_ROUTING"]:
+        return recognize_formula(input_path=image)
+    if isinstance(image, str):
+        image = cv2.imread(image)
+
+    features = estimate_formula_complexity(image)
+    if is_simple_formula(features):
+        latex = recognize_formula(input_path=image, model_type='formula_small')
+        if not looks_truncated(latex, features):
+            return latex
+        print("小模型输出疑似截断，改用大模型识别")
+    return recognize_formula(input_path=image)
+
+
+def route_formula_batch(images: List[np.ndarray]) -> List[str]:
+    """
+    按复杂度将公式分为两组分别批量识别，小模型输出疑似截断的再批量交给大模型
+
+    Args:
+        images: 公式区域的BGR像素数组列表
+
+    Returns:
+        List[str]: 与images一一对应的LaTeX公式文本
+    """
+    if not get_config()["FORMULA_ROUTING"]:
+        return recognize_formula_batch(images)
+
+    features = [estimate_formula_complexity(image) for image in images]
+    simple = [i for i, feature in enumerate(features) if is_simple_formula(feature)]
+    simple_set = set(simple)
+    complex_ = [i for i in range(len(images)) if i not in simple_set]
+
+    formulas: List[str] = [""] * len(images)
+    small_results = recognize_formula_batch(
+        [images[i] for i in simple], model_name=get_model_config('formula_small')
+    )
+    for index, latex in zip(simple, small_results):
+        if looks_truncated(latex, features[index]):
+            complex_.append(index)
+        else:
+            formulas[index] = latex
+    if simple:
+        print(f"公式路由: {len(simple)} 个简单公式使用小模型，{len(complex_)} 个使用大模型")
+
+    large_results = recognize_formula_batch([images[i] for i in complex_])
+    for index, latex in zip(complex_, large_results):
+        formulas[index] = latex
+    return formulas
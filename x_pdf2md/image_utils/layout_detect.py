@@ -4,13 +4,15 @@
 """
 
 import cv2
-import json
 import os
 import time
-from typing import Dict, List, Any
-from paddlex import create_model
+import numpy as np
+from typing import Dict, List, Any, Optional, Union
 
-from image_utils.layout_config import LayoutConfig
+from x_pdf2md.image_utils.layout_config import LayoutConfig
+from x_pdf2md.image_utils.models import get_model
+from x_pdf2md.image_utils.spatial_index import GridIndex, containment_ratios
+from x_pdf2md.image_utils.result_adapter import is_debug_enabled, result_to_dict, save_debug_json
 from x_pdf2md.config import get_model_config
 
 
@@ -50,6 +52,9 @@ def is_box_inside(box1: List[float], box2: List[float]) -> bool:
 def build_box_hierarchy(boxes: List[Dict]) -> List[Dict]:
     """
     为每个框添加包含关系，并移除嵌套在其他框内部的框
+
+    使用网格空间索引只比较相交的候选框，结果与逐对比较完全一致：
+    每个框归属于按下标顺序第一个包含它的框。
     
     参数:
         boxes: 包含框信息的字典列表，每个字典包含coordinate字段
@@ -63,18 +68,24 @@ def build_box_hierarchy(boxes: List[Dict]) -> List[Dict]:
     # 为每个框添加contains属性
     for i in range(n):
         boxes[i]["contains"] = []
+    if n == 0:
+        return []
+
+    coords = np.array([box["coordinate"] for box in boxes], dtype=np.float64).reshape(n, 4)
+    index = GridIndex(coords)
     
     # 检查每个框是否被其他框包含
     for i in range(n):
-        box1 = boxes[i]["coordinate"]
-        for j in range(n):
-            if i != j:
-                box2 = boxes[j]["coordinate"]
-                if is_box_inside(box1, box2):
-                    is_nested[i] = True
-                    # 将被包含的框添加到外部框的contains列表中
-                    boxes[j]["contains"].append(boxes[i])
-                    break
+        candidates = index.query(coords[i])
+        candidates = candidates[candidates != i]
+        if len(candidates) == 0:
+            continue
+        inside = containment_ratios(coords[i], coords[candidates]) >= 0.8
+        if inside.any():
+            j = int(candidates[np.argmax(inside)])
+            is_nested[i] = True
+            # 将被包含的框添加到外部框的contains列表中
+            boxes[j]["contains"].append(boxes[i])
     
     # 只保留不是嵌套框的框
     result = []
@@ -114,9 +125,16 @@ def calculate_boundary_distance(box1: List[float], box2: List[float]) -> float:
     # 计算欧几里得距离
     return (horizontal_dist ** 2 + vertical_dist ** 2) ** 0.5
 
+def _first_argmin(values: np.ndarray, mask: np.ndarray) -> int:
+    """返回mask为True的位置中values最小值第一次出现的下标"""
+    return int(np.argmin(np.where(mask, values, np.inf)))
+
 def merge_formula_numbers(boxes: List[Dict]) -> List[Dict]:
     """
     将公式序号框融合到最近的公式框中，优先考虑序号左侧的公式框
+
+    每个序号框与所有公式框的对齐判断和距离计算使用NumPy向量化完成；
+    公式框融合后坐标会扩大，同步更新坐标数组，保证后续序号框看到的是融合后的公式框。
     
     参数:
         boxes: 包含框信息的字典列表
@@ -132,15 +150,11 @@ def merge_formula_numbers(boxes: List[Dict]) -> List[Dict]:
     if not formula_number_boxes or not formula_boxes:
         return boxes.copy()
     
-    # 创建结果列表，首先加入除了公式框和公式序号框外的所有框
-    result_boxes = []
-    formula_ids = [id(box) for box in formula_boxes]
-    formula_number_ids = [id(box) for box in formula_number_boxes]
-    
     # 复制非公式和非公式序号的框到结果列表
-    for box in boxes:
-        if id(box) not in formula_ids and id(box) not in formula_number_ids:
-            result_boxes.append(box.copy())
+    result_boxes = [
+        box.copy() for box in boxes
+        if box.get("label") not in ("formula", "formula_number")
+    ]
     
     # 处理公式框，为每个公式框创建副本
     processed_formula_boxes = []
@@ -148,6 +162,10 @@ def merge_formula_numbers(boxes: List[Dict]) -> List[Dict]:
         new_formula_box = formula_box.copy()
         new_formula_box["formula_numbers"] = []
         processed_formula_boxes.append(new_formula_box)
+
+    formula_coords = np.array(
+        [box["coordinate"] for box in processed_formula_boxes], dtype=np.float64
+    ).reshape(-1, 4)
     
     # 对于每个公式序号框，找到最合适的公式框并融合
     for number_box in formula_number_boxes:
@@ -161,98 +179,121 @@ def merge_formula_numbers(boxes: List[Dict]) -> List[Dict]:
         vertical_tolerance = (number_coord[3] - number_coord[1]) * 2  # 序号高度的2倍
         
         # 筛选出垂直方向上大致对齐的公式框
-        aligned_formulas = []
-        for formula_box in processed_formula_boxes:
-            formula_coord = formula_box["coordinate"]
-            formula_center_y = (formula_coord[1] + formula_coord[3]) / 2
-            
-            # 检查垂直方向上是否对齐
-            if abs(formula_center_y - number_center_y) <= vertical_tolerance:
-                aligned_formulas.append(formula_box)
+        formula_center_y = (formula_coords[:, 1] + formula_coords[:, 3]) / 2
+        aligned = np.abs(formula_center_y - number_center_y) <= vertical_tolerance
         
-        # 先尝试找位于序号左侧的公式框（公式在左，序号在右）
-        left_side_formulas = []
-        for formula_box in aligned_formulas:
-            formula_coord = formula_box["coordinate"]
-            formula_right = formula_coord[2]  # 公式框的右边缘
-            
-            # 如果公式框的右边缘在序号框的左边缘的左侧或接近（允许少量重叠）
-            if formula_right <= number_left + (number_coord[2] - number_left) * 0.2:  # 允许20%的重叠
-                left_side_formulas.append(formula_box)
+        # 位于序号左侧的公式框（公式右边缘在序号左边缘左侧或接近，允许20%的重叠）
+        left_side = aligned & (
+            formula_coords[:, 2] <= number_left + (number_coord[2] - number_left) * 0.2
+        )
         
-        closest_formula = None
-        
-        # 如果找到了位于序号左侧的公式框
-        if left_side_formulas:
+        if left_side.any():
             # 选择最近的一个（公式右边缘离序号左边缘最近的）
-            min_distance = float('inf')
-            for formula_box in left_side_formulas:
-                formula_coord = formula_box["coordinate"]
-                formula_right = formula_coord[2]
-                
-                distance = number_left - formula_right
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_formula = formula_box
-        
-        # 如果没有找到位于序号左侧的公式框，则在所有垂直对齐的公式框中选择距离最近的
-        elif aligned_formulas:
-            min_distance = float('inf')
-            for formula_box in aligned_formulas:
-                formula_coord = formula_box["coordinate"]
-                formula_center_x = (formula_coord[0] + formula_coord[2]) / 2
-                number_center_x = (number_coord[0] + number_coord[2]) / 2
-                
-                distance = abs(formula_center_x - number_center_x)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_formula = formula_box
-        
-        # 如果仍然没有找到合适的公式框，退回到使用边界距离
+            closest_index = _first_argmin(number_left - formula_coords[:, 2], left_side)
+        elif aligned.any():
+            # 在所有垂直对齐的公式框中选择水平中心距离最近的
+            formula_center_x = (formula_coords[:, 0] + formula_coords[:, 2]) / 2
+            number_center_x = (number_coord[0] + number_coord[2]) / 2
+            closest_index = _first_argmin(np.abs(formula_center_x - number_center_x), aligned)
         else:
-            min_distance = float('inf')
-            for formula_box in processed_formula_boxes:
-                formula_coord = formula_box["coordinate"]
-                
-                # 使用边界距离替代中心点距离
-                distance = calculate_boundary_distance(formula_coord, number_coord)
-                
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_formula = formula_box
-        
-        if closest_formula:
-            # 融合公式框和公式序号框
-            # 取两个框的并集作为新的公式框
-            closest_formula["coordinate"] = [
-                min(closest_formula["coordinate"][0], number_coord[0]),
-                min(closest_formula["coordinate"][1], number_coord[1]),
-                max(closest_formula["coordinate"][2], number_coord[2]),
-                max(closest_formula["coordinate"][3], number_coord[3])
+            # 退回到使用边界距离（很少出现，逐个计算以保持与calculate_boundary_distance一致）
+            distances = [
+                calculate_boundary_distance(formula_box["coordinate"], number_coord)
+                for formula_box in processed_formula_boxes
             ]
-            
-            # 添加公式序号的详细信息
-            closest_formula["formula_numbers"].append({
-                "coordinate": number_coord,
-                "score": number_box.get("score", 0),
-                "text": number_box.get("text", "")
-            })
+            closest_index = int(np.argmin(distances))
+        
+        closest_formula = processed_formula_boxes[closest_index]
+        # 融合公式框和公式序号框
+        # 取两个框的并集作为新的公式框
+        closest_formula["coordinate"] = [
+            min(closest_formula["coordinate"][0], number_coord[0]),
+            min(closest_formula["coordinate"][1], number_coord[1]),
+            max(closest_formula["coordinate"][2], number_coord[2]),
+            max(closest_formula["coordinate"][3], number_coord[3])
+        ]
+        formula_coords[closest_index] = closest_formula["coordinate"]
+        
+        # 添加公式序号的详细信息
+        closest_formula["formula_numbers"].append({
+            "coordinate": number_coord,
+            "score": number_box.get("score", 0),
+            "text": number_box.get("text", "")
+        })
     
     # 将处理后的公式框添加到结果列表
     result_boxes.extend(processed_formula_boxes)
     
     return result_boxes
 
-def detect_layout(image_path: str, output_path: str = "./layout_output/layout_detection.json", model_name= "PP-DocLayout-L") -> Dict:
+def postprocess_layout(result: Dict) -> Dict:
+    """
+    版面检测结果后处理：过滤标签、合并公式序号、构建框层次结构
+
+    参数:
+        result: 版面模型输出的结果字典，包含boxes字段
+
+    返回:
+        处理后的结果字典
+    """
+    # 过滤掉不需要处理的标签
+    result["boxes"] = [box for box in result["boxes"] if box.get("label") not in LayoutConfig.FILTER_LABELS]
+
+    # 合并公式和公式序号
+    result["boxes"] = merge_formula_numbers(result["boxes"])
+
+    # 构建框层次结构
+    result["boxes"] = build_box_hierarchy(result["boxes"])
+    return result
+
+def detect_layout_batch(
+    images: List[np.ndarray],
+    batch_size: int = 4,
+    model_name: Optional[str] = None,
+    output_dir: str = "./layout_output",
+) -> List[Dict]:
+    """
+    批量检测多页文档的版面布局
+
+    页面先按尺寸排序再送入模型，相同尺寸的页面落在同一批次中，减少批内填充；
+    结果按输入顺序返回，每页分别完成公式序号合并和框层次结构构建。
+
+    参数:
+        images: BGR页面像素数组列表
+        batch_size: 模型推理的批大小
+        model_name: 模型名称，None则使用配置
+        output_dir: 调试模式下中间结果的保存目录
+
+    返回:
+        与images一一对应的版面分析结果列表
+    """
+    if not images:
+        return []
+    if model_name is None:
+        model_name = get_model_config('layout')
+
+    # 按(高, 宽)排序，让尺寸相同的页面组成同一批次
+    order = sorted(range(len(images)), key=lambda i: images[i].shape[:2])
+
+    model = get_model(model_name)
+    output = model.predict([images[i] for i in order], batch_size=batch_size, layout_nms=True)
+
+    results: List[Optional[Dict]] = [None] * len(images)
+    for position, res in enumerate(output):
+        page_index = order[position]
+        result = result_to_dict(res)
+        save_debug_json(result, os.path.join(output_dir, f"layout_detection_batch_{page_index}.json"))
+        results[page_index] = postprocess_layout(result)
+    return results
+
+def detect_layout(image_path: Union[str, np.ndarray], output_path: str = "./layout_output/layout_detection.json", model_name= None) -> Dict:
     """
     检测文档版面布局
 
     参数:
-        image_path: 图像路径
-        output_dir: 输出目录
-        model_name: 模型名称，默认为"PP-DocLayout-L"
+        image_path: 图像路径或BGR像素数组（PaddleX的predict可直接接收数组）
+        output_path: 调试模式下检测结果JSON的保存路径
+        model_name: 模型名称，None则使用配置（默认为"PP-DocLayout-L"）
 
     返回:
         版面分析结果
@@ -260,39 +301,25 @@ def detect_layout(image_path: str, output_path: str = "./layout_output/layout_de
     # 如果model_name为None，从配置中获取
     if model_name is None:
         model_name = get_model_config('layout')
-        
-    # 创建输出目录
+
+    # 设置json输出路径（仅调试模式下保存）
     output_dir = os.path.dirname(output_path)
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 设置json输出路径
     json_path = output_path if output_path.endswith(".json") else os.path.join(output_dir, "layout_detection.json")
 
-    model = create_model(model_name=model_name)
+    model = get_model(model_name)
     output = model.predict(image_path, batch_size=1, layout_nms=True)
 
-    # 保存结果到JSON
+    # 直接在内存中转换结果
     for res in output:
-        res.save_to_json(save_path=json_path)
-        res.save_to_img("./output/layout_result.jpg")
+        result = result_to_dict(res)
+        save_debug_json(result, json_path)
+        if is_debug_enabled():
+            res.save_to_img("./output/layout_result.jpg")
 
-    # 读取JSON文件
-    with open(json_path, "r", encoding="utf-8") as f:
-        result = json.load(f)
-    
-    # 过滤掉不需要处理的标签
-    result["boxes"] = [box for box in result["boxes"] if box.get("label") not in LayoutConfig.FILTER_LABELS]
-    
-    # 合并公式和公式序号
-    result["boxes"] = merge_formula_numbers(result["boxes"])
-    
-    # 构建框层次结构
-    result["boxes"] = build_box_hierarchy(result["boxes"])
-    # json dump到文件，使用json_path并在文件后面加入final标记
-    final_json_path = json_path.replace(".json", "_final.json")
-    print("Final JSON path:", final_json_path)
-    with open(final_json_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    # 过滤标签、合并公式序号、构建框层次结构
+    result = postprocess_layout(result)
+    # 调试模式下保存最终结果，使用json_path并在文件后面加入final标记
+    save_debug_json(result, json_path.replace(".json", "_final.json"))
 
     return result
 
@@ -4,6 +4,10 @@
 import json
 from typing import List, Dict, Optional, Union
 
+import numpy as np
+
+from x_pdf2md.config import get_config
+
 class LayoutSorter:
     """版面布局元素排序处理器"""
     
@@ -97,7 +101,225 @@ class LayoutSorter:
         right_column.sort(key=lambda e: e["coordinate"][1])
         
         return left_column + right_column
-    
+
+    def sort_pages(self, layout_results: List[Union[str, dict]], page_widths: List[float]) -> List[List[Dict]]:
+        """
+        对整篇文档各页的检测结果分别排序
+
+        Args:
+            layout_results: 每页的JSON文件路径或检测结果字典
+            page_widths: 每页的页面宽度
+
+        Returns:
+            每页排序后的元素列表
+        """
+        return [
+            self.sort_layout(layout_result, page_width)
+            for layout_result, page_width in zip(layout_results, page_widths)
+        ]
+
+
+def _projection_groups(starts: np.ndarray, ends: np.ndarray, min_gap: float) -> np.ndarray:
+    """
+    按投影空白将区间分组：把所有区间投影到同一坐标轴上，宽度大于min_gap的空白处切开
+
+    Args:
+        starts: 区间起点数组
+        ends: 区间终点数组
+        min_gap: 最小切分空白宽度
+
+    Returns:
+        每个区间所属分组的编号数组（按坐标从小到大编号）
+    """
+    order = np.argsort(starts, kind="stable")
+    sorted_starts = starts[order]
+    # 前k个区间覆盖到的最远位置
+    covered = np.maximum.accumulate(ends[order])
+    # 下一个区间的起点超过已覆盖范围一定距离，说明这里有一条空白
+    is_cut = sorted_starts[1:] > covered[:-1] + min_gap
+    groups = np.empty(len(starts), dtype=np.int64)
+    groups[order] = np.concatenate(([0], np.cumsum(is_cut)))
+    return groups
+
+
+class XYCutSorter(LayoutSorter):
+    """
+    递归XY-cut阅读顺序排序器
+
+    先尝试按竖直空白把元素切成若干栏（从左到右），切不开时再按水平空白切成若干横条（从上到下），
+    对每一部分递归处理。栏间空白对齐的相邻多栏横条会合并后再切栏，这样段落间距恰好对齐的两栏正文
+    仍按“先左栏后右栏”的顺序读取；单栏横条（跨栏的标题、图片，或单栏正文中的窄行）作为分隔，
+    只有完全落在上方多栏横条某一栏内的单栏横条才并入该栏（左右栏长度不一致的情况）。
+    支持任意栏数、栏间跨栏元素和侧边栏。
+    """
+
+    def __init__(self,
+                 threshold_left_right: float = 0.9,
+                 threshold_cross: float = 0.3,
+                 min_gap_ratio: float = 0.005):
+        """
+        初始化排序器
+
+        Args:
+            threshold_left_right: 保留以兼容LayoutSorter的参数，XY-cut不使用
+            threshold_cross: 保留以兼容LayoutSorter的参数，XY-cut不使用
+            min_gap_ratio: 最小切分空白宽度占页面宽度的比例
+        """
+        super().__init__(threshold_left_right, threshold_cross)
+        self.min_gap_ratio = min_gap_ratio
+
+    def _sort_elements(self, elements: List[Dict], page_width: float) -> List[Dict]:
+        """
+        按递归XY-cut确定元素的阅读顺序
+
+        Args:
+            elements: 元素列表
+            page_width: 页面宽度,必须提供
+
+        Returns:
+            排序后的元素列表
+        """
+        return self._sort_many([elements], [page_width])[0]
+
+    def sort_pages(self, layout_results: List[Union[str, dict]], page_widths: List[float]) -> List[List[Dict]]:
+        """
+        一次排序整篇文档（或一批页面）的检测结果
+
+        各页坐标按页面宽度归一化后从左到右并排放入同一个数组，页与页之间留出足够的空白，
+        第一次竖直切分即按页码顺序把各页分开，整批页面只做一次递归XY-cut。
+
+        Args:
+            layout_results: 每页的JSON文件路径或检测结果字典
+            page_widths: 每页的页面宽度
+
+        Returns:
+            每页排序后的元素列表
+        """
+        pages = []
+        for layout_result in layout_results:
+            if isinstance(layout_result, str):
+                with open(layout_result, 'r', encoding='utf-8') as f:
+                    layout_result = json.load(f)
+            pages.append(layout_result.get('boxes', []))
+        return self._sort_many(pages, page_widths)
+
+    def _sort_many(self, pages: List[List[Dict]], page_widths: List[float]) -> List[List[Dict]]:
+        """将多页元素拼成一个坐标数组后统一切分，返回每页排序后的元素列表"""
+        valid_pages = [
+            [elem for elem in elements if "coordinate" in elem and len(elem["coordinate"]) == 4]
+            for elements in pages
+        ]
+        page_ids = np.array([page for page, elements in enumerate(valid_pages) for _ in elements], dtype=np.int64)
+        if len(page_ids) == 0:
+            return [[] for _ in valid_pages]
+
+        boxes = np.array(
+            [elem["coordinate"] for elements in valid_pages for elem in elements], dtype=np.float64
+        )
+        # 按页面宽度归一化，使每页的最小切分空白都是min_gap_ratio
+        widths = np.array([width or 1 for width in page_widths], dtype=np.float64)
+        boxes /= widths[page_ids, None]
+        # 各页依次向右平移，页与页之间留出一个页面宽度的空白
+        cursor = 0.0
+        for page in range(len(valid_pages)):
+            mask = page_ids == page
+            if not mask.any():
+                continue
+            left, right = boxes[mask, 0].min(), boxes[mask, 2].max()
+            boxes[mask, 0::2] += cursor - left
+            cursor += right - left + 1.0
+
+        elements = [elem for page in valid_pages for elem in page]
+        sorted_pages = [[] for _ in valid_pages]
+        for i in self._cut(boxes, np.arange(len(boxes)), self.min_gap_ratio):
+            sorted_pages[page_ids[i]].append(elements[i])
+        return sorted_pages
+
+    def _split(self, boxes: np.ndarray, indices: np.ndarray, axis: int, min_gap: float) -> List[np.ndarray]:
+        """沿指定方向（0为按竖直空白分栏，1为按水平空白分横条）切分，返回按坐标排序的各部分"""
+        groups = _projection_groups(boxes[indices, axis], boxes[indices, axis + 2], min_gap)
+        return [indices[groups == group] for group in range(groups.max() + 1)]
+
+    @staticmethod
+    def _column_gaps(boxes: np.ndarray, columns: List[np.ndarray]) -> np.ndarray:
+        """相邻两栏之间的空白区间，形如[[左边界, 右边界], ...]"""
+        return np.array([
+            [boxes[left, 2].max(), boxes[right, 0].min()]
+            for left, right in zip(columns[:-1], columns[1:])
+        ])
+
+    @staticmethod
+    def _gaps_aligned(gaps: np.ndarray, other: np.ndarray) -> bool:
+        """两组栏间空白是否有相互重叠的区间"""
+        overlap = np.minimum(gaps[:, None, 1], other[None, :, 1]) - np.maximum(gaps[:, None, 0], other[None, :, 0])
+        return bool((overlap > 0).any())
+
+    def _cut(self, boxes: np.ndarray, indices: np.ndarray, min_gap: float) -> List[int]:
+        """递归切分，返回indices的阅读顺序"""
+        if len(indices) <= 1:
+            return indices.tolist()
+
+        # 先按竖直空白分栏
+        columns = self._split(boxes, indices, 0, min_gap)
+        if len(columns) > 1:
+            return [i for column in columns for i in self._cut(boxes, column, min_gap)]
+
+        # 有跨栏元素时分不开栏，按水平空白切成横条
+        bands = self._split(boxes, indices, 1, min_gap)
+        if len(bands) == 1:
+            # 无法再切分，按从上到下、从左到右排序
+            order = np.lexsort((boxes[indices, 0], boxes[indices, 1]))
+            return indices[order].tolist()
+
+        # 合并栏间空白对齐的相邻多栏横条，避免两栏段落间距对齐时被逐行交替读取。
+        # 单栏横条作为上下两部分的分隔；只有完全落在上方多栏横条某一栏内时才并入（左右栏长度不一致）。
+        # parts中每项为(横条列表, 最近一个多栏横条的栏间空白)，空白为None表示该部分不可再合并
+        parts = []
+        for band in bands:
+            band_columns = self._split(boxes, band, 0, min_gap)
+            previous_gaps = parts[-1][1] if parts else None
+            if len(band_columns) > 1:
+                gaps = self._column_gaps(boxes, band_columns)
+                if previous_gaps is not None and self._gaps_aligned(gaps, previous_gaps):
+                    parts[-1] = (parts[-1][0] + [band], gaps)
+                else:
+                    parts.append(([band], gaps))
+                continue
+            left, right = boxes[band, 0].min(), boxes[band, 2].max()
+            centers = None if previous_gaps is None else previous_gaps.mean(axis=1)
+            if centers is not None and not ((left < centers) & (centers < right)).any():
+                parts[-1] = (parts[-1][0] + [band], previous_gaps)
+            else:
+                parts.append(([band], None))
+        merged = [np.concatenate(group) for group, _ in parts]
+        if len(merged) == 1:
+            # 合并后没有进展（整个区域就是一组对齐的多栏横条），直接按横条处理
+            merged = bands
+        return [i for part in merged for i in self._cut(boxes, np.sort(part), min_gap)]
+
+
+def create_layout_sorter(threshold_left_right: float = 0.9,
+                         threshold_cross: float = 0.3,
+                         method: Optional[str] = None) -> LayoutSorter:
+    """
+    根据配置创建排序器
+
+    Args:
+        threshold_left_right: 判定元素属于左/右栏的阈值
+        threshold_cross: 判定元素跨栏的阈值
+        method: 排序方法，"xycut"（递归XY-cut）或"columns"（左右两栏），None则使用配置
+
+    Returns:
+        排序器实例
+    """
+    if method is None:
+        method = get_config()["LAYOUT_SORTER"]
+    if method == "columns":
+        return LayoutSorter(threshold_left_right, threshold_cross)
+    if method == "xycut":
+        return XYCutSorter(threshold_left_right, threshold_cross)
+    raise ValueError(f"未知的排序方法: {method}")
+
 
 if __name__ == "__main__":
     # 使用示例
@@ -1,11 +1,110 @@
-from typing import Any, Dict
+"""
+本地模型注册表 - 每个模型只加载一次，并按(模型名称, 设备)复用
 
+PaddleX模型实例的predict不是线程安全的，注册表为每个工作线程维护一份独立的实例，
+多个页面并发处理时互不干扰；同一线程内重复获取返回同一个实例。
+"""
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
 from paddlex import create_model
 
-from x_pdf2md.config import get_model_config
+from x_pdf2md.config import get_config, get_model_config
+
+# 预热使用的空白图片（白底，尺寸足以通过各模型的预处理）
+_WARMUP_IMAGE = np.full((64, 256, 3), 255, dtype=np.uint8)
+
+
+class ModelRegistry:
+    """本地模型注册表，按线程分配模型实例"""
+
+    def __init__(self, warmup: Optional[bool] = None):
+        """
+        初始化模型注册表
+
+        Args:
+            warmup: 新建模型后是否预热，None则使用配置
+        """
+        self.warmup = warmup
+        # 模型构建期间加锁，避免多个线程同时初始化推理引擎
+        self._build_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _thread_models(self) -> Dict[Tuple[str, str], Any]:
+        """当前线程持有的模型实例"""
+        if not hasattr(self._local, "models"):
+            self._local.models = {}
+        return self._local.models
+
+    def get(self, model_name: str, device: Optional[str] = None) -> Any:
+        """
+        获取模型实例，当前线程尚未加载时创建并预热
+
+        Args:
+            model_name: PaddleX模型名称
+            device: 运行设备，None则使用配置MODEL_DEVICE
+
+        Returns:
+            模型实例
+        """
+        if device is None:
+            device = get_config()["MODEL_DEVICE"]
+        key = (model_name, device or "")
+        models = self._thread_models()
+        if key not in models:
+            models[key] = self._build(model_name, device)
+        return models[key]
+
+    def _build(self, model_name: str, device: Optional[str]) -> Any:
+        """创建并预热模型"""
+        with self._build_lock:
+            kwargs = {"device": device} if device else {}
+            model = create_model(model_name=model_name, **kwargs)
+            print(f"模型 {model_name} 加载成功 (线程: {threading.current_thread().name})")
+
+        warmup = self.warmup if self.warmup is not None else get_config()["MODEL_WARMUP"]
+        if warmup:
+            try:
+                # 首次推理会触发计算图构建和内存分配，提前完成避免计入第一页耗时
+                list(model.predict(_WARMUP_IMAGE, batch_size=1))
+            except Exception as e:
+                print(f"模型 {model_name} 预热失败: {e}")
+        return model
+
+    def preload(self, model_types: Iterable[str], device: Optional[str] = None) -> None:
+        """
+        启动时为当前线程预先加载并预热模型
+
+        Args:
+            model_types: 模型类型列表，如['layout', 'ocr_det', 'ocr_rec']
+            device: 运行设备，None则使用配置MODEL_DEVICE
+        """
+        for model_type in model_types:
+            self.get(get_model_config(model_type), device)
+
+    def clear(self) -> None:
+        """释放当前线程持有的模型实例"""
+        self._thread_models().clear()
+
+
+# 全局模型注册表
+model_registry = ModelRegistry()
+
+
+def get_model(model_name: str, device: Optional[str] = None) -> Any:
+    """
+    从全局注册表获取模型实例
+
+    Args:
+        model_name: PaddleX模型名称
+        device: 运行设备，None则使用配置MODEL_DEVICE
+
+    Returns:
+        模型实例
+    """
+    return model_registry.get(model_name, device)
 
-# 全局模型字典，用于存储已加载的模型
-_GLOBAL_MODELS: Dict[str, Any] = {}
 
 def get_or_create_model(model_type: str) -> Any:
     """
@@ -15,21 +114,12 @@ def get_or_create_model(model_type: str) -> Any:
         model_type: 模型类型
 
     Returns:
-        已加载的模型实例
+        已加载的模型实例，加载失败时返回None
     """
-    global _GLOBAL_MODELS
-
-    # 如果模型已经加载，直接返回
-    if model_type in _GLOBAL_MODELS and _GLOBAL_MODELS[model_type] is not None:
-        return _GLOBAL_MODELS[model_type]
-
-    # 否则，从配置中获取模型名称并加载
+    # 从配置中获取模型名称，交给注册表加载
     model_name = get_model_config(model_type)
     try:
-        model = create_model(model_name=model_name)
-        _GLOBAL_MODELS[model_type] = model
-        print(f"模型 {model_type} 加载成功")
-        return model
+        return model_registry.get(model_name)
     except Exception as e:
         print(f"模型 {model_type} 加载失败: {e}")
         return None
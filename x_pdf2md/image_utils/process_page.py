@@ -1,86 +1,110 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
-import json
 
-from x_pdf2md.image_utils.crop_text_areas import PolyCropper, TextAreaCropper
+import cv2
+import numpy as np
+
+from x_pdf2md.config import get_config
 from x_pdf2md.image_utils.detect_and_sort import detect_and_sort_layout
 from x_pdf2md.image_utils.region_image import RegionImage
+from x_pdf2md.pdf_utils.pdf_to_image import PdfRegionRenderer
 
 
 def process_page_layout(
-        image_path: str,
+        image_path: Optional[str],
         output_dir: str,
         page_number: int = 1,
         layout_json_path: str = None,
         threshold_left_right: float = 0.9,
-        threshold_cross: float = 0.3
+        threshold_cross: float = 0.3,
+        image: Optional[np.ndarray] = None,
+        scale: Optional[float] = None,
+        region_renderer: Optional[PdfRegionRenderer] = None,
+        hires_labels: Optional[List[str]] = None,
+        sorted_elements: Optional[List[Dict]] = None,
+        save_crops: Optional[bool] = None,
 ) -> List[RegionImage]:
     """
-    处理页面布局：检测并排序版面，然后按顺序裁剪保存各区域
+    处理页面布局：检测并排序版面，然后按顺序生成各区域（区域像素从页面像素数组复制，不持有整页像素）
 
     Args:
-        image_path: 输入图片路径
-        output_dir: 输出目录路径
+        image_path: 输入图片路径，提供image时可为None
+        output_dir: 输出目录路径（保存裁剪图片时使用）
+        page_number: 页码（从1开始）
         layout_json_path: 布局检测结果保存路径（可选）
         threshold_left_right: 判定左右栏的阈值
         threshold_cross: 判定跨栏的阈值
+        image: 已解码的BGR页面像素数组，提供时不再从磁盘读取页面图片
+        scale: 页面渲染缩放比例 (dpi/72)，用于将区域坐标映射回PDF坐标
+        region_renderer: 可选的区域渲染器，页面为低分辨率渲染时用于按高分辨率重新渲染选定区域
+        hires_labels: 需要高分辨率重新渲染的区域标签，None则使用配置
+        sorted_elements: 已完成检测和排序的版面元素（批量版面分析的结果），提供时跳过版面检测
+        save_crops: 是否将区域裁剪图片保存到output_dir，None则使用配置
 
     Returns:
         List[RegionImage]: 包含区域信息的RegionImage对象列表
     """
-    # 确保输出目录存在
-    os.makedirs(output_dir, exist_ok=True)
-
-    # 如果未指定layout_json_path，在output_dir中创建临时文件
-    if layout_json_path is None:
-        layout_json_path = os.path.join(output_dir, "temp_layout.json")
+    # 优先使用内存中的页面图像
+    page_image = image if image is not None else cv2.imread(image_path)
 
-    # 检测并排序版面
-    sorted_elements = detect_and_sort_layout(
-        image_path,
-        layout_json_path,
-        threshold_left_right,
-        threshold_cross
-    )
+    # 检测并排序版面（批量检测时已经得到结果）
+    if sorted_elements is None:
+        if layout_json_path is None:
+            layout_json_path = os.path.join(output_dir, "temp_layout.json")
+        sorted_elements = detect_and_sort_layout(
+            page_image,
+            layout_json_path,
+            threshold_left_right,
+            threshold_cross
+        )
 
-    # 将排序后的元素写入JSON文件
-    with open(layout_json_path, 'w', encoding='utf-8') as f:
-        json.dump({"boxes": sorted_elements}, f, ensure_ascii=False, indent=2)
+    if region_renderer is not None and hires_labels is None:
+        hires_labels = get_config()["HIRES_LABELS"]
+    if save_crops is None:
+        save_crops = get_config()["SAVE_REGION_CROPS"]
 
-    # 创建裁剪处理器
-    cropper = TextAreaCropper(PolyCropper())
-
-    # 裁剪并保存区域
+    # 按排序顺序生成区域，区域像素从页面像素数组中复制出来，
+    # 本页处理完后整页像素即可释放（顺序模式下所有页面分析完才开始格式化，保留整页像素会占用大量内存）
     region_images = []
-    cropper.crop_text_areas(
-        image_path,
-        layout_json_path,
-        output_dir,
-        output_format='png'
-    )
-
-    # 获取裁剪后的图片信息（按排序顺序）
+    page_height, page_width = page_image.shape[:2]
     for i, element in enumerate(sorted_elements):
         label = element.get('label', 'unknown')
         score = element.get('score', 0)
-        box = element.get('box', [])
-        filename = f"{i}_{label}_{score:.4f}.png"
-        cropped_path = os.path.join(output_dir, filename)
+        box = element.get('coordinate', [])
+        if not box:
+            continue
         contains = element.get('contains', [])
-        if os.path.exists(cropped_path):
-            region = RegionImage(
-                image_path=cropped_path,
-                label=label,
-                score=score,
-                page_number=page_number,
-                region_index=i,
-                original_box=box,
-                contains=contains
-            )
-            region_images.append(region)
 
-    return region_images
+        if region_renderer is not None and label in hires_labels:
+            # 公式、表格、标题等区域按高分辨率重新渲染，替换低分辨率裁剪结果
+            region_pixels = region_renderer.render_region(page_number - 1, box, scale)
+        else:
+            # 与矩形裁剪相同的取整方式；复制切片，避免区域通过视图持有整页像素
+            x1, y1, x2, y2 = (int(float(value)) for value in box)
+            x1, y1 = max(x1, 0), max(y1, 0)
+            x2, y2 = min(x2 + 1, page_width), min(y2 + 1, page_height)
+            if x2 <= x1 or y2 <= y1:
+                print(f"警告：无效的裁剪区域 {box}")
+                continue
+            region_pixels = page_image[y1:y2, x1:x2].copy()
+
+        region = RegionImage(
+            image_path=None,
+            label=label,
+            score=score,
+            page_number=page_number,
+            region_index=i,
+            original_box=box,
+            contains=contains,
+            scale=scale,
+            image=region_pixels
+        )
+        if save_crops:
+            # 保存裁剪图片并释放像素引用，后续识别从文件读取
+            region.save(os.path.join(output_dir, f"{i}_{label}_{score:.4f}.png"), release=True)
+        region_images.append(region)
 
+    return region_images
 
 if __name__ == "__main__":
     # 使用示例
@@ -1,10 +1,15 @@
+import os
 from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
 
 
 @dataclass
 class RegionImage:
     """表示文档中的一个区域图片"""
-    image_path: str  # 图片文件路径
+    image_path: Optional[str]  # 图片文件路径（仅在保存裁剪图片时存在）
     label: str  # 区域标签 (如 'text', 'title' 等)
     score: float  # 检测置信度分数
     page_number: int  # 页码
@@ -12,6 +17,42 @@ class RegionImage:
     original_box: list  # 原始边界框坐标 [x1,y1,x2,y2]
     content: str = None  # 识别出的内容
     contains: list = None  # 包含的区域
+    scale: float = None  # 原始边界框坐标对应的渲染缩放比例 (dpi/72)
+    image: np.ndarray = None  # 区域的BGR像素（从页面像素数组复制的裁剪结果，或高分辨率重新渲染的结果）
+    prefilled_content: str = None  # 文档级批处理阶段预先得到的内容，格式化时直接使用
+    prefilled_title: str = None  # 文档级阶段预先得到的图片标题（图片类区域）
+    embedded_image_path: str = None  # 提取出的PDF内嵌原始图片路径（None表示尚未查找，""表示没有匹配的内嵌图片）
+
+    def get_image(self) -> Optional[np.ndarray]:
+        """获取区域像素，内存中没有时从图片文件读取"""
+        if self.image is None and self.image_path:
+            self.image = cv2.imread(self.image_path)
+        return self.image
+
+    @property
+    def source(self):
+        """识别函数的输入：优先使用内存中的像素数组，否则使用图片路径"""
+        return self.image if self.image is not None else self.image_path
+
+    def save(self, output_path: str, release: bool = False) -> str:
+        """
+        将区域像素保存为图片文件，并记录为image_path
+
+        Args:
+            output_path: 图片保存路径
+            release: 保存后是否释放内存中的像素（之后需要时再从文件读取）
+
+        Returns:
+            图片保存路径
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        cv2.imwrite(output_path, self.get_image())
+        self.image_path = output_path
+        if release:
+            self.image = None
+        return output_path
 
     def __str__(self) -> str:
         return f"RegionImage(label={self.label}, page={self.page_number}, index={self.region_index}, path={self.image_path})"
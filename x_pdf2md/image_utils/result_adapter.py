@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+模型结果适配模块 - 将PaddleX结果对象直接转换为普通字典，不再经过JSON文件中转
+
+结果只在调试模式(DEBUG_ARTIFACTS)下才保存到磁盘。
+"""
+import json
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from x_pdf2md.config import get_config
+
+# 结果中不需要的大字段（输入图像等）
+_SKIP_KEYS = ("input_img",)
+
+
+def to_builtin(value: Any) -> Any:
+    """
+    将NumPy数组、标量等递归转换为Python内置类型
+
+    参数:
+        value: 任意值
+
+    返回:
+        可直接JSON序列化的值
+    """
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items() if key not in _SKIP_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def result_to_dict(res: Any) -> Dict:
+    """
+    将PaddleX结果对象转换为普通字典（与save_to_json写出的内容一致）
+
+    参数:
+        res: PaddleX的predict输出的单个结果对象
+
+    返回:
+        结果字典
+    """
+    # 结果对象的json属性即save_to_json写出的内容，部分版本会包一层"res"
+    data = res.json if hasattr(res, "json") else dict(res)
+    if isinstance(data, dict) and set(data.keys()) == {"res"}:
+        data = data["res"]
+    return to_builtin(data)
+
+
+def is_debug_enabled() -> bool:
+    """是否保存模型中间结果"""
+    return get_config()["DEBUG_ARTIFACTS"]
+
+
+def save_debug_json(data: Dict, json_path: str) -> None:
+    """
+    调试模式下将结果保存为JSON文件
+
+    参数:
+        data: 结果字典
+        json_path: 保存路径
+    """
+    if not is_debug_enabled():
+        return
+    output_dir = os.path.dirname(json_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+空间索引模块 - 用均匀网格索引矩形框，快速查询与给定框相交的候选框
+"""
+import math
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class GridIndex:
+    """均匀网格空间索引，每个框登记到它覆盖的所有网格单元中"""
+
+    def __init__(self, boxes: np.ndarray, grid_size: int = None):
+        """
+        构建网格索引
+
+        Args:
+            boxes: 形状为 (N, 4) 的 [x1, y1, x2, y2] 框坐标数组
+            grid_size: 每个方向的网格数，None则取 ceil(sqrt(N))
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        n = len(self.boxes)
+        self.grid_size = grid_size or max(1, math.ceil(math.sqrt(n)))
+        self.cells: Dict[tuple, List[int]] = {}
+        if n == 0:
+            return
+
+        self.min_x = float(self.boxes[:, 0].min())
+        self.min_y = float(self.boxes[:, 1].min())
+        span_x = float(self.boxes[:, 2].max()) - self.min_x
+        span_y = float(self.boxes[:, 3].max()) - self.min_y
+        self.cell_w = max(span_x / self.grid_size, 1e-9)
+        self.cell_h = max(span_y / self.grid_size, 1e-9)
+
+        for i, box in enumerate(self.boxes):
+            col0, row0, col1, row1 = self._cell_range(box)
+            for row in range(row0, row1 + 1):
+                for col in range(col0, col1 + 1):
+                    self.cells.setdefault((row, col), []).append(i)
+
+    def _cell_range(self, box: Sequence[float]):
+        """框覆盖的网格单元范围 (col0, row0, col1, row1)，超出索引范围的部分被截断"""
+        last = self.grid_size - 1
+        col0 = min(max(int((box[0] - self.min_x) // self.cell_w), 0), last)
+        row0 = min(max(int((box[1] - self.min_y) // self.cell_h), 0), last)
+        col1 = min(max(int((box[2] - self.min_x) // self.cell_w), 0), last)
+        row1 = min(max(int((box[3] - self.min_y) // self.cell_h), 0), last)
+        return col0, row0, col1, row1
+
+    def query(self, box: Sequence[float]) -> np.ndarray:
+        """
+        查询可能与给定框相交的框
+
+        Args:
+            box: [x1, y1, x2, y2] 框坐标
+
+        Returns:
+            升序排列的候选框下标数组（包含边界接触的框，需要调用方精确判断）
+        """
+        if not self.cells:
+            return np.empty(0, dtype=np.int64)
+        col0, row0, col1, row1 = self._cell_range(box)
+        candidates = []
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                candidates.extend(self.cells.get((row, col), ()))
+        return np.unique(np.asarray(candidates, dtype=np.int64))
+
+
+def containment_ratios(box: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """
+    计算box与others中每个框的交集面积占box面积的比例（与is_box_inside的计算方式一致）
+
+    Args:
+        box: [x1, y1, x2, y2] 框坐标
+        others: 形状为 (M, 4) 的框坐标数组
+
+    Returns:
+        形状为 (M,) 的比例数组，没有交集的位置为0
+    """
+    intersect_x1 = np.maximum(box[0], others[:, 0])
+    intersect_y1 = np.maximum(box[1], others[:, 1])
+    intersect_x2 = np.minimum(box[2], others[:, 2])
+    intersect_y2 = np.minimum(box[3], others[:, 3])
+    overlaps = (intersect_x1 < intersect_x2) & (intersect_y1 < intersect_y2)
+
+    ratios = np.zeros(len(others), dtype=np.float64)
+    if overlaps.any():
+        area_box = (box[2] - box[0]) * (box[3] - box[1])
+        intersection = (
+            (intersect_x2[overlaps] - intersect_x1[overlaps])
+            * (intersect_y2[overlaps] - intersect_y1[overlaps])
+        )
+        ratios[overlaps] = intersection / area_box
+    return ratios
@@ -1,19 +1,267 @@
 from typing import List, Optional
 import os
 
-from x_pdf2md.image2md.get_image_title import get_image_title
-from x_pdf2md.image2md.vlm_function import extract_table_from_image, extract_text_from_image, describe_image
-from x_pdf2md.image_utils.formula_recognize import recognize_formula
+from x_pdf2md.config import get_config
+
+from x_pdf2md.image2md.get_image_title import get_image_title, get_image_titles
+from x_pdf2md.image2md.vlm_function import (
+    extract_table_from_image, extract_text_from_image, describe_image, describe_image_with_title,
+    process_images_concurrently, split_description_title
+)
+from x_pdf2md.image_utils.formula_router import route_formula, route_formula_batch
 from x_pdf2md.ocr_utils.ocr_image import OCRProcessor
+from x_pdf2md.pdf_utils.embedded_images import PdfImageExtractor
+from x_pdf2md.pdf_utils.text_layer import PdfTextLayer
 from x_pdf2md.remote_image.image_uploader import ImageUploader
 from x_pdf2md.image_utils.region_image import RegionImage
+from x_pdf2md.region_router import ROUTE_OCR_FIRST, ROUTE_VLM, region_router
 
 ocr_processor = OCRProcessor()
 
+# 标题类标签（默认走本地OCR）
+OCR_LABELS = ["doc_title", "paragraph_title",
+              "chart_title", "table_title", "figure_title",
+              "abstract"]
+
+
+def extract_text_from_text_layer(
+    region: RegionImage,
+    text_layer: Optional[PdfTextLayer]
+) -> Optional[str]:
+    """
+    尝试从PDF文本层读取区域文字
+
+    参数:
+        region: RegionImage对象
+        text_layer: PDF文本层读取器，为None时不使用文本层
+
+    返回:
+        区域文字；文本层不可用时返回None
+    """
+    if text_layer is None:
+        return None
+    # 包含行内公式的区域文本层无法还原LaTeX，交给VLM处理
+    if any(child.get("label") == "formula" for child in region.contains or []):
+        return None
+    return text_layer.extract_region_text(region.page_number, region.original_box, region.scale)
+
+
+def prefill_ocr_regions(
+    page_regions: List[List[RegionImage]],
+    text_layer: Optional[PdfTextLayer] = None
+) -> None:
+    """
+    文档级OCR阶段：汇总若干页中所有路由到本地OCR的区域，批量检测和识别后写回prefilled_content
+
+    ocr_first策略的区域置信度不足或含有公式、表格结构时不写回，留给VLM阶段处理。
+
+    参数:
+        page_regions: 每页的RegionImage对象列表
+        text_layer: 可选的PDF文本层读取器，文本层可用的区域直接使用文本层文字，不再OCR
+    """
+    ocr_regions = []
+    for regions in page_regions:
+        for region in regions:
+            if not region_router.uses_local_ocr(region.label) or region.prefilled_content is not None:
+                continue
+            # 文本层可用时不需要OCR
+            layer_text = None
+            if region.label == "text" or region.label in OCR_LABELS:
+                layer_text = extract_text_from_text_layer(region, text_layer)
+            if layer_text is not None:
+                region.prefilled_content = layer_text
+            elif region.get_image() is not None:
+                ocr_regions.append(region)
+
+    if not ocr_regions:
+        return
+    print(f"批量OCR {len(ocr_regions)} 个区域...")
+    texts = region_router.recognize_locally(ocr_regions, ocr_processor)
+    escalated = 0
+    for region, text in zip(ocr_regions, texts):
+        if text is None:
+            escalated += 1
+        else:
+            region.prefilled_content = text
+    if escalated:
+        print(f"{escalated} 个区域OCR置信度不足或含有公式/表格结构，交给VLM处理")
+
+
+def wrap_formula(content: str) -> str:
+    """将公式LaTeX包装为Markdown块级公式"""
+    if not content.startswith("$$") and not content.endswith("$$"):
+        content = f"$$\n{content}\n$$"
+    return content
+
+
+def prefill_formula_regions(page_regions: List[List[RegionImage]]) -> None:
+    """
+    文档级公式阶段：汇总若干页中所有公式区域，按形状分批识别后写回prefilled_content
+
+    参数:
+        page_regions: 每页的RegionImage对象列表
+    """
+    formula_regions = [
+        region
+        for regions in page_regions
+        for region in regions
+        if region.label == "formula" and region.prefilled_content is None and region.get_image() is not None
+    ]
+    if not formula_regions:
+        return
+    print(f"批量识别 {len(formula_regions)} 个公式区域...")
+    formulas = route_formula_batch([region.get_image() for region in formula_regions])
+    for region, formula in zip(formula_regions, formulas):
+        region.prefilled_content = wrap_formula(formula)
+
+
+# 走VLM的标签及对应的并发任务类型
+VLM_LABELS = {"text": "text", "table": "table",
+              "image": "description", "figure": "description", "chart": "description"}
+
+IMAGE_LABELS = ["image", "figure", "chart"]
+
+
+def vlm_task_kind(label: str) -> str:
+    """标签对应的并发任务类型；merged模式下图片的描述和标题在同一个请求中生成"""
+    if label in IMAGE_LABELS and get_config()["IMAGE_TITLE_MODE"] == "merged":
+        return "description_title"
+    return VLM_LABELS[label]
+
+
+def pack_key(region: RegionImage) -> Optional[int]:
+    """小文字区域按页码合并为多图请求，其他区域返回None（单独请求）"""
+    image = region.get_image()
+    if region.label != "text" or image is None:
+        return None
+    if image.shape[0] * image.shape[1] > get_config()["VLM_PACK_MAX_PIXELS"]:
+        return None
+    return region.page_number
+
+
+def prefill_vlm_regions(
+    page_regions: List[List[RegionImage]],
+    text_layer: Optional[PdfTextLayer] = None,
+    image_extractor: Optional[PdfImageExtractor] = None,
+    output_dir: Optional[str] = None
+) -> None:
+    """
+    文档级VLM阶段：汇总若干页中所有走VLM的区域，用共享的异步客户端并发请求后写回prefilled_content
+
+    图片类区域写回的是图片描述，标题生成和图片引用仍在格式化时完成。图片类区域优先把PDF内嵌的原始图片
+    发给VLM（提取结果记录在区域上，格式化时直接引用），没有匹配的内嵌图片时才使用裁剪像素。
+
+    参数:
+        page_regions: 每页的RegionImage对象列表
+        text_layer: 可选的PDF文本层读取器，文本层可用的文字区域不再请求VLM
+        image_extractor: 可选的内嵌图片提取器
+        output_dir: 可选的输出目录，内嵌图片保存在其images子目录
+    """
+    vlm_regions = []
+    sources = []
+    for regions in page_regions:
+        for region in regions:
+            if region.label not in VLM_LABELS or region.prefilled_content is not None:
+                continue
+            # 只处理直接走VLM或本地OCR后需要升级的区域（离线模式下没有这样的区域）
+            if region_router.policy(region.label) not in (ROUTE_VLM, ROUTE_OCR_FIRST):
+                continue
+            if region.label == "text":
+                layer_text = extract_text_from_text_layer(region, text_layer)
+                if layer_text is not None:
+                    region.prefilled_content = layer_text
+                    continue
+            source = region.source
+            if region.label in IMAGE_LABELS:
+                source = extract_embedded_image(region, image_extractor, region_images_dir(output_dir)) or source
+            if source is not None:
+                vlm_regions.append(region)
+                sources.append(source)
+
+    if not vlm_regions:
+        return
+    print(f"并发请求 {len(vlm_regions)} 个VLM区域 (并发上限 {get_config()['VLM_MAX_CONCURRENCY']})...")
+    kinds = [vlm_task_kind(region.label) for region in vlm_regions]
+    results = process_images_concurrently(
+        list(zip(kinds, sources)),
+        pack_keys=[pack_key(region) for region in vlm_regions],
+    )
+    for region, kind, result in zip(vlm_regions, kinds, results):
+        if kind == "description_title":
+            region.prefilled_content, region.prefilled_title = split_description_title(result)
+        else:
+            region.prefilled_content = result
+
+
+def prefill_image_titles(page_regions: List[List[RegionImage]]) -> None:
+    """
+    文档级标题阶段：为已有描述但还没有标题的图片区域批量生成标题（一个请求包含多张图片的描述）
+
+    separate模式和离线模式下不处理，标题仍在格式化时逐张生成（或使用默认标题）。
+
+    参数:
+        page_regions: 每页的RegionImage对象列表
+    """
+    if get_config()["IMAGE_TITLE_MODE"] == "separate" or region_router.offline:
+        return
+    title_regions = [
+        region
+        for regions in page_regions
+        for region in regions
+        if region.label in IMAGE_LABELS and region.prefilled_content and region.prefilled_title is None
+    ]
+    if not title_regions:
+        return
+    print(f"批量生成 {len(title_regions)} 个图片标题...")
+    titles = get_image_titles([region.prefilled_content for region in title_regions])
+    for region, title in zip(title_regions, titles):
+        region.prefilled_title = title
+
+
+def region_file_stem(region: RegionImage) -> str:
+    """区域图片文件名（不含扩展名），包含页码以避免不同页面的图片重名"""
+    return f"page_{region.page_number}_{region.region_index}_{region.label}"
+
+
+def region_images_dir(output_dir: Optional[str]) -> str:
+    """图片类区域的保存目录"""
+    return os.path.join(output_dir or "./output", "images")
+
+
+def extract_embedded_image(
+    region: RegionImage,
+    image_extractor: Optional[PdfImageExtractor],
+    images_dir: str
+) -> Optional[str]:
+    """
+    尝试提取图片区域对应的PDF内嵌图片（每个区域只提取一次，结果记录在embedded_image_path）
+
+    参数:
+        region: RegionImage对象
+        image_extractor: 内嵌图片提取器，为None时不提取
+        images_dir: 图片保存目录
+
+    返回:
+        内嵌图片路径；没有匹配的内嵌图片时返回None
+    """
+    if region.embedded_image_path is not None:
+        return region.embedded_image_path or None
+    if image_extractor is None:
+        return None
+    os.makedirs(images_dir, exist_ok=True)
+    output_path = os.path.join(images_dir, region_file_stem(region) + "_embedded")
+    image_path = image_extractor.extract_region_image(
+        region.page_number, region.original_box, region.scale, output_path
+    )
+    region.embedded_image_path = image_path or ""
+    return image_path
+
 def format_region_content(
     region: RegionImage, 
     image_upload_obj: Optional[ImageUploader] = None,
-    output_dir: Optional[str] = None
+    output_dir: Optional[str] = None,
+    text_layer: Optional[PdfTextLayer] = None,
+    image_extractor: Optional[PdfImageExtractor] = None
 ) -> None:
     """
     根据区域标签类型生成或增强内容
@@ -22,6 +270,8 @@ def format_region_content(
         region: RegionImage对象
         image_upload_obj: 可选的图片上传器对象
         output_dir: 可选的输出目录，用于保存处理结果
+        text_layer: 可选的PDF文本层读取器，文字类区域优先从文本层读取
+        image_extractor: 可选的内嵌图片提取器，图片类区域优先使用PDF中的原始图片
     """
 
     # 获取标签
@@ -31,29 +281,39 @@ def format_region_content(
     # 默认内容为空
     content = ""
     
-    # 使用图片路径
-    image_path = region.image_path
+    # 识别输入：优先使用内存中的区域像素
+    image_source = region.source
     
     # 排除图片相关部分，这些已在format_region中单独处理
     if label in ["image", "figure", "chart"]:
+        # 图片需要保存为文件供Markdown引用或上传
+        images_dir = region_images_dir(output_dir)
+        # 优先使用PDF内嵌的原始图片，没有匹配时保存区域像素
+        image_path = extract_embedded_image(region, image_extractor, images_dir)
+        if image_path:
+            region.image_path = image_path
+        elif region.image_path:
+            image_path = region.image_path
+        else:
+            image_path = region.save(os.path.join(images_dir, region_file_stem(region) + ".png"))
         print("处理图片：", image_path)
-        # 获取图片描述
-        image_describe = describe_image(image_path)
+        # 获取图片描述和标题（文档级阶段已经得到时直接使用；离线模式下不生成描述和标题）
+        image_title = region.prefilled_title
+        if region.prefilled_content is not None:
+            image_describe = region.prefilled_content
+        elif not region_router.uses_vlm(label):
+            image_describe = ""
+        elif get_config()["IMAGE_TITLE_MODE"] == "merged":
+            image_describe, image_title = describe_image_with_title(image_path)
+        else:
+            image_describe = describe_image(image_path)
         print("图片描述：", image_describe)
         
-        # 如果有图片路径且有上传器，尝试上传
-        image_title = get_image_title(image_describe)
+        if image_describe and not image_title:
+            image_title = get_image_title(image_describe)
         if not image_title:
             image_title = f"{label}_{region.region_index+1}"
         print(f"处理图片: {image_title}")
-        
-        # 如果指定了输出目录，可以在这里处理输出相关的逻辑
-        result_path = image_path
-        if output_dir:
-            # 这里可以添加将处理结果保存到输出目录的逻辑
-            # 例如: 复制图片到输出目录或者生成新的输出文件
-            result_filename = os.path.basename(image_path)
-            result_path = os.path.join(output_dir, result_filename)
             
         # 如果有图片路径且有上传器，尝试上传
         if image_path and image_upload_obj:
@@ -71,22 +331,19 @@ def format_region_content(
             except Exception as e:
                 print(f"图片上传失败: {e}")
         else:
-            # 如果有输出目录，将图片复制到images子文件夹并使用相对路径
+            # 如果有输出目录，将图片放到images子文件夹并使用相对路径
             if output_dir:
-                # 创建images子文件夹
-                images_dir = os.path.join(output_dir, "images")
-                os.makedirs(images_dir, exist_ok=True)
-                
                 # 获取原图片的文件名
                 image_filename = os.path.basename(image_path)
                 # 构建目标路径
                 target_image_path = os.path.join(images_dir, image_filename)
                 
-                # 复制图片到目标路径
+                # 图片不在images目录时复制过去
                 import shutil
                 try:
-                    shutil.copy2(image_path, target_image_path)
-                    print(f"图片已复制到: {target_image_path}")
+                    if os.path.abspath(image_path) != os.path.abspath(target_image_path):
+                        shutil.copy2(image_path, target_image_path)
+                        print(f"图片已复制到: {target_image_path}")
                     # 使用相对路径引用图片
                     image_rel_path = f"./images/{image_filename}"
                     content = f"![{image_title}]({image_rel_path})\n\n" + (
@@ -104,33 +361,82 @@ def format_region_content(
                     f"**{image_title}描述:** {region.content}" if region.content else ""
                 )
     
+    # 文字类区域优先使用PDF文本层，不可用时再走VLM/OCR
+    layer_text = None
+    if region.prefilled_content is None and (label == "text" or label in OCR_LABELS):
+        layer_text = extract_text_from_text_layer(region, text_layer)
+
+    # 路由到本地OCR的区域先在本地识别，结果不可用时再按标签走VLM
+    local_text = None
+    if (region.prefilled_content is None and layer_text is None
+            and label not in ["image", "figure", "chart"] and region_router.uses_local_ocr(label)):
+        local_text = region_router.recognize_locally([region], ocr_processor)[0]
+
     # 根据标签类型处理内容
-    if label == "text":
-        # 文本内容处理
-        content = extract_text_from_image(image_path=image_path)
-         
+    if label not in ["image", "figure", "chart"] and region.prefilled_content is not None:
+        # 文档级批处理阶段已经得到内容
+        content = region.prefilled_content
+
+    elif layer_text is not None:
+        content = layer_text
+
+    elif local_text is not None:
+        content = local_text
+
     elif label == "formula":
-        content = recognize_formula(input_path=image_path)
         # 公式内容处理
-        if not content.startswith("$$") and not content.endswith("$$"):
-            content = f"$$\n{content}\n$$"
+        content = wrap_formula(route_formula(image_source))
+
+    elif label in ["text", "table"] and region_router.policy(label) not in (ROUTE_VLM, ROUTE_OCR_FIRST):
+        # 只使用本地OCR的标签（包括离线模式）不请求VLM
+        content = ""
+
+    elif label == "text":
+        # 文本内容处理
+        content = extract_text_from_image(image_path=image_source)
             
     elif label == "table":
         # 表格内容处理
-        content = extract_table_from_image(image_path=image_path)
-    elif label in ["doc_title", "paragraph_title",
-                   "chart_title", "table_title", "figure_title",
-                   "abstract"]:
-        # 其他类型标签的默认处理
-        content = ocr_processor.extract_text(image_path)
+        content = extract_table_from_image(image_path=image_source)
     
     region.content = content
 
 
+def format_page_regions(
+    regions: List[RegionImage],
+    image_uploader: Optional[ImageUploader] = None,
+    output_dir: Optional[str] = None,
+    text_layer: Optional[PdfTextLayer] = None,
+    image_extractor: Optional[PdfImageExtractor] = None,
+) -> str:
+    """
+    将一页的区域按阅读顺序格式化并拼接为Markdown文本
+
+    参数:
+        regions: 该页的RegionImage对象列表
+        image_uploader: 可选的图片上传器对象
+        output_dir: 可选的输出目录，用于保存处理结果
+        text_layer: 可选的PDF文本层读取器
+        image_extractor: 可选的内嵌图片提取器
+
+    返回:
+        str: 该页的Markdown文本
+    """
+    page_content = []
+    for region in regions:
+        # 生成或增强区域内容
+        format_region_content(region, image_uploader, output_dir, text_layer, image_extractor)
+        if region.content:
+            page_content.append(region.content)
+    return "\n\n".join(page_content)
+
+
 def format_pdf_regions(
     page_regions: List[List[RegionImage]],
     image_uploader: Optional[ImageUploader] = None,
     output_dir: Optional[str] = None,
+    text_layer: Optional[PdfTextLayer] = None,
+    image_extractor: Optional[PdfImageExtractor] = None,
 ) -> List[str]:
     """
     格式化所有页面的区域为Markdown文本
@@ -139,43 +445,25 @@ def format_pdf_regions(
         page_regions: 每页的RegionImage对象列表
         image_uploader: 可选的图片上传器对象
         output_dir: 可选的输出目录，用于保存处理结果
+        text_layer: 可选的PDF文本层读取器
+        image_extractor: 可选的内嵌图片提取器
 
     返回:
         List[str]: 每页的Markdown文本列表
     """
-    # 内部函数：将format_region移到这里
-    def format_region(
-        region: RegionImage, 
-        image_upload_obj: Optional[ImageUploader] = None,
-        output_dir: Optional[str] = None
-    ) -> str:
-        """
-        将区块处理结果格式化为Markdown
-
-        参数:
-            region: RegionImage对象，表示区块处理结果
-            image_upload_obj: 图片上传器对象，用于处理图片上传
-            output_dir: 可选的输出目录，用于保存处理结果
-
-        返回:
-            Markdown格式的文本
-        """
-        # print(f"处理区域 #{region.region_index+1}，标签: {region.label}")
-
-        # 生成或增强区域内容
-        format_region_content(region, image_upload_obj, output_dir)
-
-        if not region.content:
-            return ""
-        return region.content
+    # 文档级OCR、公式和VLM阶段按窗口汇总区域，0表示整篇文档一次处理
+    ocr_window = get_config()["OCR_WINDOW_PAGES"] or len(page_regions)
 
     formatted_pages = []
     for page_num, regions in enumerate(page_regions, 1):
+        if (page_num - 1) % ocr_window == 0:
+            window = page_regions[page_num - 1:page_num - 1 + ocr_window]
+            prefill_ocr_regions(window, text_layer)
+            prefill_formula_regions(window)
+            prefill_vlm_regions(window, text_layer, image_extractor, output_dir)
+            prefill_image_titles(window)
         print(f"\n处理第 {page_num} 页的格式化...")
-        page_content = []
-        for region in regions:
-            formatted = format_region(region, image_uploader, output_dir)
-            if formatted:
-                page_content.append(formatted)
-        formatted_pages.append("\n\n".join(page_content))
+        formatted_pages.append(
+            format_page_regions(regions, image_uploader, output_dir, text_layer, image_extractor)
+        )
     return formatted_pages
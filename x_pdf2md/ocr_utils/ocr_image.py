@@ -3,99 +3,188 @@
 from typing import Dict, List, Union
 import os
 import json
-from PIL import Image
 
-from x_pdf2md.ocr_utils.text_detection import text_detection
-from x_pdf2md.ocr_utils.text_recogniize import recognize_text
-from x_pdf2md.config import get_model_config
+import cv2
+import numpy as np
+
+from x_pdf2md.ocr_utils.text_detection import text_detection, text_detection_batch
+from x_pdf2md.ocr_utils.text_recogniize import recognize_text_batch
+from x_pdf2md.config import get_config, get_model_config
+
+# 单行快速路径不经过文本检测，整张图即为文本行，检测置信度记为1.0
+SINGLE_LINE_DETECTION_SCORE = 1.0
+
+
+def count_text_lines(image: np.ndarray) -> int:
+    """
+    用水平投影粗略统计图像中的文字行数
+    Args:
+        image: BGR或灰度像素数组
+    Returns:
+        文字行数（没有墨迹时为0）
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    # Otsu二值化，墨迹为1；深色背景时反转
+    _, binary = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if binary.mean() > 0.5:
+        binary = 1 - binary
+
+    # 每行墨迹像素数超过噪声阈值即视为文字行
+    row_ink = binary.sum(axis=1)
+    ink_rows = row_ink >= max(2, image.shape[1] * 0.005)
+    if not ink_rows.any():
+        return 0
+
+    # 连续的墨迹行组成一段
+    edges = np.diff(np.concatenate(([0], ink_rows.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    tallest = (ends - starts).max()
+
+    # 合并间隔很小的段（字符内部、上下标、标点造成的断开）
+    runs = [[starts[0], ends[0]]]
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - runs[-1][1] < tallest * 0.2:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+    tallest = max(end - start for start, end in runs)
+
+    # 明显矮于最高段的(下划线、分隔线、噪点)不算一行
+    return sum(1 for start, end in runs if end - start >= tallest * 0.3)
+
+
+def is_single_line(image: np.ndarray, min_aspect_ratio: float = 1.5, max_height: int = 160,
+                   use_profile: bool = True) -> bool:
+    """
+    判断区域是否明显只有一行文字（可跳过文本检测直接识别）
+    Args:
+        image: BGR像素数组
+        min_aspect_ratio: 最小宽高比
+        max_height: 最大高度（像素）
+        use_profile: 是否再用水平投影确认只有一行
+    Returns:
+        bool: True表示单行文字
+    """
+    if image is None or image.size == 0:
+        return False
+    height, width = image.shape[:2]
+    if height > max_height or width < height * min_aspect_ratio:
+        return False
+    return not use_profile or count_text_lines(image) == 1
 
 
 class OCRProcessor:
-    def __init__(self, det_model=None, rec_model=None):
+    def __init__(self, det_model=None, rec_model=None, rec_batch_size=None):
         """
         初始化OCR处理器
         
         Args:
             det_model: 文本检测模型名称，None则使用配置
             rec_model: 文本识别模型名称，None则使用配置
+            rec_batch_size: 文本识别的批大小，None则使用配置
         """
         # 使用传入的模型名称或从配置中获取
         self.det_model = det_model or get_model_config('ocr_det')
         self.rec_model = rec_model or get_model_config('ocr_rec')
+        self.rec_batch_size = rec_batch_size or get_config()["OCR_REC_BATCH_SIZE"]
+        self.det_batch_size = get_config()["OCR_DET_BATCH_SIZE"]
+        self.single_line_fast_path = get_config()["OCR_SINGLE_LINE_FAST_PATH"]
+
+    def is_single_line(self, image: np.ndarray) -> bool:
+        """按配置的阈值判断图像是否明显是单行文字；关闭快速路径时总是返回False"""
+        if not self.single_line_fast_path:
+            return False
+        config = get_config()
+        return is_single_line(
+            image,
+            min_aspect_ratio=config["OCR_SINGLE_LINE_MIN_ASPECT"],
+            max_height=config["OCR_SINGLE_LINE_MAX_HEIGHT"],
+            use_profile=config["OCR_SINGLE_LINE_PROFILE"],
+        )
         
-    def crop_image(self, image_path: str, box_coordinates: List) -> Image.Image:
-        """根据坐标裁剪图像区域"""
-        image = Image.open(image_path)
+    def crop_image(self, image: Union[str, np.ndarray], box_coordinates: List) -> np.ndarray:
+        """根据坐标裁剪图像区域（返回BGR像素数组的切片视图）"""
+        if isinstance(image, str):
+            image = cv2.imread(image)
         # 将坐标转换为矩形边界框
         x_coordinates = [int(point[0]) for point in box_coordinates]
         y_coordinates = [int(point[1]) for point in box_coordinates]
-        left, top = min(x_coordinates), min(y_coordinates)
+        left, top = max(min(x_coordinates), 0), max(min(y_coordinates), 0)
         right, bottom = max(x_coordinates), max(y_coordinates)
         # 裁剪图像
-        cropped = image.crop((left, top, right, bottom))
-        return cropped
+        return image[top:bottom, left:right]
 
-    def process_image(self, image_path: str, save_crops: bool = True, output_dir: str = "./output/crops") -> List[Dict]:
+    def process_image(self, image_path: Union[str, np.ndarray], save_crops: bool = True, output_dir: str = "./output/crops") -> List[Dict]:
         """
         处理图像的完整OCR流程
         Args:
-            image_path: 输入图像路径
+            image_path: 输入图像路径或BGR像素数组
             save_crops: 是否保存裁剪后的图像
             output_dir: 裁剪图像的保存目录
         Returns:
-            包含文本位置和识别结果的列表
+            包含文本位置和识别结果的列表；detection_score总是数值，
+            走单行快速路径的图像没有检测置信度，记为SINGLE_LINE_DETECTION_SCORE
         """
         # 创建输出目录
         if save_crops:
             os.makedirs(output_dir, exist_ok=True)
+
+        # 只解码一次图像，检测和裁剪共用同一个像素数组
+        image = cv2.imread(image_path) if isinstance(image_path, str) else image_path
         
-        # 1. 首先进行文本检测
-        det_results = text_detection(image_path)
+        # 1. 首先进行文本检测；明显单行的图像跳过检测，整张图作为一个文本行
+        single_line = self.is_single_line(image)
+        if single_line:
+            height, width = image.shape[:2]
+            det_results = {
+                'dt_polys': [[[0, 0], [width, 0], [width, height], [0, height]]],
+                'dt_scores': [SINGLE_LINE_DETECTION_SCORE],
+            }
+        else:
+            det_results = text_detection(image, model=self.det_model)
         
-        all_results = []
-        # 2. 对每个检测到的区域进行处理
+        # 2. 从同一个像素数组中裁剪所有检测到的文本行
+        lines = []
         for idx, (poly, score) in enumerate(zip(det_results['dt_polys'], det_results['dt_scores'])):
-            # 裁剪检测到的文本区域
-            cropped = self.crop_image(image_path, poly)
-            
-            # 保存裁剪的图像（如果需要）
-            if save_crops:
-                crop_filename = f"text_area_{idx}_score_{score:.4f}.png"
-                crop_path = os.path.join(output_dir, crop_filename)
-                cropped.save(crop_path)
-                temp_path = crop_path
-            else:
-                # 如果不保存，使用临时目录
-                temp_dir = "./output/temp"
-                os.makedirs(temp_dir, exist_ok=True)
-                temp_path = os.path.join(temp_dir, f"temp_{idx}.png")
-                cropped.save(temp_path)
+            cropped = self.crop_image(image, poly)
+            if cropped.size == 0:
+                continue
             
-            # 3. 对裁剪区域进行文本识别
-            rec_result = recognize_text(temp_path)
-            
-            # 4. 整合结果
             result = {
                 'position': poly,
                 'detection_score': score,
-                'text': rec_result['rec_text'],
-                'recognition_score': rec_result['rec_score']
             }
+            # 保存裁剪的图像（如果需要）
             if save_crops:
+                score_tag = "single_line" if single_line else f"score_{score:.4f}"
+                crop_filename = f"text_area_{idx}_{score_tag}.png"
+                crop_path = os.path.join(output_dir, crop_filename)
+                cv2.imwrite(crop_path, cropped)
                 result['crop_path'] = crop_path
+            lines.append((cropped, result))
+        
+        # 3. 所有文本行按宽度分批一次识别
+        rec_results = recognize_text_batch(
+            [cropped for cropped, _ in lines],
+            batch_size=self.rec_batch_size,
+            model=self.rec_model,
+        )
+        
+        # 4. 整合结果（保持检测顺序）
+        all_results = []
+        for (_, result), rec_result in zip(lines, rec_results):
+            result['text'] = rec_result['rec_text']
+            result['recognition_score'] = rec_result['rec_score']
             all_results.append(result)
             
-            # 清理临时文件（如果不需要保存）
-            if not save_crops:
-                os.remove(temp_path)
-            
         return all_results
 
-    def extract_text(self, image_path: str, as_list: bool = False, save_crops: bool = False, output_dir: str = "./output/crops") -> Union[str, List[str]]:
+    def extract_text(self, image_path: Union[str, np.ndarray], as_list: bool = False, save_crops: bool = False, output_dir: str = "./output/crops") -> Union[str, List[str]]:
         """
         直接从图像中提取文本内容
         Args:
-            image_path: 输入图像路径
+            image_path: 输入图像路径或BGR像素数组
             as_list: 是否以列表形式返回每个检测区域的文本
             save_crops: 是否保存裁剪后的图像
             output_dir: 裁剪图像的保存目录
@@ -114,6 +203,72 @@ class OCRProcessor:
         else:
             return ''.join(texts)
     
+    def extract_text_batch(self, images: List[np.ndarray]) -> List[str]:
+        """
+        批量从多张图像中提取文本内容（文档级OCR阶段使用）
+
+        明显单行的图像直接作为文本行，其余图像批量检测，再把全部文本行
+        放在一起按宽度分批识别，每张图像的结果与extract_text的返回值一致。
+        Args:
+            images: BGR像素数组列表
+        Returns:
+            与images一一对应的文本列表
+        """
+        return [
+            ''.join(line['text'] for line in lines)
+            for lines in self.extract_lines_batch(images)
+        ]
+
+    def extract_lines_batch(self, images: List[np.ndarray]) -> List[List[Dict]]:
+        """
+        批量识别多张图像中的文本行，保留每行的识别置信度
+
+        Args:
+            images: BGR像素数组列表
+        Returns:
+            与images一一对应的文本行列表，每行包含text和score，按检测顺序排列
+        """
+        if not images:
+            return []
+
+        # 1. 单行图像直接识别，只有多行图像需要批量文本检测
+        lines = []
+        owners = []
+        multi_line = []
+        for image_index, image in enumerate(images):
+            if self.is_single_line(image):
+                lines.append(image)
+                owners.append(image_index)
+            else:
+                multi_line.append(image_index)
+        det_results = text_detection_batch(
+            [images[image_index] for image_index in multi_line],
+            batch_size=self.det_batch_size,
+            model=self.det_model,
+        )
+
+        # 2. 裁剪多行图像的文本行，记录所属图像
+        for image_index, det_result in zip(multi_line, det_results):
+            image = images[image_index]
+            for poly in det_result['dt_polys']:
+                cropped = self.crop_image(image, poly)
+                if cropped.size == 0:
+                    continue
+                lines.append(cropped)
+                owners.append(image_index)
+
+        # 3. 全部文本行一起识别
+        rec_results = recognize_text_batch(lines, batch_size=self.rec_batch_size, model=self.rec_model)
+
+        # 4. 按检测顺序归还各图像
+        image_lines = [[] for _ in images]
+        for image_index, rec_result in zip(owners, rec_results):
+            image_lines[image_index].append({
+                'text': rec_result['rec_text'],
+                'score': float(rec_result['rec_score']),
+            })
+        return image_lines
+    
     def save_results_to_json(self, results: List[Dict], output_path: str):
         """
         将OCR结果保存到JSON文件
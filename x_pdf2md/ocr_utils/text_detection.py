@@ -4,13 +4,14 @@
 # 2025-03-16
 
 # 导入必要的库
-import json
 import os
 from typing import List
-from paddlex import create_model  # PaddleX模型创建工具
 import numpy as np
 import cv2
 
+from x_pdf2md.image_utils.models import get_model  # 本地模型注册表
+from x_pdf2md.image_utils.result_adapter import result_to_dict, save_debug_json
+
 def is_same_line(box1, box2, height_threshold=0.5):
     """
     判断两个文本框是否在同一行
@@ -29,12 +30,17 @@ def is_same_line(box1, box2, height_threshold=0.5):
     
     return abs(box1_center - box2_center) < avg_height * height_threshold
 
-def merge_overlapping_boxes(boxes, scores):
+def merge_overlapping_boxes(boxes, scores, height_threshold=0.5):
     """
     合并同一行的重叠文本框
+
+    按y中心排序后，每个文本框只与y中心相近的窗口内的文本框比较；中心和高度一次性计算成数组。
+    合并规则与逐对调用is_same_line完全一致：按下标顺序，每个未处理的文本框
+    与其后所有和它在同一行的未处理文本框合并。
     Args:
         boxes: 所有文本框坐标列表 shape:(N,4,2)
         scores: 对应的置信度得分列表 shape:(N,)
+        height_threshold: 判定阈值，默认为文本框高度的0.5倍
     Returns:
         tuple: (合并后的文本框列表, 合并后的置信度列表)
     """
@@ -44,42 +50,43 @@ def merge_overlapping_boxes(boxes, scores):
     
     # 将输入的文本框列表转换为numpy数组，便于后续处理    
     boxes = np.array(boxes)
-    # 初始化合并后的文本框列表
+    n = len(boxes)
+    # 一次性计算所有文本框的y中心和高度
+    ys = boxes[:, :, 1]
+    centers = np.mean(boxes, axis=1)[:, 1]
+    heights = np.abs(ys.max(axis=1) - ys.min(axis=1))
+    max_height = heights.max()
+
+    # 按y中心排序，同一行的候选框只可能落在 |中心差| < (h_i + 最大高度) * 阈值 / 2 的窗口内
+    order = np.argsort(centers, kind="stable")
+    sorted_centers = centers[order]
+
     merged_boxes = []
-    # 初始化合并后的得分列表
     merged_scores = []
-    # 初始化标记数组，用于记录每个文本框是否已被处理
-    used = [False] * len(boxes)
+    used = np.zeros(n, dtype=bool)
     
-    # 遍历所有文本框
-    for i in range(len(boxes)):
-        # 如果当前文本框已被处理，则跳过
+    for i in range(n):
         if used[i]:
             continue
-        
-        # 获取当前文本框和其得分    
-        current_box = boxes[i]
-        current_score = scores[i]
-        # 初始化待合并文本框的索引列表
-        merged_indices = [i]
-        
-        # 寻找与当前文本框在同一行的其他文本框
-        for j in range(i + 1, len(boxes)):
-            # 如果目标文本框已被处理，则跳过
-            if used[j]:
-                continue
-            
-            # 判断两个文本框是否在同一行    
-            if is_same_line(boxes[i], boxes[j]):
-                merged_indices.append(j)
+
+        # 窗口略微放宽，避免浮点误差漏掉边界上的候选框，最终由精确条件判断
+        reach = (heights[i] + max_height) / 2 * height_threshold * (1 + 1e-9) + 1e-9
+        lo = np.searchsorted(sorted_centers, centers[i] - reach, side="left")
+        hi = np.searchsorted(sorted_centers, centers[i] + reach, side="right")
+        candidates = order[lo:hi]
+        candidates = np.sort(candidates[(candidates > i) & ~used[candidates]])
+
+        # 与is_same_line相同的判定条件
+        avg_height = (heights[i] + heights[candidates]) / 2
+        same_line = np.abs(centers[i] - centers[candidates]) < avg_height * height_threshold
+        merged_indices = [i] + candidates[same_line].tolist()
         
         # 如果找到了需要合并的文本框
         if len(merged_indices) > 1:
             # 将所有待合并文本框的坐标点重新整理
             merged_points = boxes[merged_indices].reshape(-1, 2)
-            # 计算合并后文本框的最小x和y坐标
+            # 计算合并后文本框的最小和最大坐标
             x_min, y_min = np.min(merged_points, axis=0)
-            # 计算合并后文本框的最大x和y坐标
             x_max, y_max = np.max(merged_points, axis=0)
             # 构建合并后的矩形文本框坐标
             merged_box = np.array([[x_min, y_min], [x_max, y_min],
@@ -88,14 +95,12 @@ def merge_overlapping_boxes(boxes, scores):
             merged_score = np.mean([scores[idx] for idx in merged_indices])
         else:
             # 如果没有需要合并的文本框，保持原状
-            merged_box = current_box
-            merged_score = current_score
+            merged_box = boxes[i]
+            merged_score = scores[i]
         
         # 标记所有已处理的文本框    
-        for idx in merged_indices:
-            used[idx] = True
+        used[merged_indices] = True
         
-        # 将处理结果添加到输出列表    
         merged_boxes.append(merged_box)
         merged_scores.append(merged_score)
     
@@ -106,23 +111,69 @@ def visualize_boxes(image_path, boxes, output_path="./output/merged_result.jpg")
     """
     将检测到的文本框可视化到图像上
     Args:
-        image_path: 原始图像路径
+        image_path: 原始图像路径或BGR像素数组
         boxes: 文本框坐标列表
         output_path: 可视化结果保存路径
     """
-    image = cv2.imread(image_path)
+    image = cv2.imread(image_path) if isinstance(image_path, str) else image_path.copy()
     for box in boxes:
         box = box.astype(np.int32)
         cv2.polylines(image, [box], True, (0, 255, 0), 2)
     cv2.imwrite(output_path, image)
 
+def _merge_detection_lines(detection_result: dict):
+    """
+    合并检测结果中同一行的文本框，原地更新dt_polys和dt_scores
+    Args:
+        detection_result: 文本检测结果字典
+    Returns:
+        合并后的文本框列表
+    """
+    # 提取文本框和置信度
+    boxes = np.array(detection_result['dt_polys'])  # 转换为numpy数组便于处理
+    scores = np.array(detection_result['dt_scores'])
+    
+    # 执行文本框合并
+    merged_boxes, merged_scores = merge_overlapping_boxes(boxes, scores)
+    
+    # 更新检测结果，将numpy数组转换回列表
+    detection_result['dt_polys'] = [box.tolist() if isinstance(box, np.ndarray) else box 
+                                  for box in merged_boxes]
+    detection_result['dt_scores'] = [float(score) if isinstance(score, np.ndarray) else score 
+                                   for score in merged_scores]
+    return merged_boxes
+
+def text_detection_batch(images: List[np.ndarray], batch_size: int = 8,
+                         model="PP-OCRv4_mobile_det") -> List[dict]:
+    """
+    批量执行文本检测
+    Args:
+        images: BGR像素数组列表
+        batch_size: 每批检测的图片数
+        model: 使用的PaddleOCR检测模型名称
+    Returns:
+        与images一一对应的检测结果字典列表（同一行的文本框已合并）
+    """
+    if not images:
+        return []
+
+    model = get_model(model)
+    output = model.predict(images, batch_size=batch_size)
+
+    results = []
+    for res in output:
+        detection_result = result_to_dict(res)
+        _merge_detection_lines(detection_result)
+        results.append(detection_result)
+    return results
+
 def text_detection(image_path, output_path="./output/res.json", model="PP-OCRv4_mobile_det", 
                   visualize=False) -> None:
     """
     执行文本检测的主函数
     Args:
-        image_path: 输入图像路径
-        output_path: 检测结果JSON保存路径
+        image_path: 输入图像路径或BGR像素数组
+        output_path: 调试模式下检测结果JSON的保存路径
         model: 使用的PaddleOCR模型名称
         visualize: 是否生成可视化结果
     Returns:
@@ -134,43 +185,25 @@ def text_detection(image_path, output_path="./output/res.json", model="PP-OCRv4_
                 'dt_scores': List[float]  # 置信度得分
             }
     """
-    # 创建输出目录
-    os.makedirs("output", exist_ok=True)
-    
-    # 初始化模型
-    model = create_model(model_name=model)
+    # 获取模型（已加载过的模型直接复用）
+    model = get_model(model)
 
     # 执行预测
     output = model.predict(image_path, batch_size=1)
 
     # 处理每个检测结果
     for res in output:
-        # 将原始结果保存为JSON
-        res.save_to_json(output_path)
-        
-        # 读取JSON结果进行后处理
-        with open(output_path, 'r', encoding='utf-8') as f:
-            detection_result = json.load(f)
-        
-        # 提取文本框和置信度
-        boxes = np.array(detection_result['dt_polys'])  # 转换为numpy数组便于处理
-        scores = np.array(detection_result['dt_scores'])
-        
-        # 执行文本框合并
-        merged_boxes, merged_scores = merge_overlapping_boxes(boxes, scores)
-        
-        # 更新检测结果，将numpy数组转换回列表
-        detection_result['dt_polys'] = [box.tolist() if isinstance(box, np.ndarray) else box 
-                                      for box in merged_boxes]
-        detection_result['dt_scores'] = [float(score) if isinstance(score, np.ndarray) else score 
-                                       for score in merged_scores]
+        # 直接在内存中转换结果，并合并同一行的文本框
+        detection_result = result_to_dict(res)
+        boxes = np.array(detection_result['dt_polys'])  # 原始文本框，用于可视化
+        merged_boxes = _merge_detection_lines(detection_result)
         
-        # 保存处理后的结果
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(detection_result, f, indent=4, ensure_ascii=False)
+        # 调试模式下保存处理后的结果
+        save_debug_json(detection_result, output_path)
         
         # 生成可视化结果（如果需要）
         if visualize:
+            os.makedirs("output", exist_ok=True)
             visualize_boxes(image_path, boxes, "./output/original_result.jpg")  # 原始检测框
             visualize_boxes(image_path, merged_boxes, "./output/merged_result.jpg")  # 合并后的检测框
         
@@ -1,40 +1,67 @@
-import json
-import os
-from paddlex import create_model
+from typing import List, Union
+
+import numpy as np
+
+from x_pdf2md.image_utils.models import get_model
+from x_pdf2md.image_utils.result_adapter import result_to_dict, save_debug_json
 
 
 def recognize_text(
-    input_image: str,
+    input_image: Union[str, np.ndarray],
     output_path: str = "./output/res.json",
     model="PP-OCRv4_mobile_rec",
 ) -> list:
     """
     识别图片中的文本
     Args:
-        input_image: 输入图片路径
-        output_dir: 输出目录路径
+        input_image: 输入图片路径或BGR像素数组
+        output_path: 调试模式下识别结果JSON的保存路径
     Returns:
         识别结果列表
     """
-    output_dir = os.path.dirname(output_path)
-    # 确保输出目录存在
-    os.makedirs(output_dir, exist_ok=True)
-
-    # 创建模型
-    model = create_model(model_name=model)
+    # 获取模型（已加载过的模型直接复用）
+    model = get_model(model)
 
     # 预测
     output = model.predict(input=input_image, batch_size=1)
 
+    # 直接在内存中转换结果
     for res in output:
-        res.save_to_json(save_path=output_path)
-
-    with open(output_path, "r", encoding="utf-8") as f:
-        result = json.load(f)
+        result = result_to_dict(res)
+        save_debug_json(result, output_path)
 
     return result
 
 
+def recognize_text_batch(
+    images: List[np.ndarray],
+    batch_size: int = 8,
+    model="PP-OCRv4_mobile_rec",
+) -> List[dict]:
+    """
+    批量识别多个文本行图片
+    Args:
+        images: 文本行BGR像素数组列表
+        batch_size: 每批识别的图片数
+        model: 使用的PaddleOCR识别模型名称
+    Returns:
+        与images一一对应的识别结果列表，每项包含rec_text和rec_score
+    """
+    if not images:
+        return []
+
+    # 按宽高比排序，同一批次内的文本行缩放到相近宽度，减少填充
+    order = sorted(range(len(images)), key=lambda i: images[i].shape[1] / max(images[i].shape[0], 1))
+
+    model = get_model(model)
+    output = model.predict(input=[images[i] for i in order], batch_size=batch_size)
+
+    results: List[dict] = [None] * len(images)
+    for position, res in enumerate(output):
+        results[order[position]] = result_to_dict(res)
+    return results
+
+
 # 使用示例:
 # results = recognize_text("text_area_4_score_0.9858.png")
 
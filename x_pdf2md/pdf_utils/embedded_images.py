@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+内嵌图片提取模块 - 图片类区域对应PDF中的图片对象(XObject)时，直接取出原始图片数据，
+避免从渲染后的页面裁剪再重新编码，并保留图片的原始分辨率
+"""
+import threading
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+import pdfplumber
+
+from x_pdf2md.config import get_config
+from x_pdf2md.pdf_utils.text_layer import raster_box_to_pdf
+
+# 可直接按像素解释的颜色空间及其通道数
+_RAW_COLORSPACE_CHANNELS = {"DeviceRGB": 3, "DeviceGray": 1, "CalRGB": 3, "CalGray": 1}
+
+
+def _literal_name(obj) -> Optional[str]:
+    """获取PDF名称对象(PSLiteral)的名称"""
+    if isinstance(obj, list) and obj:
+        obj = obj[0]
+    return getattr(obj, "name", None)
+
+
+def _box_iou(box1: Sequence[float], box2: Sequence[float]) -> float:
+    """计算两个 [x0, top, x1, bottom] 框的交并比"""
+    inter_w = min(box1[2], box2[2]) - max(box1[0], box2[0])
+    inter_h = min(box1[3], box2[3]) - max(box1[1], box2[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection = inter_w * inter_h
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    return intersection / (area1 + area2 - intersection)
+
+
+class PdfImageExtractor:
+    """从PDF中提取与版面区域对应的内嵌图片"""
+
+    def __init__(self, pdf_path: str, min_iou: Optional[float] = None):
+        """
+        初始化内嵌图片提取器
+
+        Args:
+            pdf_path: PDF文件路径
+            min_iou: 区域与图片对象的最小交并比，低于该值视为不匹配，None则使用配置
+        """
+        self.pdf = pdfplumber.open(pdf_path)
+        # 流水线模式下多个线程共用同一提取器时串行访问pdfplumber
+        self._lock = threading.Lock()
+        self.min_iou = min_iou if min_iou is not None else get_config()["EMBEDDED_IMAGE_MIN_IOU"]
+
+    def close(self) -> None:
+        """关闭PDF文件"""
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def find_region_image(self, page_number: int, box: Sequence[float], scale: float) -> Optional[dict]:
+        """
+        查找与区域重合度最高的图片对象
+
+        Args:
+            page_number: 页码（从1开始）
+            box: 渲染图像上的 [x1, y1, x2, y2] 像素坐标
+            scale: 渲染缩放比例（dpi / 72）
+
+        Returns:
+            pdfplumber图片对象；没有匹配的图片时返回None
+        """
+        if not box or len(box) != 4 or not scale:
+            return None
+        if page_number < 1 or page_number > len(self.pdf.pages):
+            return None
+
+        page = self.pdf.pages[page_number - 1]
+        region_bbox = raster_box_to_pdf(box, scale, page.bbox)
+        best_image, best_iou = None, self.min_iou
+        for image in page.images:
+            iou = _box_iou(region_bbox, (image["x0"], image["top"], image["x1"], image["bottom"]))
+            if iou >= best_iou:
+                best_image, best_iou = image, iou
+        return best_image
+
+    def _decode_image(self, image: dict):
+        """
+        读取图片对象的数据
+
+        Returns:
+            (数据, 扩展名)：JPEG图片返回原始字节和'jpg'，未压缩的RGB/灰度图片返回像素数组和'png'；
+            无法直接使用的图片返回None
+        """
+        if image.get("imagemask"):
+            return None
+
+        # 检查显示方向：宽高比与原始尺寸明显不一致时说明图片被旋转放置
+        src_width, src_height = image["srcsize"]
+        if not src_width or not src_height or not image["width"] or not image["height"]:
+            return None
+        if abs((src_width / src_height) / (image["width"] / image["height"]) - 1) > 0.1:
+            return None
+
+        stream = image["stream"]
+        filters = [_literal_name(name) for name, _ in stream.get_filters()]
+        colorspace = _literal_name(image.get("colorspace"))
+        data = stream.get_data()
+
+        if filters and filters[-1] == "DCTDecode":
+            # JPEG数据保持原样，CMYK的JPEG交给回退流程处理
+            if colorspace == "DeviceCMYK" or not data.startswith(b"\xff\xd8"):
+                return None
+            return data, "jpg"
+
+        if filters and filters[-1] not in ("FlateDecode", "LZWDecode", "RunLengthDecode"):
+            # JPX、JBIG2等格式无法直接使用
+            return None
+        if image.get("bits") != 8:
+            return None
+        if colorspace not in _RAW_COLORSPACE_CHANNELS and colorspace != "ICCBased":
+            return None
+
+        # 根据数据长度确定通道数（ICCBased的通道数由ICC配置决定）
+        pixel_count = src_width * src_height
+        channels = len(data) // pixel_count
+        if channels not in (1, 3) or channels * pixel_count != len(data):
+            return None
+        if colorspace in _RAW_COLORSPACE_CHANNELS and channels != _RAW_COLORSPACE_CHANNELS[colorspace]:
+            return None
+
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(src_height, src_width, channels)
+        if channels == 3:
+            pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+        return pixels, "png"
+
+    def extract_region_image(
+        self, page_number: int, box: Sequence[float], scale: float, output_path: str
+    ) -> Optional[str]:
+        """
+        提取区域对应的内嵌图片并保存
+
+        Args:
+            page_number: 页码（从1开始）
+            box: 渲染图像上的 [x1, y1, x2, y2] 像素坐标
+            scale: 渲染缩放比例（dpi / 72）
+            output_path: 输出路径（不含扩展名，扩展名由图片格式决定）
+
+        Returns:
+            保存的图片路径；没有匹配的内嵌图片或图片无法直接使用时返回None，由调用方回退到裁剪
+        """
+        with self._lock:
+            image = self.find_region_image(page_number, box, scale)
+            if image is None:
+                return None
+
+            try:
+                decoded = self._decode_image(image)
+            except Exception as e:
+                print(f"读取内嵌图片失败: {e}")
+                return None
+        if decoded is None:
+            return None
+
+        data, extension = decoded
+        image_path = f"{output_path}.{extension}"
+        if extension == "jpg":
+            with open(image_path, "wb") as f:
+                f.write(data)
+        else:
+            cv2.imwrite(image_path, data)
+        return image_path
+
+
+if __name__ == "__main__":
+    # 使用示例：提取第一页右上角的图片（坐标为300DPI渲染图像上的像素坐标）
+    with PdfImageExtractor("../tests/test_x_pdf2md.pdf") as extractor:
+        print(extractor.extract_region_image(1, [2005, 152, 2240, 490], 300 / 72, "./embedded_image"))
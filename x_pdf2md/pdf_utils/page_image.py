@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class PageImage:
+    """表示PDF中一页渲染后的内存图像"""
+    image: np.ndarray  # BGR格式的像素数组
+    page_index: int  # 页码（从0开始索引）
+    dpi: int  # 渲染分辨率
+    image_path: Optional[str] = None  # 调试模式下保存的PNG路径
+
+    @property
+    def scale(self) -> float:
+        """像素坐标与PDF坐标（1/72英寸）之间的缩放比例"""
+        return self.dpi / 72
+
+    def __str__(self) -> str:
+        height, width = self.image.shape[:2]
+        return f"PageImage(page={self.page_index}, size={width}x{height}, dpi={self.dpi})"
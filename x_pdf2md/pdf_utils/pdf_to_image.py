@@ -1,114 +1,470 @@
 import os
 import sys
-import pdfplumber
-from PIL import Image
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import pypdfium2
 from tqdm import tqdm
 
+from x_pdf2md.pdf_utils.page_image import PageImage
+from x_pdf2md.pdf_utils.raster_cache import RasterCache
+
+# 每个渲染进程持有的PDF句柄（由进程初始化函数打开，整个进程生命周期内复用）
+_WORKER_PDF = None
+
+# pdfium不是线程安全的：同一进程内所有打开、渲染、关闭PDF的操作都串行执行
+# （流水线模式下页面渲染和区域重新渲染在不同线程中进行）
+PDFIUM_LOCK = threading.RLock()
+
+
+def _open_pdf(pdf_path: str):
+    """在pdfium锁内打开PDF"""
+    with PDFIUM_LOCK:
+        return pypdfium2.PdfDocument(pdf_path)
+
+
+def _close_pdf(pdf) -> None:
+    """在pdfium锁内关闭PDF"""
+    with PDFIUM_LOCK:
+        pdf.close()
+
+
+def _render_page(pdf, page_number: int, dpi: int):
+    """
+    使用已打开的PDF句柄渲染单个页面
+
+    参数:
+        pdf: 已打开的pypdfium2.PdfDocument对象
+        page_number (int): 页码（从0开始索引）
+        dpi (int): 分辨率
+
+    返回:
+        numpy.ndarray: BGR格式的页面像素数组
+    """
+    with PDFIUM_LOCK:
+        page = pdf[page_number]
+        try:
+            # 与pdfplumber的page.to_image保持一致的渲染参数（关闭抗锯齿）
+            bitmap = page.render(
+                scale=dpi / 72,
+                no_smoothtext=True,
+                no_smoothpath=True,
+                no_smoothimage=True,
+            )
+            return bitmap.to_numpy().copy()
+        finally:
+            page.close()
+
+
+def _render_clip(pdf, page_number: int, bbox: Sequence[float], dpi: int):
+    """
+    使用已打开的PDF句柄只渲染页面上的一个矩形区域
+
+    参数:
+        pdf: 已打开的pypdfium2.PdfDocument对象
+        page_number (int): 页码（从0开始索引）
+        bbox: (x0, top, x1, bottom) 格式的PDF坐标（单位为点，原点在页面左上角）
+        dpi (int): 分辨率
+
+    返回:
+        numpy.ndarray: BGR格式的区域像素数组
+    """
+    with PDFIUM_LOCK:
+        page = pdf[page_number]
+        try:
+            width, height = page.get_size()
+            x0, top, x1, bottom = bbox
+            # pypdfium2的crop参数为从页面四边裁掉的距离：(左, 下, 右, 上)
+            crop = (
+                max(0.0, x0),
+                max(0.0, height - bottom),
+                max(0.0, width - x1),
+                max(0.0, top),
+            )
+            bitmap = page.render(
+                scale=dpi / 72,
+                crop=crop,
+                no_smoothtext=True,
+                no_smoothpath=True,
+                no_smoothimage=True,
+            )
+            return bitmap.to_numpy().copy()
+        finally:
+            page.close()
+
+
+def _init_render_worker(pdf_path: str) -> None:
+    """渲染进程初始化：每个进程只打开一次PDF"""
+    global _WORKER_PDF
+    _WORKER_PDF = _open_pdf(pdf_path)
+
+
+def _close_render_worker() -> None:
+    """关闭当前进程持有的PDF句柄"""
+    global _WORKER_PDF
+    if _WORKER_PDF is not None:
+        _close_pdf(_WORKER_PDF)
+        _WORKER_PDF = None
+
+
+def _render_pages_to_files(
+    page_numbers: Sequence[int], output_dir: str, pdf_name: str, dpi: int
+) -> List[Tuple[int, Optional[str]]]:
+    """
+    在渲染进程中将一段页面渲染并保存为PNG
+
+    返回:
+        list: (页码, 图片路径) 列表，渲染失败的页面路径为None
+    """
+    results = []
+    for page_num in page_numbers:
+        output_image = os.path.join(output_dir, f"{pdf_name}_page_{page_num+1}.png")
+        try:
+            image = _render_page(_WORKER_PDF, page_num, dpi)
+            cv2.imwrite(output_image, image)
+            results.append((page_num, output_image))
+        except Exception as e:
+            print(f"提取PDF第 {page_num} 页时出错: {e}")
+            results.append((page_num, None))
+    return results
+
+
+def _render_pages_to_arrays(page_numbers: Sequence[int], dpi: int) -> List[Tuple[int, object]]:
+    """
+    在渲染进程中将一段页面渲染为像素数组
+
+    返回:
+        list: (页码, BGR像素数组) 列表，渲染失败的页面数组为None
+    """
+    results = []
+    for page_num in page_numbers:
+        try:
+            results.append((page_num, _render_page(_WORKER_PDF, page_num, dpi)))
+        except Exception as e:
+            print(f"提取PDF第 {page_num} 页时出错: {e}")
+            results.append((page_num, None))
+    return results
+
+
+def _chunk_pages(page_numbers: Sequence[int], workers: int) -> List[List[int]]:
+    """
+    将页码切分为连续的页面区间，区间数量为worker数的若干倍以平衡负载
+    """
+    page_numbers = list(page_numbers)
+    if not page_numbers:
+        return []
+    chunk_count = min(len(page_numbers), workers * 4)
+    chunk_size = -(-len(page_numbers) // chunk_count)
+    return [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+
+
+def get_page_count(pdf_path: str) -> int:
+    """获取PDF总页数"""
+    pdf = _open_pdf(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        _close_pdf(pdf)
+
+
+def _resolve_page_range(pdf_path: str, start_page: int, end_page: Optional[int]) -> range:
+    """
+    校验并返回要处理的页码范围
+
+    参数:
+        pdf_path (str): PDF文件路径
+        start_page (int): 起始页码（从0开始索引）
+        end_page (int): 结束页码（包含），如果为None则处理所有页面
+
+    返回:
+        range: 页码范围
+    """
+    # 获取PDF总页数
+    total_pages = get_page_count(pdf_path)
+
+    # 如果未指定结束页码，则处理所有页面
+    if end_page is None:
+        end_page = total_pages - 1
+
+    # 验证页码范围
+    if start_page < 0 or start_page >= total_pages:
+        raise ValueError(f"起始页码 {start_page} 无效。PDF共有 {total_pages} 页。")
+
+    if end_page < start_page or end_page >= total_pages:
+        raise ValueError(f"结束页码 {end_page} 无效。PDF共有 {total_pages} 页。")
+
+    return range(start_page, end_page + 1)
+
+
 def pdf_page_to_image(pdf_path, page_number, output_path, dpi=300):
     """
     将PDF中的指定页面提取为高分辨率图片。
-    
+
     参数:
         pdf_path (str): PDF文件路径
         page_number (int): 要提取的页码（从0开始索引）
         output_path (str): 输出图片的保存路径
         dpi (int): 分辨率（每英寸点数），数值越高质量越好
-    
+
     返回:
         str: 已保存图片的路径
     """
     try:
         # 创建输出目录（如果不存在）
         os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-        
-        # 使用pdfplumber打开PDF
-        with pdfplumber.open(pdf_path) as pdf:
+
+        pdf = _open_pdf(pdf_path)
+        try:
             # 检查页码是否有效
-            if page_number < 0 or page_number >= len(pdf.pages):
-                raise ValueError(f"页码 {page_number} 超出范围。PDF共有 {len(pdf.pages)} 页。")
-            
-            # 获取指定页面
-            page = pdf.pages[page_number]
-            
-            # 将页面转换为图像
-            img = page.to_image(resolution=dpi)
-            
-            # 保存图像
-            img.save(output_path, format="PNG")
-        
+            if page_number < 0 or page_number >= len(pdf):
+                raise ValueError(f"页码 {page_number} 超出范围。PDF共有 {len(pdf)} 页。")
+
+            # 将页面转换为图像并保存
+            cv2.imwrite(output_path, _render_page(pdf, page_number, dpi))
+        finally:
+            _close_pdf(pdf)
+
         return output_path
-    
+
     except Exception as e:
         print(f"提取PDF页面时出错: {e}")
         return None
 
-def pdf_to_images(pdf_path, output_dir, start_page=0, end_page=None, dpi=300):
+def pdf_to_images(pdf_path, output_dir, start_page=0, end_page=None, dpi=300, workers=1):
     """
     将PDF文件转换为一系列图像
-    
+
+    每个渲染进程只打开一次PDF并复用句柄渲染分配给它的页面区间，
+    结果按页码顺序返回。
+
     参数:
         pdf_path (str): PDF文件路径
         output_dir (str): 输出图像的目录
         start_page (int): 起始页码（从0开始索引）
         end_page (int): 结束页码（包含），如果为None则处理所有页面
         dpi (int): 分辨率
-    
+        workers (int): 渲染进程数，小于等于1时在当前进程中渲染
+
     返回:
         list: 已生成图像的路径列表
     """
     # 创建输出目录
     os.makedirs(output_dir, exist_ok=True)
-    
+
     # 获取PDF文件名（不含扩展名）
     pdf_name = Path(pdf_path).stem
-    
+
     try:
-        # 使用pdfplumber获取PDF总页数
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-        
-        # 如果未指定结束页码，则处理所有页面
-        if end_page is None:
-            end_page = total_pages - 1
-        
-        # 验证页码范围
-        if start_page < 0 or start_page >= total_pages:
-            raise ValueError(f"起始页码 {start_page} 无效。PDF共有 {total_pages} 页。")
-        
-        if end_page < start_page or end_page >= total_pages:
-            raise ValueError(f"结束页码 {end_page} 无效。PDF共有 {total_pages} 页。")
-        
-        # 存储图像路径
-        image_paths = []
-        
-        # 处理每个页面
-        page_range = range(start_page, end_page + 1)
-        for page_num in tqdm(page_range, desc="转换PDF页面为图像"):
-            # 设置输出图像路径
-            output_image = os.path.join(output_dir, f"{pdf_name}_page_{page_num+1}.png")
-            
-            # 转换页面为图像
-            result = pdf_page_to_image(pdf_path, page_num, output_image, dpi)
-            
-            if result:
-                image_paths.append(result)
-        
-        return image_paths
-        
+        page_range = _resolve_page_range(pdf_path, start_page, end_page)
+        workers = max(1, min(workers or 1, len(page_range)))
+        chunks = _chunk_pages(page_range, workers)
+
+        # 存储(页码, 图像路径)
+        rendered = []
+        progress = tqdm(total=len(page_range), desc="转换PDF页面为图像")
+        if workers == 1:
+            # 单进程：只打开一次PDF，顺序渲染
+            _init_render_worker(pdf_path)
+            try:
+                for chunk in chunks:
+                    rendered.extend(_render_pages_to_files(chunk, output_dir, pdf_name, dpi))
+                    progress.update(len(chunk))
+            finally:
+                _close_render_worker()
+        else:
+            # 多进程：每个进程在初始化时打开自己的PDF句柄
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_render_worker,
+                initargs=(pdf_path,),
+            ) as executor:
+                futures = [
+                    executor.submit(_render_pages_to_files, chunk, output_dir, pdf_name, dpi)
+                    for chunk in chunks
+                ]
+                for future, chunk in zip(futures, chunks):
+                    rendered.extend(future.result())
+                    progress.update(len(chunk))
+        progress.close()
+
+        # 按页码顺序返回成功生成的图像路径
+        rendered.sort(key=lambda item: item[0])
+        return [path for _, path in rendered if path]
+
     except Exception as e:
         print(f"处理PDF时出错: {e}")
         return []
 
 
+def _iter_rendered_pages(
+    pdf_path: str, page_numbers: Sequence[int], dpi: int, workers: int
+) -> Iterator[Tuple[int, object]]:
+    """
+    按页码顺序渲染页面，生成(页码, BGR像素数组)，渲染失败的页面数组为None
+
+    参数:
+        pdf_path (str): PDF文件路径
+        page_numbers: 要渲染的页码列表（从0开始索引）
+        dpi (int): 分辨率
+        workers (int): 渲染进程数，小于等于1时在当前进程中渲染
+    """
+    workers = max(1, min(workers or 1, len(page_numbers)))
+    if not page_numbers:
+        return
+
+    if workers == 1:
+        # 单进程：只打开一次PDF，渲染一页产出一页
+        pdf = _open_pdf(pdf_path)
+        try:
+            for page_num in page_numbers:
+                try:
+                    yield page_num, _render_page(pdf, page_num, dpi)
+                except Exception as e:
+                    print(f"提取PDF第 {page_num} 页时出错: {e}")
+                    yield page_num, None
+        finally:
+            _close_pdf(pdf)
+        return
+
+    # 多进程：限制在途的页面区间数量，避免一次性把所有页面都放进内存
+    chunks = _chunk_pages(page_numbers, workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_render_worker,
+        initargs=(pdf_path,),
+    ) as executor:
+        pending = deque()
+        chunk_iter = iter(chunks)
+        for chunk in islice(chunk_iter, workers * 2):
+            pending.append(executor.submit(_render_pages_to_arrays, chunk, dpi))
+        while pending:
+            rendered = pending.popleft().result()
+            next_chunk = next(chunk_iter, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(_render_pages_to_arrays, next_chunk, dpi))
+            yield from rendered
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    start_page: int = 0,
+    end_page: Optional[int] = None,
+    dpi: int = 300,
+    workers: int = 1,
+    debug_output_dir: Optional[str] = None,
+    cache: Optional[RasterCache] = None,
+) -> Iterator[PageImage]:
+    """
+    按页码顺序逐页生成内存中的页面图像，不经过PNG编码/解码
+
+    参数:
+        pdf_path (str): PDF文件路径
+        start_page (int): 起始页码（从0开始索引）
+        end_page (int): 结束页码（包含），如果为None则处理所有页面
+        dpi (int): 分辨率
+        workers (int): 渲染进程数，小于等于1时在当前进程中渲染
+        debug_output_dir (str): 调试用，指定后同时将每页保存为PNG
+        cache (RasterCache): 可选的页面栅格缓存，命中的页面不再重新渲染
+
+    返回:
+        Iterator[PageImage]: 页面图像生成器
+    """
+    page_range = _resolve_page_range(pdf_path, start_page, end_page)
+    pdf_name = Path(pdf_path).stem
+    if debug_output_dir:
+        os.makedirs(debug_output_dir, exist_ok=True)
+
+    # 先查询缓存，只渲染未命中的页面
+    doc_hash = cache.hash_document(pdf_path) if cache else None
+    cached_pages = {
+        page_num for page_num in page_range
+        if cache and cache.contains(doc_hash, page_num, dpi)
+    }
+    to_render = [page_num for page_num in page_range if page_num not in cached_pages]
+    rendered_pages = _iter_rendered_pages(pdf_path, to_render, dpi, workers)
+
+    for page_num in page_range:
+        image = None
+        if page_num in cached_pages:
+            image = cache.get(doc_hash, page_num, dpi)
+            if image is None:
+                # 缓存项可能已被其他进程淘汰，回退到直接渲染
+                pdf = _open_pdf(pdf_path)
+                try:
+                    image = _render_page(pdf, page_num, dpi)
+                finally:
+                    _close_pdf(pdf)
+        else:
+            _, image = next(rendered_pages)
+            if image is None:
+                continue
+            if cache:
+                cache.put(doc_hash, page_num, dpi, image)
+
+        image_path = None
+        if debug_output_dir:
+            image_path = os.path.join(debug_output_dir, f"{pdf_name}_page_{page_num+1}.png")
+            cv2.imwrite(image_path, image)
+        yield PageImage(image=image, page_index=page_num, dpi=dpi, image_path=image_path)
+
+
+class PdfRegionRenderer:
+    """
+    PDF区域渲染器：在低分辨率页面上完成版面分析后，
+    只把需要高清图像的区域按高分辨率重新渲染
+    """
+
+    def __init__(self, pdf_path: str, dpi: int = 300):
+        """
+        初始化区域渲染器
+
+        参数:
+            pdf_path (str): PDF文件路径
+            dpi (int): 区域重新渲染使用的分辨率
+        """
+        self.pdf = _open_pdf(pdf_path)
+        self.dpi = dpi
+
+    def close(self) -> None:
+        """关闭PDF文件"""
+        _close_pdf(self.pdf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def render_region(self, page_index: int, box: Sequence[float], scale: float):
+        """
+        按高分辨率重新渲染低分辨率图像上的一个区域
+
+        参数:
+            page_index (int): 页码（从0开始索引）
+            box: 低分辨率图像上的 [x1, y1, x2, y2] 像素坐标
+            scale (float): 低分辨率图像的缩放比例（dpi / 72）
+
+        返回:
+            numpy.ndarray: BGR格式的高分辨率区域像素数组
+        """
+        bbox = [coord / scale for coord in box]
+        return _render_clip(self.pdf, page_index, bbox, self.dpi)
+
+
 # 如果需要命令行使用，保留此部分；否则可以删除
 if __name__ == "__main__":
-    
+
     pdf_path = "./test_x_pdf2md.pdf"
     output_dir = "./output"
           # 转换PDF到图像
     image_paths = pdf_to_images(
         pdf_path=pdf_path,
         output_dir=output_dir,
-        dpi=300
-    )
\ No newline at end of file
+        dpi=300,
+        workers=os.cpu_count() or 1,
+    )
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+页面栅格缓存模块 - 按PDF内容哈希、页码、DPI和渲染器版本缓存渲染后的页面像素
+
+缓存项以无损压缩的PNG文件保存（300DPI的页面通常只有1~3MB，未压缩约25MB），
+写入时先写临时文件再原子替换，多个进程可以共享同一缓存目录；
+读取时更新文件修改时间，总大小超过上限时按最近最少使用(LRU)顺序淘汰到上限的一定比例以下，
+之后的若干次写入不需要再扫描缓存目录。
+"""
+import hashlib
+import os
+import tempfile
+from importlib import metadata
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+
+def _get_renderer_version() -> str:
+    """渲染器版本标识：渲染库版本 + 本项目渲染参数版本"""
+    try:
+        pdfium_version = metadata.version("pypdfium2")
+    except metadata.PackageNotFoundError:
+        pdfium_version = "unknown"
+    # 修改渲染参数（如抗锯齿、颜色格式）时需要同步更新末尾的版本号
+    return f"pdfium{pdfium_version}-bgr-v1"
+
+
+RENDERER_VERSION = _get_renderer_version()
+
+# PNG压缩级别：页面以大块纯色为主，低压缩级别已能获得大部分压缩率，编码也快得多
+_PNG_COMPRESSION = 1
+
+# 缓存项文件扩展名；.npy为旧版本的未压缩缓存项，仍计入大小以便被淘汰
+_ENTRY_SUFFIX = ".png"
+_LEGACY_SUFFIXES = (".npy",)
+
+
+class RasterCache:
+    """基于文件系统的页面栅格缓存"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2048 * 1024 * 1024, low_water_ratio: float = 0.8):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            low_water_ratio: 超过上限时淘汰到max_bytes的该比例以下，留出空间分摊目录扫描
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.low_water_bytes = int(max_bytes * low_water_ratio)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 文档哈希缓存，避免同一文件在一次运行中重复计算
+        self._doc_hashes: Dict[str, str] = {}
+        # 当前缓存大小的估计值，超过上限时再扫描目录精确淘汰
+        self._approx_size = self._scan_size()
+
+    def hash_document(self, pdf_path: str) -> str:
+        """
+        计算PDF文件内容的SHA-256哈希
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            十六进制哈希字符串
+        """
+        stat = os.stat(pdf_path)
+        memo_key = f"{os.path.abspath(pdf_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if memo_key not in self._doc_hashes:
+            sha256 = hashlib.sha256()
+            with open(pdf_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(block)
+            self._doc_hashes[memo_key] = sha256.hexdigest()
+        return self._doc_hashes[memo_key]
+
+    def _entry_path(self, doc_hash: str, page_index: int, dpi: int) -> str:
+        """缓存项路径：<缓存目录>/<哈希前2位>/<哈希>/<页码>_<dpi>_<渲染器版本>.png"""
+        return os.path.join(
+            self.cache_dir,
+            doc_hash[:2],
+            doc_hash,
+            f"{page_index}_{dpi}_{RENDERER_VERSION}{_ENTRY_SUFFIX}",
+        )
+
+    def contains(self, doc_hash: str, page_index: int, dpi: int) -> bool:
+        """判断缓存中是否存在该页"""
+        return os.path.exists(self._entry_path(doc_hash, page_index, dpi))
+
+    def get(self, doc_hash: str, page_index: int, dpi: int) -> Optional[np.ndarray]:
+        """
+        读取缓存的页面像素
+
+        Args:
+            doc_hash: 文档内容哈希
+            page_index: 页码（从0开始索引）
+            dpi: 渲染分辨率
+
+        Returns:
+            BGR像素数组；未命中或缓存项已损坏时返回None
+        """
+        path = self._entry_path(doc_hash, page_index, dpi)
+        try:
+            with open(path, "rb") as f:
+                data = np.frombuffer(f.read(), dtype=np.uint8)
+            image = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+            if image is None:
+                # 写入不完整或已损坏
+                return None
+            # 更新访问时间，用于LRU淘汰
+            os.utime(path, None)
+            return image
+        except OSError:
+            # 文件不存在或已被其他进程淘汰
+            return None
+
+    def put(self, doc_hash: str, page_index: int, dpi: int, image: np.ndarray) -> None:
+        """
+        写入页面像素（先写临时文件再原子替换）
+
+        Args:
+            doc_hash: 文档内容哈希
+            page_index: 页码（从0开始索引）
+            dpi: 渲染分辨率
+            image: BGR像素数组
+        """
+        ok, buffer = cv2.imencode(_ENTRY_SUFFIX, image, [cv2.IMWRITE_PNG_COMPRESSION, _PNG_COMPRESSION])
+        if not ok:
+            print("写入页面缓存失败: 无法编码页面图像")
+            return
+
+        path = self._entry_path(doc_hash, page_index, dpi)
+        entry_dir = os.path.dirname(path)
+        os.makedirs(entry_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=entry_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(buffer.tobytes())
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"写入页面缓存失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        self._approx_size += buffer.nbytes
+        if self._approx_size > self.max_bytes:
+            self.evict()
+
+    def _scan_size(self) -> int:
+        """扫描缓存目录，返回缓存总大小"""
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def _iter_entries(self):
+        """遍历所有缓存项，生成(路径, 大小, 最后访问时间)"""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith((_ENTRY_SUFFIX,) + _LEGACY_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def evict(self) -> None:
+        """按LRU顺序删除缓存项，直到总大小不超过low_water_bytes（只在超过上限后调用）"""
+        entries = sorted(self._iter_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            # 估计值偏大（如其他进程已淘汰了部分缓存项），不需要淘汰
+            self._approx_size = total
+            return
+        for path, size, _ in entries:
+            if total <= self.low_water_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # 可能已被其他进程删除
+                pass
+            total -= size
+        self._approx_size = total
+
+
+if __name__ == "__main__":
+    # 使用示例
+    cache = RasterCache("./raster_cache", max_bytes=100 * 1024 * 1024)
+    doc_hash = cache.hash_document("../tests/test_x_pdf2md.pdf")
+    cache.put(doc_hash, 0, 72, np.zeros((842, 596, 3), dtype=np.uint8))
+    print(cache.get(doc_hash, 0, 72).shape)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PDF文本层提取模块 - 对原生数字PDF直接从文本层读取区域文字，避免调用VLM/OCR
+"""
+import re
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import pdfplumber
+
+from x_pdf2md.config import get_config
+
+# CJK字符（中日韩统一表意文字、假名、全角标点等），拼接行时不插入空格
+_CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+
+def raster_box_to_pdf(
+    box: Sequence[float], scale: float, page_bbox: Sequence[float] = (0, 0)
+) -> Tuple[float, float, float, float]:
+    """
+    将渲染图像上的像素坐标映射回PDF坐标（pdfplumber坐标系，原点在页面左上角）
+
+    参数:
+        box: [x1, y1, x2, y2] 格式的像素坐标
+        scale: 渲染缩放比例（dpi / 72）
+        page_bbox: 页面在PDF坐标系中的边界框，渲染图像的原点对应其左上角
+
+    返回:
+        tuple: (x0, top, x1, bottom) 格式的PDF坐标
+    """
+    x1, y1, x2, y2 = box
+    offset_x, offset_y = page_bbox[0], page_bbox[1]
+    return (
+        x1 / scale + offset_x,
+        y1 / scale + offset_y,
+        x2 / scale + offset_x,
+        y2 / scale + offset_y,
+    )
+
+
+def _is_garbled_char(text: str) -> bool:
+    """判断字符是否为无法解码的乱码字符"""
+    if text.startswith("(cid:"):
+        return True
+    for ch in text:
+        code = ord(ch)
+        # 替换字符、私有区字符和控制字符都视为乱码
+        if ch == "\ufffd" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\t\n\r"):
+            return True
+    return False
+
+
+def _join_lines(text: str) -> str:
+    """将文本层提取的多行文字合并为一个段落"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        return ""
+    merged = lines[0]
+    for line in lines[1:]:
+        if merged.endswith("-") and line[0].islower():
+            # 英文断词连字符
+            merged = merged[:-1] + line
+        elif _CJK_PATTERN.match(merged[-1]) or _CJK_PATTERN.match(line[0]):
+            merged += line
+        else:
+            merged += " " + line
+    return merged
+
+
+class PdfTextLayer:
+    """PDF文本层读取器，按渲染图像上的区域坐标取出对应的文字"""
+
+    def __init__(
+        self,
+        pdf_path: str,
+        min_coverage: Optional[float] = None,
+        max_garbled_ratio: Optional[float] = None,
+    ):
+        """
+        初始化文本层读取器
+
+        Args:
+            pdf_path: PDF文件路径
+            min_coverage: 字符面积占区域面积的最小比例，低于该值视为文本层过于稀疏，None则使用配置
+            max_garbled_ratio: 乱码字符的最大占比，超过该值视为文本层不可用，None则使用配置
+        """
+        config = get_config()
+        self.pdf = pdfplumber.open(pdf_path)
+        # pdfplumber按需解析并缓存页面对象，流水线模式下多个线程共用同一读取器时需要串行访问
+        self._lock = threading.Lock()
+        self.min_coverage = (
+            min_coverage if min_coverage is not None else config["TEXT_LAYER_MIN_COVERAGE"]
+        )
+        self.max_garbled_ratio = (
+            max_garbled_ratio if max_garbled_ratio is not None else config["TEXT_LAYER_MAX_GARBLED"]
+        )
+
+    def close(self) -> None:
+        """关闭PDF文件"""
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_region_chars(self, page_number: int, box: Sequence[float], scale: float) -> List[dict]:
+        """
+        获取区域内的字符（以字符中心点是否落在区域内判断）
+
+        Args:
+            page_number: 页码（从1开始）
+            box: 渲染图像上的 [x1, y1, x2, y2] 像素坐标
+            scale: 渲染缩放比例（dpi / 72）
+
+        Returns:
+            pdfplumber字符对象列表
+        """
+        page = self.pdf.pages[page_number - 1]
+        x0, top, x1, bottom = raster_box_to_pdf(box, scale, page.bbox)
+        return [
+            char for char in page.chars
+            if x0 <= (char["x0"] + char["x1"]) / 2 <= x1
+            and top <= (char["top"] + char["bottom"]) / 2 <= bottom
+        ]
+
+    def is_usable(self, chars: List[dict], box: Sequence[float], scale: float) -> bool:
+        """
+        判断区域的文本层是否可信：缺失、乱码或过于稀疏时返回False
+
+        Args:
+            chars: 区域内的字符对象列表
+            box: 渲染图像上的 [x1, y1, x2, y2] 像素坐标
+            scale: 渲染缩放比例（dpi / 72）
+
+        Returns:
+            bool: 文本层是否可用
+        """
+        visible_chars = [char for char in chars if char["text"].strip()]
+        if not visible_chars:
+            return False
+
+        # 乱码检查
+        garbled = sum(1 for char in visible_chars if _is_garbled_char(char["text"]))
+        if garbled / len(visible_chars) > self.max_garbled_ratio:
+            return False
+
+        # 稀疏检查：字符覆盖面积相对于区域面积过小，说明区域中大部分内容不在文本层中
+        region_area = ((box[2] - box[0]) / scale) * ((box[3] - box[1]) / scale)
+        if region_area <= 0:
+            return False
+        char_area = sum(
+            (char["x1"] - char["x0"]) * (char["bottom"] - char["top"]) for char in visible_chars
+        )
+        return char_area / region_area >= self.min_coverage
+
+    def extract_region_text(
+        self, page_number: int, box: Sequence[float], scale: float
+    ) -> Optional[str]:
+        """
+        从文本层提取区域文字
+
+        Args:
+            page_number: 页码（从1开始）
+            box: 渲染图像上的 [x1, y1, x2, y2] 像素坐标
+            scale: 渲染缩放比例（dpi / 72）
+
+        Returns:
+            区域文字；文本层缺失、乱码或过于稀疏时返回None，由调用方回退到VLM/OCR
+        """
+        if not box or len(box) != 4 or not scale:
+            return None
+
+        with self._lock:
+            # pdfplumber的pages按需构建，页码检查也要在锁内进行
+            if page_number < 1 or page_number > len(self.pdf.pages):
+                return None
+            chars = self.get_region_chars(page_number, box, scale)
+            if not self.is_usable(chars, box, scale):
+                return None
+
+            # 只保留区域内的字符，交给pdfplumber按行组织文字
+            char_ids = {id(char) for char in chars}
+            page = self.pdf.pages[page_number - 1]
+            region_page = page.filter(lambda obj: id(obj) in char_ids)
+            text = _join_lines(region_page.extract_text() or "")
+        return text or None
+
+
+if __name__ == "__main__":
+    # 使用示例：读取第一页顶部区域的文字（坐标为300DPI渲染图像上的像素坐标）
+    with PdfTextLayer("../tests/test_x_pdf2md.pdf") as text_layer:
+        print(text_layer.extract_region_text(1, [200, 150, 2300, 850], 300 / 72))
@@ -0,0 +1,204 @@
+"""
+流水线执行模块 - 把文档处理拆成多个阶段，阶段之间用有界队列连接
+
+每个阶段有自己的工作线程数，队列满时上游阶段阻塞等待（背压），
+因此渲染、版面分析、本地识别、VLM请求和Markdown拼接可以在不同页面上同时进行，
+而在途的页面数量始终有上限。结果按输入顺序返回。
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+from x_pdf2md.config import get_config
+
+# 阶段结束标记
+_DONE = object()
+
+# 阻塞等待队列时检查停止信号的间隔(秒)
+_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class Stage:
+    """
+    流水线中的一个阶段
+
+    func接收一批输入（长度不超过batch_size的列表）并返回等长的结果列表；
+    batch_size大于1时，工作线程取到一项后会顺带取走队列中已就绪的项（最多batch_size项），
+    不会为了凑满一批而等待。
+    """
+    name: str
+    func: Callable[[List[Any]], List[Any]]
+    workers: int = 1
+    batch_size: int = 1
+
+
+class StagePipeline:
+    """由有界队列串联的多阶段执行器"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 2):
+        """
+        初始化流水线
+
+        Args:
+            stages: 按执行顺序排列的阶段列表
+            queue_size: 每个阶段输入队列的容量（项数），决定相邻阶段之间最多积压多少项
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        # 每个阶段的累计处理时间(秒)，用于判断瓶颈阶段
+        self.busy_time = {stage.name: 0.0 for stage in stages}
+
+    def run(self, source: Iterable[Any]) -> List[Any]:
+        """
+        执行流水线
+
+        Args:
+            source: 输入项的可迭代对象，在单独的线程中迭代（本身即为第一个阶段）
+
+        Returns:
+            最后一个阶段的结果列表，顺序与source一致
+
+        Raises:
+            任一阶段（或source）抛出的第一个异常；出现异常后其余阶段尽快停止
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = {}
+        errors = []
+        stop = threading.Event()
+        lock = threading.Lock()
+        # 每个阶段尚未退出的工作线程数，最后一个退出的线程负责通知下游阶段
+        remaining = [max(1, stage.workers) for stage in self.stages]
+
+        def fail(error: BaseException) -> None:
+            with lock:
+                errors.append(error)
+            stop.set()
+
+        def put(target: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source_queue: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return source_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def finish_stage(index: int) -> None:
+            with lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(remaining[index + 1]):
+                    put(queues[index + 1], _DONE)
+
+        def feed() -> None:
+            try:
+                for position, item in enumerate(source):
+                    if not put(queues[0], (position, item)):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                for _ in range(remaining[0]):
+                    put(queues[0], _DONE)
+
+        def work(index: int) -> None:
+            stage = self.stages[index]
+            batch_size = max(1, stage.batch_size)
+            finished = False
+            try:
+                while not finished and not stop.is_set():
+                    entry = get(queues[index])
+                    if entry is _DONE:
+                        break
+                    batch = [entry]
+                    while len(batch) < batch_size:
+                        try:
+                            entry = queues[index].get_nowait()
+                        except queue.Empty:
+                            break
+                        if entry is _DONE:
+                            finished = True
+                            break
+                        batch.append(entry)
+
+                    started = time.perf_counter()
+                    outputs = stage.func([item for _, item in batch])
+                    elapsed = time.perf_counter() - started
+                    if len(outputs) != len(batch):
+                        raise ValueError(f"阶段 {stage.name} 返回了 {len(outputs)} 个结果，应为 {len(batch)} 个")
+                    with lock:
+                        self.busy_time[stage.name] += elapsed
+
+                    for (position, _), output in zip(batch, outputs):
+                        if index + 1 < len(self.stages):
+                            if not put(queues[index + 1], (position, output)):
+                                return
+                        else:
+                            with lock:
+                                results[position] = output
+            except BaseException as e:
+                fail(e)
+            finally:
+                finish_stage(index)
+
+        threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}-{worker}", daemon=True)
+                for worker in range(max(1, stage.workers))
+            )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return [results[position] for position in sorted(results)]
+
+
+def run_pipeline(source: Iterable[Any], stages: List[Stage], queue_size: Optional[int] = None) -> List[Any]:
+    """
+    用有界队列串联各阶段处理source中的每一项
+
+    参数:
+        source: 输入项的可迭代对象
+        stages: 按执行顺序排列的阶段列表
+        queue_size: 阶段之间的队列容量，None则使用配置PIPELINE_QUEUE_SIZE
+
+    返回:
+        最后一个阶段的结果列表，顺序与source一致
+    """
+    if queue_size is None:
+        queue_size = get_config()["PIPELINE_QUEUE_SIZE"]
+    return StagePipeline(stages, queue_size).run(source)
+
+
+if __name__ == "__main__":
+    # 使用示例：模拟"本地计算 -> 网络等待"两个阶段，第二阶段用多个线程掩盖等待时间
+    def compute(items):
+        time.sleep(0.05 * len(items))
+        return [item * item for item in items]
+
+    def remote(items):
+        time.sleep(0.2)
+        return [f"结果{item}" for item in items]
+
+    pipeline = StagePipeline([Stage("compute", compute), Stage("remote", remote, workers=4)])
+    started = time.perf_counter()
+    print(pipeline.run(range(8)))
+    print(f"耗时 {time.perf_counter() - started:.2f}s，各阶段累计耗时: {pipeline.busy_time}")
@@ -0,0 +1,209 @@
+"""
+区域路由模块 - 按标签决定区域内容由本地模型还是VLM生成
+
+每个标签对应一种策略：
+    vlm:       直接请求VLM
+    ocr:       只使用本地OCR
+    ocr_first: 先用本地OCR，识别置信度低或区域包含公式、表格结构时再请求VLM
+离线模式下不发出任何网络请求，需要VLM的文字类区域退回本地OCR，图片不生成描述和标题。
+"""
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from x_pdf2md.config import get_config
+from x_pdf2md.image_utils.region_image import RegionImage
+
+ROUTE_VLM = "vlm"
+ROUTE_OCR = "ocr"
+ROUTE_OCR_FIRST = "ocr_first"
+ROUTES = (ROUTE_VLM, ROUTE_OCR, ROUTE_OCR_FIRST)
+
+# 默认策略：正文先走本地OCR，表格和图片走VLM，标题类走本地OCR
+DEFAULT_POLICIES = {
+    "text": ROUTE_OCR_FIRST,
+    "table": ROUTE_VLM,
+    "image": ROUTE_VLM,
+    "figure": ROUTE_VLM,
+    "chart": ROUTE_VLM,
+    "doc_title": ROUTE_OCR,
+    "paragraph_title": ROUTE_OCR,
+    "chart_title": ROUTE_OCR,
+    "table_title": ROUTE_OCR,
+    "figure_title": ROUTE_OCR,
+    "abstract": ROUTE_OCR,
+}
+
+# 图片类标签没有本地替代方案
+IMAGE_LABELS = ("image", "figure", "chart")
+
+
+def parse_policies(spec: str) -> Dict[str, str]:
+    """
+    解析"标签:策略"形式的配置，如"text:vlm,table:ocr_first"
+
+    参数:
+        spec: 逗号分隔的标签策略配置
+
+    返回:
+        标签到策略的字典
+    """
+    policies = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        label, _, route = item.partition(":")
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"未知的路由策略: {item.strip()}")
+        policies[label.strip()] = route
+    return policies
+
+
+def join_lines(texts: List[str]) -> str:
+    """拼接OCR文本行：两侧都是西文字符时补一个空格，中文直接相连"""
+    result = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if result and result[-1].isascii() and result[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+            result += " "
+        result += text
+    return result
+
+
+def looks_like_table(image: np.ndarray) -> bool:
+    """
+    判断区域是否含有表格结构（至少两条长横线和两条长竖线）
+
+    参数:
+        image: BGR像素数组
+
+    返回:
+        bool: True表示像表格
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    height, width = binary.shape
+    # 用细长的结构元素做开运算，只保留长度超过区域一半的直线
+    horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, width // 2), 1)))
+    vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(1, height // 2))))
+    rows = np.count_nonzero(np.diff((horizontal.max(axis=1) > 0).astype(np.int8)) == 1) + int(horizontal[0].max() > 0)
+    cols = np.count_nonzero(np.diff((vertical.max(axis=0) > 0).astype(np.int8)) == 1) + int(vertical[:, 0].max() > 0)
+    return rows >= 2 and cols >= 2
+
+
+class RegionRouter:
+    """按标签选择区域的识别方式，并判断本地OCR结果是否需要升级到VLM"""
+
+    def __init__(self, policies: Optional[Dict[str, str]] = None, offline: Optional[bool] = None,
+                 min_confidence: Optional[float] = None):
+        """
+        初始化路由器
+
+        Args:
+            policies: 标签策略，覆盖默认策略；None则使用配置ROUTING_POLICIES
+            offline: 是否离线运行，None则使用配置OFFLINE_MODE
+            min_confidence: 本地OCR平均置信度下限，None则使用配置OCR_MIN_CONFIDENCE
+        """
+        self._policies = policies
+        self._offline = offline
+        self._min_confidence = min_confidence
+
+    @property
+    def offline(self) -> bool:
+        """是否离线运行（运行时读取配置，转换过程中修改配置立即生效）"""
+        return self._offline if self._offline is not None else get_config()["OFFLINE_MODE"]
+
+    @property
+    def min_confidence(self) -> float:
+        """本地OCR平均置信度下限"""
+        if self._min_confidence is not None:
+            return self._min_confidence
+        return get_config()["OCR_MIN_CONFIDENCE"]
+
+    def policy(self, label: str) -> Optional[str]:
+        """
+        标签对应的策略
+
+        Args:
+            label: 区域标签
+
+        Returns:
+            策略名称；离线时VLM策略改为本地OCR（图片类标签为None，表示不生成内容）；
+            不需要路由的标签（如公式）返回None
+        """
+        policies = dict(DEFAULT_POLICIES)
+        policies.update(self._policies if self._policies is not None
+                        else parse_policies(get_config()["ROUTING_POLICIES"]))
+        route = policies.get(label)
+        if route is None or not self.offline:
+            return route
+        if label in IMAGE_LABELS:
+            return None
+        return ROUTE_OCR
+
+    def uses_vlm(self, label: str) -> bool:
+        """标签是否直接请求VLM"""
+        return self.policy(label) == ROUTE_VLM
+
+    def uses_local_ocr(self, label: str) -> bool:
+        """标签是否先使用本地OCR"""
+        return self.policy(label) in (ROUTE_OCR, ROUTE_OCR_FIRST)
+
+    def has_complex_structure(self, region: RegionImage) -> bool:
+        """区域是否包含本地OCR无法还原的公式或表格结构"""
+        if any(child.get("label") in ("formula", "table") for child in region.contains or []):
+            return True
+        image = region.get_image()
+        return image is not None and looks_like_table(image)
+
+    def accept_ocr(self, region: RegionImage, lines: List[Dict]) -> bool:
+        """
+        本地OCR结果是否可以直接使用
+
+        Args:
+            region: RegionImage对象
+            lines: OCR文本行，每行包含text和score
+
+        Returns:
+            bool: ocr策略总是接受；ocr_first策略在没有识别出文字或按字符数加权的平均置信度
+                  低于下限时返回False（需要请求VLM）
+        """
+        if self.policy(region.label) != ROUTE_OCR_FIRST:
+            return True
+        lengths = np.array([len(line["text"]) for line in lines], dtype=float)
+        if lengths.sum() == 0:
+            return False
+        scores = np.array([line["score"] for line in lines], dtype=float)
+        return float((scores * lengths).sum() / lengths.sum()) >= self.min_confidence
+
+    def recognize_locally(self, regions: List[RegionImage], ocr_processor) -> List[Optional[str]]:
+        """
+        批量用本地OCR识别区域，返回可直接使用的文本
+
+        Args:
+            regions: 走本地OCR的RegionImage对象列表
+            ocr_processor: OCRProcessor实例
+
+        Returns:
+            与regions一一对应的文本；需要升级到VLM的区域为None
+        """
+        results: List[Optional[str]] = [None] * len(regions)
+        # ocr_first区域含有公式或表格结构时直接交给VLM，不浪费本地识别
+        candidates = [
+            index for index, region in enumerate(regions)
+            if region.get_image() is not None
+            and not (self.policy(region.label) == ROUTE_OCR_FIRST and self.has_complex_structure(region))
+        ]
+        image_lines = ocr_processor.extract_lines_batch([regions[index].get_image() for index in candidates])
+        for index, lines in zip(candidates, image_lines):
+            if self.accept_ocr(regions[index], lines):
+                results[index] = join_lines([line["text"] for line in lines])
+        return results
+
+
+# 全局路由器，策略从配置读取
+region_router = RegionRouter()
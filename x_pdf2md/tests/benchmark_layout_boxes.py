@@ -0,0 +1,36 @@
+"""
+版面框处理性能对比：逐对比较的参考实现 vs 空间索引实现
+使用方法：
+python -m x_pdf2md.tests.benchmark_layout_boxes
+"""
+
+import copy
+import time
+
+from x_pdf2md.image_utils.layout_detect import build_box_hierarchy, merge_formula_numbers
+from x_pdf2md.tests import layout_reference
+from x_pdf2md.tests.test_layout_boxes import random_layout
+
+
+def measure(func, boxes, repeat=3):
+    """返回多次运行的最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        data = copy.deepcopy(boxes)
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'框数':>6} | {'层次结构(参考)':>14} | {'层次结构(索引)':>14} | {'序号合并(参考)':>14} | {'序号合并(索引)':>14}")
+    for n in (10, 50, 100, 300, 1000, 3000):
+        boxes = random_layout(n, seed=n)
+        print(
+            f"{n:>6} | "
+            f"{measure(layout_reference.build_box_hierarchy, boxes):>12.2f}ms | "
+            f"{measure(build_box_hierarchy, boxes):>12.2f}ms | "
+            f"{measure(layout_reference.merge_formula_numbers, boxes):>12.2f}ms | "
+            f"{measure(merge_formula_numbers, boxes):>12.2f}ms"
+        )
@@ -0,0 +1,30 @@
+"""
+文本框合并性能对比：逐对比较的参考实现 vs 排序扫描实现
+使用方法：
+python -m x_pdf2md.tests.benchmark_merge_boxes
+"""
+
+import time
+
+from x_pdf2md.ocr_utils.text_detection import merge_overlapping_boxes
+from x_pdf2md.tests import ocr_reference
+from x_pdf2md.tests.test_merge_boxes import random_text_boxes
+
+
+def measure(func, boxes, scores, repeat=3):
+    """返回多次运行的最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(boxes, scores)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'框数':>6} | {'参考实现':>10} | {'排序扫描':>10} | {'加速比':>6}")
+    for n in (10, 100, 1000):
+        boxes, scores = random_text_boxes(n, seed=n)
+        reference = measure(ocr_reference.merge_overlapping_boxes, boxes, scores)
+        sweep = measure(merge_overlapping_boxes, boxes, scores)
+        print(f"{n:>6} | {reference:>8.2f}ms | {sweep:>8.2f}ms | {reference / sweep:>5.1f}x")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+文本框合并的参考实现（逐对比较的原始版本），用于验证排序扫描版本的结果一致性和性能对比
+"""
+import numpy as np
+
+
+def is_same_line(box1, box2, height_threshold=0.5):
+    """
+    判断两个文本框是否在同一行
+    Args:
+        box1: 第一个文本框坐标 shape:(4,2)
+        box2: 第二个文本框坐标 shape:(4,2)
+        height_threshold: 判定阈值，默认为文本框高度的0.5倍
+    Returns:
+        bool: True表示在同一行，False表示不在同一行
+    """
+    box1_center = np.mean(box1, axis=0)[1]  # y坐标的中心点
+    box2_center = np.mean(box2, axis=0)[1]
+    box1_height = abs(max(box1[:,1]) - min(box1[:,1]))
+    box2_height = abs(max(box2[:,1]) - min(box2[:,1]))
+    avg_height = (box1_height + box2_height) / 2
+    
+    return abs(box1_center - box2_center) < avg_height * height_threshold
+
+def merge_overlapping_boxes(boxes, scores):
+    """
+    合并同一行的重叠文本框
+    Args:
+        boxes: 所有文本框坐标列表 shape:(N,4,2)
+        scores: 对应的置信度得分列表 shape:(N,)
+    Returns:
+        tuple: (合并后的文本框列表, 合并后的置信度列表)
+    """
+    # 如果只有一个或没有文本框，直接返回
+    if len(boxes) <= 1:
+        return boxes, scores
+    
+    # 将输入的文本框列表转换为numpy数组，便于后续处理    
+    boxes = np.array(boxes)
+    # 初始化合并后的文本框列表
+    merged_boxes = []
+    # 初始化合并后的得分列表
+    merged_scores = []
+    # 初始化标记数组，用于记录每个文本框是否已被处理
+    used = [False] * len(boxes)
+    
+    # 遍历所有文本框
+    for i in range(len(boxes)):
+        # 如果当前文本框已被处理，则跳过
+        if used[i]:
+            continue
+        
+        # 获取当前文本框和其得分    
+        current_box = boxes[i]
+        current_score = scores[i]
+        # 初始化待合并文本框的索引列表
+        merged_indices = [i]
+        
+        # 寻找与当前文本框在同一行的其他文本框
+        for j in range(i + 1, len(boxes)):
+            # 如果目标文本框已被处理，则跳过
+            if used[j]:
+                continue
+            
+            # 判断两个文本框是否在同一行    
+            if is_same_line(boxes[i], boxes[j]):
+                merged_indices.append(j)
+        
+        # 如果找到了需要合并的文本框
+        if len(merged_indices) > 1:
+            # 将所有待合并文本框的坐标点重新整理
+            merged_points = boxes[merged_indices].reshape(-1, 2)
+            # 计算合并后文本框的最小x和y坐标
+            x_min, y_min = np.min(merged_points, axis=0)
+            # 计算合并后文本框的最大x和y坐标
+            x_max, y_max = np.max(merged_points, axis=0)
+            # 构建合并后的矩形文本框坐标
+            merged_box = np.array([[x_min, y_min], [x_max, y_min],
+                                 [x_max, y_max], [x_min, y_max]])
+            # 计算合并后文本框的平均置信度得分
+            merged_score = np.mean([scores[idx] for idx in merged_indices])
+        else:
+            # 如果没有需要合并的文本框，保持原状
+            merged_box = current_box
+            merged_score = current_score
+        
+        # 标记所有已处理的文本框    
+        for idx in merged_indices:
+            used[idx] = True
+        
+        # 将处理结果添加到输出列表    
+        merged_boxes.append(merged_box)
+        merged_scores.append(merged_score)
+    
+    # 返回合并后的文本框和对应的置信度得分
+    return merged_boxes, merged_scores
@@ -0,0 +1,37 @@
+"""
+公式分批测试：按宽高比分桶、桶内按面积排序，每张图片恰好出现一次
+使用方法：
+python -m pytest x_pdf2md/tests/test_formula_batch.py
+"""
+
+import random
+
+import numpy as np
+
+from x_pdf2md.image_utils.formula_recognize import bucket_formula_images
+
+
+def blank(height, width):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def test_batches_cover_every_image_once():
+    rng = random.Random(0)
+    images = [blank(rng.randint(20, 300), rng.randint(20, 1500)) for _ in range(57)]
+    batches = bucket_formula_images(images, batch_size=4)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(images)))
+    assert all(1 <= len(batch) <= 4 for batch in batches)
+
+
+def test_inline_and_display_formulas_are_not_mixed():
+    # 行内短公式（接近方形）与长公式（很宽）分到不同批次
+    inline = [blank(40, 50), blank(42, 48), blank(40, 52)]
+    display = [blank(60, 900), blank(64, 1000)]
+    images = [inline[0], display[0], inline[1], display[1], inline[2]]
+    batches = bucket_formula_images(images, batch_size=8)
+    assert sorted(map(sorted, batches)) == [[0, 2, 4], [1, 3]]
+
+
+def test_batches_sorted_by_area_within_bucket():
+    images = [blank(100, 200), blank(20, 40), blank(50, 100)]
+    assert bucket_formula_images(images, batch_size=2) == [[1, 2], [0]]
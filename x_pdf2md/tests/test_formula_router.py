@@ -0,0 +1,47 @@
+"""
+公式路由测试：复杂度估计、简单公式判定和截断检测
+使用方法：
+python -m pytest x_pdf2md/tests/test_formula_router.py
+"""
+
+import cv2
+import numpy as np
+
+from x_pdf2md.image_utils.formula_router import (
+    estimate_formula_complexity,
+    is_simple_formula,
+    looks_truncated,
+)
+
+
+def render_formula(lines, scale=1.0):
+    """在白色背景上绘制若干行公式文字"""
+    image = np.full((40 + 50 * len(lines), 600, 3), 255, dtype=np.uint8)
+    for index, text in enumerate(lines):
+        cv2.putText(image, text, (10, 50 + 50 * index), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 2)
+    return image
+
+
+def test_short_inline_formula_is_simple():
+    image = render_formula(["x + y = 1"])[15:70, :]
+    features = estimate_formula_complexity(image)
+    assert features["lines"] == 1
+    assert features["components"] >= 5
+    assert is_simple_formula(features)
+
+
+def test_multi_line_formula_is_complex():
+    image = render_formula(["a = b + c", "d = e + f", "g = h + i"])
+    assert not is_simple_formula(estimate_formula_complexity(image))
+
+
+def test_truncated_outputs():
+    features = {"height": 40, "ink_density": 0.05, "components": 6, "lines": 1}
+    assert not looks_truncated("x + y = 1", features)
+    assert not looks_truncated(r"a \leftarrow \left( b \right)", features)
+    assert looks_truncated("", features)
+    assert looks_truncated(r"\frac{x}{y", features)
+    assert looks_truncated(r"\left( x + y", features)
+    assert looks_truncated("x + y =", features)
+    # 输出相对图中符号数过短
+    assert looks_truncated("x", dict(features, components=20))
@@ -0,0 +1,57 @@
+"""
+VLM图片编码测试：按细节级别缩放、按内容选择编码格式
+使用方法：
+python -m pytest x_pdf2md/tests/test_image_encoding.py
+"""
+
+import base64
+
+import cv2
+import numpy as np
+
+from x_pdf2md.image2md.image_encoding import encode_image, encode_image_data_url, is_line_art, target_size
+
+
+def text_crop(width=2400, height=300):
+    """白底黑字的文字区域"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for row in range(3):
+        cv2.putText(image, "The quick brown fox jumps over the lazy dog " * 2, (10, 80 + row * 90),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    return image
+
+
+def photo(width=1600, height=1200):
+    """带有平滑渐变和噪声的照片类图片"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width)[None, :, None]
+    y = np.linspace(0, 255, height)[:, None, None]
+    image = np.concatenate([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2)
+    return np.clip(image + rng.normal(0, 20, image.shape), 0, 255).astype(np.uint8)
+
+
+def test_target_size_only_downscales():
+    assert target_size(2400, 300, "low") == (512, 64)
+    assert target_size(300, 100, "low") == (300, 100)
+    # high: 先限制最长边，再限制最短边
+    assert target_size(4000, 3000, "high") == (1024, 768)
+    assert target_size(2400, 300, "high") == (2048, 256)
+
+
+def test_format_follows_content():
+    assert is_line_art(text_crop())
+    assert not is_line_art(photo())
+    _, text_mime = encode_image(text_crop(), "high")
+    _, photo_mime = encode_image(photo(), "high")
+    assert text_mime == "image/png"
+    assert photo_mime == "image/jpeg"
+
+
+def test_encoded_payload_is_smaller_and_decodable():
+    for image in (text_crop(), photo()):
+        _, raw = cv2.imencode(".png", image)
+        url = encode_image_data_url(image, "low")
+        header, data = url.split(",", 1)
+        decoded = cv2.imdecode(np.frombuffer(base64.b64decode(data), np.uint8), cv2.IMREAD_UNCHANGED)
+        assert max(decoded.shape[:2]) == 512
+        assert len(data) * 3 / 4 < len(raw) / 5
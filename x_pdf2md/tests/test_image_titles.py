@@ -0,0 +1,27 @@
+"""
+图片标题测试：描述+标题合并输出的解析、批量标题输出的解析
+使用方法：
+python -m pytest x_pdf2md/tests/test_image_titles.py
+"""
+
+from x_pdf2md.image2md.get_image_title import parse_title_list
+from x_pdf2md.image2md.vlm_function import parse_description_title, split_description_title
+
+
+def test_parse_description_title():
+    result = '```json\n{"title": "模型结构图", "description": "这是一张示意图，展示了编码器和解码器。"}\n```'
+    assert parse_description_title(result) == ("这是一张示意图，展示了编码器和解码器。", "模型结构图")
+    assert parse_description_title('{"description": "只有描述"}') == ("只有描述", None)
+    assert parse_description_title('{"title": "只有标题"}') is None
+    assert parse_description_title("这是一张图片。") is None
+
+
+def test_split_falls_back_to_whole_output():
+    assert split_description_title("这是一张照片。") == ("这是一张照片。", None)
+
+
+def test_parse_title_list():
+    assert parse_title_list('标题如下：["损失曲线", "模型结构"]', 2) == ["损失曲线", "模型结构"]
+    assert parse_title_list('["损失曲线"]', 2) is None
+    assert parse_title_list("损失曲线；模型结构", 2) is None
+    assert parse_title_list('["a", ', 1) is None
@@ -0,0 +1,76 @@
+"""
+版面框处理测试：空间索引版本与逐对比较的参考实现结果一致
+使用方法：
+python -m pytest x_pdf2md/tests/test_layout_boxes.py
+"""
+
+import copy
+import random
+
+from x_pdf2md.image_utils.layout_detect import build_box_hierarchy, merge_formula_numbers
+from x_pdf2md.tests import layout_reference
+
+
+def random_layout(n, seed):
+    """生成带有嵌套框、重复框和公式序号的随机版面"""
+    rng = random.Random(seed)
+    labels = ["text", "formula", "formula_number", "table", "image", "paragraph_title"]
+    boxes = []
+    for _ in range(n):
+        if boxes and rng.random() < 0.2:
+            # 在已有框内部生成嵌套框，或直接复制已有框
+            outer = rng.choice(boxes)["coordinate"]
+            if rng.random() < 0.3:
+                coordinate = list(outer)
+            else:
+                x1 = rng.uniform(outer[0], (outer[0] + outer[2]) / 2)
+                y1 = rng.uniform(outer[1], (outer[1] + outer[3]) / 2)
+                coordinate = [x1, y1, rng.uniform(x1 + 1, outer[2] + 5), rng.uniform(y1 + 1, outer[3] + 5)]
+        else:
+            x1 = rng.uniform(0, 2300)
+            y1 = rng.uniform(0, 3300)
+            width = rng.choice([rng.uniform(20, 80), rng.uniform(100, 1000)])
+            height = rng.uniform(15, 300)
+            coordinate = [x1, y1, x1 + width, y1 + height]
+        if rng.random() < 0.3:
+            coordinate = [round(value) for value in coordinate]
+        boxes.append({
+            "label": rng.choice(labels),
+            "score": rng.random(),
+            "coordinate": coordinate,
+        })
+    return boxes
+
+
+def describe(boxes):
+    """将结果转换为可比较的结构（包含关系用原始框的位置表示，避免循环引用）"""
+    positions = {}
+    for box in boxes:
+        positions.setdefault(id(box), len(positions))
+        for child in box.get("contains", []):
+            positions.setdefault(id(child), len(positions))
+    return [
+        (
+            box["label"],
+            box["coordinate"],
+            box.get("formula_numbers"),
+            [positions[id(child)] for child in box.get("contains", [])],
+        )
+        for box in boxes
+    ]
+
+
+def test_build_box_hierarchy_matches_reference():
+    for seed in range(30):
+        boxes = random_layout(random.Random(seed).randint(0, 150), seed)
+        expected = layout_reference.build_box_hierarchy(copy.deepcopy(boxes))
+        actual = build_box_hierarchy(copy.deepcopy(boxes))
+        assert describe(actual) == describe(expected)
+
+
+def test_merge_formula_numbers_matches_reference():
+    for seed in range(30):
+        boxes = random_layout(random.Random(seed).randint(0, 150), seed)
+        expected = layout_reference.merge_formula_numbers(copy.deepcopy(boxes))
+        actual = merge_formula_numbers(copy.deepcopy(boxes))
+        assert describe(actual) == describe(expected)
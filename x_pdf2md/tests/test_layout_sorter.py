@@ -0,0 +1,103 @@
+"""
+阅读顺序排序测试：递归XY-cut处理多栏、跨栏元素和侧边栏
+使用方法：
+python -m pytest x_pdf2md/tests/test_layout_sorter.py
+"""
+
+import random
+
+from x_pdf2md.image_utils.layout_sorter import LayoutSorter, XYCutSorter
+
+PAGE_WIDTH = 1000
+
+
+def make_page(named_boxes, seed=0):
+    """根据(名称, 坐标)列表构造打乱顺序的检测结果"""
+    boxes = [{"label": name, "coordinate": coordinate} for name, coordinate in named_boxes]
+    random.Random(seed).shuffle(boxes)
+    return {"boxes": boxes}
+
+
+def reading_order(sorter, page):
+    return [box["label"] for box in sorter.sort_layout(page, PAGE_WIDTH)]
+
+
+def test_two_columns_with_spanning_blocks():
+    # 两栏段落间距恰好对齐，中间有跨栏图片
+    page = make_page([
+        ("title", [100, 50, 900, 100]),
+        ("L1", [100, 150, 480, 300]),
+        ("R1", [520, 150, 900, 300]),
+        ("L2", [100, 320, 480, 500]),
+        ("R2", [520, 320, 900, 500]),
+        ("figure", [100, 550, 900, 800]),
+        ("L3", [100, 850, 480, 1000]),
+        ("L4", [100, 1020, 480, 1100]),
+        ("R3", [520, 850, 900, 1100]),
+    ])
+    assert reading_order(XYCutSorter(), page) == [
+        "title", "L1", "L2", "R1", "R2", "figure", "L3", "L4", "R3"
+    ]
+
+
+def test_three_columns():
+    page = make_page([
+        (f"C{col}{row}", [50 + col * 320, 100 + row * 200, 330 + col * 320, 280 + row * 200])
+        for col in range(3) for row in range(3)
+    ])
+    assert reading_order(XYCutSorter(), page) == [
+        f"C{col}{row}" for col in range(3) for row in range(3)
+    ]
+
+
+def test_sidebar_and_uneven_columns():
+    # 左侧栏贯穿整页；右侧正文左栏比右栏长
+    page = make_page([
+        ("sidebar", [20, 100, 150, 1200]),
+        ("header", [200, 100, 950, 160]),
+        ("L1", [200, 200, 560, 400]),
+        ("R1", [590, 200, 950, 400]),
+        ("L2", [200, 450, 560, 700]),
+    ])
+    assert reading_order(XYCutSorter(), page) == ["sidebar", "header", "L1", "L2", "R1"]
+
+
+def test_sort_pages_keeps_drop_in_api():
+    pages = [
+        make_page([("b", [100, 300, 900, 400]), ("a", [100, 100, 900, 200])]),
+        make_page([("R", [520, 100, 900, 200]), ("L", [100, 100, 480, 200])]),
+    ]
+    for sorter in (LayoutSorter(), XYCutSorter()):
+        sorted_pages = sorter.sort_pages(pages, [PAGE_WIDTH, PAGE_WIDTH])
+        assert [[box["label"] for box in page] for page in sorted_pages] == [["a", "b"], ["L", "R"]]
+
+
+def test_narrow_single_column_lines_keep_vertical_order():
+    # 单栏正文中的右对齐日期行和左对齐小标题不能被当作两栏
+    page = make_page([
+        ("para1", [100, 50, 900, 300]),
+        ("date_right", [600, 320, 900, 350]),
+        ("heading_left", [100, 380, 400, 420]),
+        ("para2", [100, 440, 900, 700]),
+    ])
+    assert reading_order(XYCutSorter(), page) == ["para1", "date_right", "heading_left", "para2"]
+
+
+def test_sort_pages_cuts_all_pages_together():
+    # 整批排序与逐页排序结果一致（包括页面宽度不同、两栏不含跨栏元素的页面）
+    pages = [
+        make_page([("L1", [100, 100, 480, 300]), ("R1", [520, 100, 900, 300]),
+                   ("L2", [100, 320, 480, 500]), ("R2", [520, 320, 900, 500])]),
+        make_page([("L", [200, 200, 960, 600]), ("R", [1040, 200, 1800, 600])], seed=1),
+        make_page([]),
+        make_page([("date", [1200, 320, 1800, 350]), ("para", [200, 50, 1800, 300]),
+                   ("heading", [200, 380, 800, 420])], seed=2),
+    ]
+    widths = [PAGE_WIDTH, 2000, PAGE_WIDTH, 2000]
+    sorter = XYCutSorter()
+    expected = [sorter.sort_layout(page, width) for page, width in zip(pages, widths)]
+    sorted_pages = sorter.sort_pages(pages, widths)
+    assert sorted_pages == expected
+    assert [[box["label"] for box in page] for page in sorted_pages] == [
+        ["L1", "L2", "R1", "R2"], ["L", "R"], [], ["para", "date", "heading"]
+    ]
@@ -0,0 +1,46 @@
+"""
+文本框合并测试：排序扫描版本与逐对比较的参考实现结果一致
+使用方法：
+python -m pytest x_pdf2md/tests/test_merge_boxes.py
+"""
+
+import numpy as np
+
+from x_pdf2md.ocr_utils.text_detection import merge_overlapping_boxes
+from x_pdf2md.tests import ocr_reference
+
+
+def random_text_boxes(n, seed, integer=True):
+    """生成若干行、每行若干段的文本框，行高和基线带有随机扰动"""
+    rng = np.random.default_rng(seed)
+    boxes = []
+    y = 0.0
+    while len(boxes) < n:
+        line_height = rng.uniform(12, 40)
+        for _ in range(rng.integers(1, 5)):
+            x1 = rng.uniform(0, 1500)
+            width = rng.uniform(20, 400)
+            height = line_height * rng.uniform(0.6, 1.4)
+            top = y + rng.normal(0, line_height * 0.2)
+            box = [[x1, top], [x1 + width, top], [x1 + width, top + height], [x1, top + height]]
+            boxes.append(box)
+        y += line_height * rng.uniform(0.8, 1.6)
+    boxes = np.array(boxes[:n])
+    order = rng.permutation(n)
+    boxes = boxes[order]
+    if integer:
+        boxes = boxes.astype(np.int64)
+    return boxes, rng.uniform(0.5, 1.0, n)
+
+
+def test_merge_overlapping_boxes_matches_reference():
+    for seed in range(40):
+        n = int(np.random.default_rng(seed).integers(0, 200))
+        boxes, scores = random_text_boxes(n, seed, integer=seed % 2 == 0)
+        expected_boxes, expected_scores = ocr_reference.merge_overlapping_boxes(boxes, scores)
+        actual_boxes, actual_scores = merge_overlapping_boxes(boxes, scores)
+        assert len(actual_boxes) == len(expected_boxes)
+        for actual, expected in zip(actual_boxes, expected_boxes):
+            assert np.array_equal(actual, expected)
+            assert np.asarray(actual).dtype == np.asarray(expected).dtype
+        assert list(actual_scores) == list(expected_scores)
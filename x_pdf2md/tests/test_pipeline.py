@@ -0,0 +1,113 @@
+"""
+流水线执行器测试：结果顺序、阶段重叠、背压和异常传递
+使用方法：
+python -m pytest x_pdf2md/tests/test_pipeline.py
+"""
+import threading
+import time
+
+import pytest
+
+from x_pdf2md.pipeline import Stage, StagePipeline
+
+
+def test_results_keep_source_order():
+    def slow_for_even(items):
+        # 偶数项处理更慢，多线程时完成顺序与输入顺序不同
+        time.sleep(0.02 if items[0] % 2 == 0 else 0)
+        return [item * 10 for item in items]
+
+    pipeline = StagePipeline([
+        Stage("double", lambda items: [item * 2 for item in items]),
+        Stage("slow", slow_for_even, workers=4),
+        Stage("format", lambda items: [str(item) for item in items]),
+    ])
+    assert pipeline.run(range(10)) == [str(item * 20) for item in range(10)]
+    assert pipeline.run([]) == []
+
+
+def test_batch_stage_takes_ready_items_only():
+    seen = []
+    release = threading.Event()
+
+    def source():
+        for item in range(6):
+            if item == 3:
+                # 前三项已就绪后再产出后续项
+                release.wait(1)
+            yield item
+
+    def collect(items):
+        seen.append(list(items))
+        release.set()
+        return items
+
+    assert StagePipeline([Stage("batch", collect, batch_size=4)], queue_size=8).run(source()) == list(range(6))
+    assert all(len(batch) <= 4 for batch in seen)
+    assert sorted(item for batch in seen for item in batch) == list(range(6))
+
+
+def test_bounded_queue_limits_items_in_flight():
+    produced = []
+    consumed = []
+
+    def source():
+        for item in range(20):
+            produced.append(item)
+            yield item
+
+    def slow(items):
+        time.sleep(0.01)
+        # 上游最多领先：队列容量 + 正在处理的一项 + 源线程阻塞在put上的一项
+        assert len(produced) - len(consumed) <= 2 + 1 + 1
+        consumed.extend(items)
+        return items
+
+    StagePipeline([Stage("slow", slow)], queue_size=2).run(source())
+    assert consumed == list(range(20))
+
+
+def test_stages_overlap():
+    def wait(items):
+        time.sleep(0.1)
+        return items
+
+    pipeline = StagePipeline([Stage("first", wait), Stage("second", wait)])
+    started = time.perf_counter()
+    pipeline.run(range(5))
+    # 串行需要1秒，两个阶段重叠后约0.6秒
+    assert time.perf_counter() - started < 0.9
+    assert pipeline.busy_time["first"] >= 0.5
+
+
+def test_error_stops_pipeline():
+    calls = []
+
+    def fail_on_three(items):
+        if 3 in items:
+            raise RuntimeError("第3项失败")
+        return items
+
+    def record(items):
+        calls.extend(items)
+        return items
+
+    pipeline = StagePipeline([Stage("check", fail_on_three), Stage("record", record)])
+    with pytest.raises(RuntimeError, match="第3项失败"):
+        pipeline.run(range(1000))
+    assert 3 not in calls
+    assert len(calls) < 1000
+
+
+def test_source_error_is_raised():
+    def source():
+        yield 1
+        raise ValueError("渲染失败")
+
+    with pytest.raises(ValueError, match="渲染失败"):
+        StagePipeline([Stage("identity", lambda items: items)]).run(source())
+
+
+def test_stage_must_return_one_result_per_item():
+    with pytest.raises(ValueError):
+        StagePipeline([Stage("broken", lambda items: [])]).run(range(3))
@@ -0,0 +1,70 @@
+"""
+页面栅格缓存测试：无损读写、LRU淘汰顺序和淘汰到低水位
+使用方法：
+python -m pytest x_pdf2md/tests/test_raster_cache.py
+"""
+import os
+
+import cv2
+import numpy as np
+
+from x_pdf2md.pdf_utils.raster_cache import RasterCache
+
+
+def _noise_page(seed: int) -> np.ndarray:
+    # 随机噪声几乎无法压缩，每个缓存项大小接近原始像素大小
+    return np.random.default_rng(seed).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+
+def _entry_size() -> int:
+    # 单个缓存项（PNG编码后）的大小，各随机页面之间只有几字节差异
+    return len(cv2.imencode(".png", _noise_page(0))[1])
+
+
+def _entry_count(cache: RasterCache) -> int:
+    return sum(1 for _ in cache._iter_entries())
+
+
+def test_round_trip_is_lossless_and_compressed(tmp_path):
+    cache = RasterCache(str(tmp_path))
+    page = np.full((842, 596, 3), 255, dtype=np.uint8)
+    page[100:200, 50:500] = (0, 0, 255)
+    cache.put("ab" * 32, 0, 72, page)
+
+    assert cache.contains("ab" * 32, 0, 72)
+    assert np.array_equal(cache.get("ab" * 32, 0, 72), page)
+    assert cache.get("ab" * 32, 1, 72) is None
+    # 以纯色为主的页面压缩后远小于原始像素
+    assert cache._scan_size() < page.nbytes / 20
+
+
+def test_evicts_least_recently_used_down_to_low_water(tmp_path):
+    cache = RasterCache(str(tmp_path), max_bytes=int(_entry_size() * 10.5), low_water_ratio=0.5)
+    for page_index in range(10):
+        cache.put("cd" * 32, page_index, 72, _noise_page(page_index))
+        # 依次设置访问时间，页码越小越久未使用
+        os.utime(cache._entry_path("cd" * 32, page_index, 72), (page_index, page_index))
+    # 读取第0页，使其成为最近使用的缓存项
+    assert cache.get("cd" * 32, 0, 72) is not None
+
+    cache.put("cd" * 32, 10, 72, _noise_page(10))
+
+    assert cache._scan_size() <= cache.low_water_bytes
+    assert cache.contains("cd" * 32, 0, 72)
+    assert cache.contains("cd" * 32, 10, 72)
+    assert not cache.contains("cd" * 32, 1, 72)
+    assert not cache.contains("cd" * 32, 5, 72)
+
+
+def test_directory_scans_are_amortized(tmp_path, monkeypatch):
+    cache = RasterCache(str(tmp_path), max_bytes=int(_entry_size() * 10.5), low_water_ratio=0.5)
+    scans = []
+    iter_entries = cache._iter_entries
+    monkeypatch.setattr(cache, "_iter_entries", lambda: scans.append(1) or iter_entries())
+
+    for page_index in range(30):
+        cache.put("ef" * 32, page_index, 72, _noise_page(page_index))
+
+    # 每次淘汰后要再写入约5页才会重新扫描目录
+    assert 1 <= len(scans) <= 6
+    assert _entry_count(cache) <= 10
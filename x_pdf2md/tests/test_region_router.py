@@ -0,0 +1,85 @@
+"""
+区域路由测试：标签策略、离线模式、置信度门限和结构检测
+使用方法：
+python -m pytest x_pdf2md/tests/test_region_router.py
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from x_pdf2md.image_utils.region_image import RegionImage
+from x_pdf2md.region_router import RegionRouter, join_lines, looks_like_table, parse_policies
+
+
+def make_region(label, image=None, contains=None):
+    if image is None:
+        image = np.full((60, 400, 3), 255, dtype=np.uint8)
+    return RegionImage(image_path=None, label=label, score=1.0, page_number=1, region_index=0,
+                       original_box=[0, 0, 400, 60], contains=contains, image=image)
+
+
+def table_image():
+    image = np.full((300, 600, 3), 255, dtype=np.uint8)
+    for y in (10, 100, 200, 290):
+        cv2.line(image, (10, y), (590, y), (0, 0, 0), 2)
+    for x in (10, 300, 590):
+        cv2.line(image, (x, 10), (x, 290), (0, 0, 0), 2)
+    return image
+
+
+class FakeOCR:
+    """按区域图片高度返回预设的OCR文本行"""
+
+    def __init__(self, lines_by_height):
+        self.lines_by_height = lines_by_height
+        self.calls = 0
+
+    def extract_lines_batch(self, images):
+        self.calls += len(images)
+        return [self.lines_by_height[image.shape[0]] for image in images]
+
+
+def test_policies_and_offline():
+    router = RegionRouter(policies={}, offline=False)
+    assert router.policy("text") == "ocr_first"
+    assert router.policy("table") == "vlm"
+    assert router.policy("formula") is None
+    assert RegionRouter(policies=parse_policies("text:vlm, table:ocr_first")).policy("text") == "vlm"
+
+    offline = RegionRouter(policies={}, offline=True)
+    assert offline.policy("text") == "ocr"
+    assert offline.policy("table") == "ocr"
+    assert offline.policy("figure") is None
+    assert offline.policy("paragraph_title") == "ocr"
+
+    with pytest.raises(ValueError):
+        parse_policies("text:cloud")
+
+
+def test_confidence_gate_and_structure():
+    router = RegionRouter(policies={}, offline=False, min_confidence=0.9)
+    confident = make_region("text", np.full((60, 400, 3), 255, dtype=np.uint8))
+    doubtful = make_region("text", np.full((61, 400, 3), 255, dtype=np.uint8))
+    with_formula = make_region("text", np.full((62, 400, 3), 255, dtype=np.uint8), contains=[{"label": "formula"}])
+    tabular = make_region("text", table_image())
+    title = make_region("paragraph_title", np.full((63, 400, 3), 255, dtype=np.uint8))
+    ocr = FakeOCR({
+        60: [{"text": "Deep", "score": 0.99}, {"text": "learning", "score": 0.95}],
+        61: [{"text": "Noisy scan text", "score": 0.6}],
+        62: [{"text": "x", "score": 0.99}],
+        63: [{"text": "1 Introduction", "score": 0.5}],
+    })
+    results = router.recognize_locally([confident, doubtful, with_formula, tabular, title], ocr)
+    # 低置信度和含结构的正文交给VLM；标题只走OCR，总是接受
+    assert results == ["Deep learning", None, None, None, "1 Introduction"]
+    assert ocr.calls == 3
+
+
+def test_join_lines_and_table_detection():
+    assert join_lines(["The quick", "brown fox", " "]) == "The quick brown fox"
+    assert join_lines(["深度学习", "方法", "CNN"]) == "深度学习方法CNN"
+    assert looks_like_table(table_image())
+    text = np.full((100, 600, 3), 255, dtype=np.uint8)
+    cv2.putText(text, "plain paragraph text", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    assert not looks_like_table(text)
@@ -0,0 +1,65 @@
+"""
+单行文字判定测试：单行区域跳过文本检测，多行区域仍走检测
+使用方法：
+python -m pytest x_pdf2md/tests/test_single_line.py
+"""
+
+import cv2
+import numpy as np
+
+from x_pdf2md.ocr_utils.ocr_image import count_text_lines, is_single_line
+
+
+def render_lines(lines, scale=1.2, line_gap=20, padding=10):
+    """在白色背景上绘制若干行文字，返回BGR像素数组"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    sizes = [cv2.getTextSize(text, font, scale, 2) for text in lines]
+    line_height = max(size[1] + baseline for size, baseline in sizes)
+    width = max(size[0] for size, _ in sizes) + padding * 2
+    height = padding * 2 + line_height * len(lines) + line_gap * (len(lines) - 1)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for index, ((size, baseline), text) in enumerate(zip(sizes, lines)):
+        y = padding + index * (line_height + line_gap) + size[1]
+        cv2.putText(image, text, (padding, y), font, scale, (0, 0, 0), 2)
+    return image
+
+
+def test_single_title_line():
+    image = render_lines(["1.2 Experimental Setup"])
+    assert count_text_lines(image) == 1
+    assert is_single_line(image)
+
+
+def test_underlined_title_is_single_line():
+    image = render_lines(["Introduction"], line_gap=0)
+    cv2.line(image, (10, image.shape[0] - 4), (image.shape[1] - 10, image.shape[0] - 4), (0, 0, 0), 1)
+    assert is_single_line(image)
+
+
+def test_multi_line_block():
+    image = render_lines(["A title that wraps onto", "a second line of text"])
+    assert count_text_lines(image) == 2
+    assert not is_single_line(image, max_height=1000)
+
+
+def test_shape_thresholds():
+    image = render_lines(["Title"])
+    # 宽高比不足或高度超限时直接判定为需要检测
+    assert not is_single_line(image, min_aspect_ratio=10)
+    assert not is_single_line(image, max_height=image.shape[0] - 1)
+    # 空白图像没有文字行
+    assert count_text_lines(np.full((40, 200, 3), 255, dtype=np.uint8)) == 0
+
+
+def test_single_line_fast_path_keeps_numeric_detection_score(monkeypatch):
+    # 单行快速路径不调用检测模型，detection_score仍为数值
+    from x_pdf2md.ocr_utils import ocr_image
+
+    monkeypatch.setattr(
+        ocr_image, "recognize_text_batch",
+        lambda images, **kwargs: [{"rec_text": "Title", "rec_score": 0.98} for _ in images],
+    )
+    results = ocr_image.OCRProcessor().process_image(render_lines(["1.2 Experimental Setup"]), save_crops=False)
+    assert len(results) == 1
+    assert results[0]["detection_score"] == ocr_image.SINGLE_LINE_DETECTION_SCORE
+    assert f"{results[0]['detection_score']:.4f}" == "1.0000"
@@ -0,0 +1,67 @@
+"""
+VLM响应缓存测试：缓存键、LRU淘汰、刷新模式和多线程共享
+使用方法：
+python -m pytest x_pdf2md/tests/test_vlm_cache.py
+"""
+
+import threading
+
+from x_pdf2md.image2md.vlm_cache import VLMCache
+
+
+def test_key_covers_every_request_parameter():
+    base = dict(model="m", prompt="p", image="data:image/png;base64,AAAA", detail="low", temperature=0.1)
+    key = VLMCache.make_key(**base)
+    assert VLMCache.make_key(**base) == key
+    for field, value in [("model", "m2"), ("prompt", "p2"), ("image", "data:image/png;base64,BBBB"),
+                         ("detail", "high"), ("temperature", 0.2)]:
+        assert VLMCache.make_key(**dict(base, **{field: value})) != key
+
+
+def test_get_put_and_counters(tmp_path):
+    cache = VLMCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("a") is None
+    cache.put("a", "结果")
+    cache.put("empty", "")
+    assert cache.get("a") == "结果"
+    assert cache.get("empty") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 2, 1, 1)
+
+
+def test_lru_eviction(tmp_path):
+    cache = VLMCache(str(tmp_path / "cache.sqlite"), max_bytes=30)
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 10)
+    cache.put("c", "x" * 10)
+    # 访问a后，b成为最久未使用的缓存项
+    assert cache.get("a") is not None
+    cache.put("d", "x" * 10)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats()["size"] <= 30
+
+
+def test_refresh_mode_rewrites_and_is_shared_with_other_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    VLMCache(path).put("a", "旧结果")
+    refreshing = VLMCache(path, refresh=True)
+    assert refreshing.get("a") is None
+    refreshing.put("a", "新结果")
+    assert VLMCache(path).get("a") == "新结果"
+
+
+def test_concurrent_writers(tmp_path):
+    cache = VLMCache(str(tmp_path / "cache.sqlite"))
+
+    def write(worker):
+        for i in range(50):
+            cache.put(f"{worker}-{i}", f"value {worker} {i}")
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["entries"] == 200
+    assert cache.get("3-49") == "value 3 49"
@@ -0,0 +1,26 @@
+"""
+多图合并请求测试：输出拆分和任务分组
+使用方法：
+python -m pytest x_pdf2md/tests/test_vlm_packing.py
+"""
+
+from x_pdf2md.image2md.vlm_function import _pack_tasks, split_packed_output
+
+
+def test_split_packed_output():
+    text = "===IMAGE 1===\n第一段\n\n=== IMAGE 2 ===\n```markdown\n第二段\n```\n===IMAGE 3===\n$x$"
+    assert split_packed_output(text, 3) == ["第一段", "```markdown\n第二段\n```", "$x$"]
+
+
+def test_split_rejects_missing_or_reordered_markers():
+    assert split_packed_output("===IMAGE 1===\na", 2) is None
+    assert split_packed_output("===IMAGE 2===\na\n===IMAGE 1===\nb", 2) is None
+    assert split_packed_output("没有分隔标记", 1) is None
+    assert split_packed_output("", 1) is None
+
+
+def test_pack_tasks_groups_text_by_key():
+    tasks = [("text", "a"), ("table", "b"), ("text", "c"), ("text", "d"), ("text", "e"), ("text", "f")]
+    keys = [1, 1, 1, 2, 1, None]
+    assert _pack_tasks(tasks, keys, pack_size=2) == [[0, 2], [1], [3], [4], [5]]
+    assert _pack_tasks(tasks, keys, pack_size=1) == [[i] for i in range(len(tasks))]
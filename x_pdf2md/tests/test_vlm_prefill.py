@@ -0,0 +1,63 @@
+"""
+文档级VLM阶段测试：图片类区域优先把PDF内嵌的原始图片发给VLM
+使用方法：
+python -m pytest x_pdf2md/tests/test_vlm_prefill.py
+"""
+import json
+
+import cv2
+import numpy as np
+
+from x_pdf2md import markdown_formatter
+from x_pdf2md.image_utils.region_image import RegionImage
+
+
+class FakeExtractor:
+    """只在指定页有内嵌图片的提取器"""
+
+    def __init__(self, pages_with_images):
+        self.pages_with_images = pages_with_images
+        self.calls = 0
+
+    def extract_region_image(self, page_number, box, scale, output_path):
+        self.calls += 1
+        if page_number not in self.pages_with_images:
+            return None
+        image_path = f"{output_path}.png"
+        cv2.imwrite(image_path, np.zeros((8, 8, 3), dtype=np.uint8))
+        return image_path
+
+
+def make_region(page_number):
+    return RegionImage(
+        image_path=None, label="figure", score=0.9, page_number=page_number, region_index=0,
+        original_box=[0, 0, 100, 100], scale=300 / 72, image=np.full((20, 20, 3), 255, dtype=np.uint8),
+    )
+
+
+def test_image_regions_send_embedded_image(monkeypatch, tmp_path):
+    tasks = []
+
+    def fake_process(task_list, **kwargs):
+        tasks.extend(task_list)
+        return [json.dumps({"title": "示意图", "description": "描述"}) for _ in task_list]
+
+    monkeypatch.setattr(markdown_formatter, "process_images_concurrently", fake_process)
+    monkeypatch.setattr(markdown_formatter.region_router, "_offline", False)
+    extractor = FakeExtractor(pages_with_images={1})
+    embedded, cropped = make_region(1), make_region(2)
+
+    markdown_formatter.prefill_vlm_regions([[embedded], [cropped]], image_extractor=extractor, output_dir=str(tmp_path))
+
+    # 有内嵌图片的区域发送内嵌图片文件，没有匹配的区域回退到裁剪像素
+    assert tasks[0][1] == embedded.embedded_image_path
+    assert tasks[0][1].startswith(str(tmp_path / "images"))
+    assert tasks[1][1] is cropped.image
+    assert cropped.embedded_image_path == ""
+
+    # 格式化时直接引用已提取的内嵌图片，不再重复提取
+    markdown_formatter.format_region_content(embedded, output_dir=str(tmp_path), image_extractor=extractor)
+    markdown_formatter.format_region_content(cropped, output_dir=str(tmp_path), image_extractor=extractor)
+    assert extractor.calls == 2
+    assert "_embedded.png" in embedded.content
+    assert embedded.prefilled_content == "描述"